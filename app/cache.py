@@ -0,0 +1,108 @@
+# app/cache.py
+"""
+In-process result cache for the read endpoints.
+
+Entries are keyed by endpoint + normalized query parameters + the current
+dataset version. crud bumps the version after every committed write, so stale
+entries simply stop matching (and are dropped); the TTL bounds staleness for
+writes made by other processes.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Tuple
+
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "512"))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "60"))
+
+_version_lock = threading.Lock()
+_dataset_version = 0
+
+
+def dataset_version() -> int:
+    return _dataset_version
+
+
+def bump_dataset_version() -> int:
+    """Called after a write commits; invalidates every cached result."""
+    global _dataset_version
+    with _version_lock:
+        _dataset_version += 1
+        return _dataset_version
+
+
+def make_key(name: str, params: Iterable[Tuple[str, Any]]) -> tuple:
+    """Order-insensitive key over non-empty parameters, tagged with the dataset version."""
+    norm = tuple(sorted((k, str(v)) for k, v in params if v not in (None, "")))
+    return (name, dataset_version(), norm)
+
+
+class QueryCache:
+    """Thread-safe LRU with per-entry TTL and hit/miss counters."""
+
+    def __init__(self, maxsize: int = QUERY_CACHE_SIZE, ttl: float = QUERY_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = dataset_version()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _check_version(self) -> None:
+        # Drop everything once the dataset moved on; old keys can never match again
+        v = dataset_version()
+        if v != self._version:
+            self._data.clear()
+            self._version = v
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        if self.maxsize <= 0:
+            return False, None
+        with self._lock:
+            self._check_version()
+            entry = self._data.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._check_version()
+            if key[1] != self._version:
+                return  # computed against an older dataset
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else None,
+                "dataset_version": self._version,
+            }
+
+
+query_cache = QueryCache()
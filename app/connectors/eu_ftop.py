@@ -1,10 +1,16 @@
 # app/connectors/eu_ftop.py
 from __future__ import annotations
 import logging
+import math
+import os
 import requests
 import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Iterator, Dict, Any
 
+from .transport import client as http
+
 logger = logging.getLogger(__name__)
 
 API = "https://api.tech.ec.europa.eu/search-api/prod/rest/search"
@@ -29,123 +35,192 @@ QUERY = {
 }
 SORT = {"field": "sortStatus", "order": "ASC"}
 
-def fetch(page_size: int = 100, max_pages: int | None = None) -> Iterator[Dict[str, Any]]:
+MAX_IN_FLIGHT = int(os.getenv("EU_FTOP_MAX_IN_FLIGHT", "4"))
+TIMEOUT = 40
+
+
+def _request_page(page: int, page_size: int) -> Any:
+    """POST one search page and return the decoded JSON body."""
+    # Parameters passed in URL
+    params = {
+        "apiKey": API_KEY,
+        "text": "***",
+        "pageSize": page_size,
+        "pageNumber": page,
+    }
+
+    # Use 'files' to force a multipart/form-data request, which matches Postman's behavior.
+    # 'query' is sent as a file upload (with filename and content-type).
+    files = {
+        "query": ("CS.json", json.dumps(QUERY), "application/json"),
+    }
+
+    r = http.post(
+        API,
+        params=params,
+        files=files,
+        timeout=TIMEOUT,
+        cacheable=True,  # read-only search; lets repeated runs replay pages
+    )
+    r.raise_for_status()
+    return r.json()
+
+
+def _page_items(data: Any) -> list[Any]:
+    items: list[Any] = []
+    if isinstance(data, dict):
+        if isinstance(data.get("results"), list):
+            items = data["results"]
+        else:
+            # Some responses wrap the actual hits inside ``resultList``
+            rl = data.get("resultList")
+            if isinstance(rl, dict):
+                if isinstance(rl.get("results"), list):
+                    items = rl["results"]
+                elif isinstance(rl.get("result"), list):
+                    items = rl["result"]
+    return items
+
+
+def _open_items(items: list[Any]) -> Iterator[Dict[str, Any]]:
+    """Yield only Open/Forthcoming calls (top-level status, then the 'actions' deep check)."""
+    for rec in items:
+        # Client-side check to ensure we only output Open or Forthcoming calls
+        metadata = rec.get("metadata", {})
+        statuses = metadata.get("status") or []
+
+        # 1. Check top-level status (fast check)
+        if not any(s in [STATUS_FORTHCOMING, STATUS_OPEN] for s in statuses):
+            ident = metadata.get("identifier", ["Unknown"])[0] if metadata.get("identifier") else "Unknown"
+            logger.info(f"Skipping item {ident} with status {statuses}")
+            continue
+
+        # 2. Check detailed 'actions' status (deep check, source of truth)
+        actions_raw = metadata.get("actions")
+        if actions_raw and isinstance(actions_raw, list):
+            found_any_status = False
+            found_open_status = False
+
+            for action_str in actions_raw:
+                if not isinstance(action_str, str):
+                    continue
+                try:
+                    actions_data = json.loads(action_str)
+                    if isinstance(actions_data, list):
+                        for action in actions_data:
+                            st_id = str(action.get("status", {}).get("id", ""))
+                            if st_id:
+                                found_any_status = True
+                                if st_id in [STATUS_FORTHCOMING, STATUS_OPEN]:
+                                    found_open_status = True
+                except (json.JSONDecodeError, TypeError):
+                    pass
+
+            # If we successfully parsed statuses, but none were Open/Forthcoming, skip the item.
+            if found_any_status and not found_open_status:
+                ident = metadata.get("identifier", ["Unknown"])[0] if metadata.get("identifier") else "Unknown"
+                logger.info(f"Skipping item {ident}: Deep check found no open actions.")
+                continue
+
+        yield rec
+
+
+def _pages_sequential(page_size: int, max_pages: int | None, start: int = 1) -> Iterator[tuple[int, Any]]:
+    page = start
+    while max_pages is None or page <= max_pages:
+        yield page, _request_page(page, page_size)
+        page += 1
+
+
+def _pages_parallel(page_size: int, max_pages: int | None, max_in_flight: int) -> Iterator[tuple[int, Any]]:
+    """
+    Page 1 first (it reports totalResults), then the remaining known pages
+    concurrently with at most max_in_flight requests outstanding, yielded in page order.
+    """
+    first = _request_page(1, page_size)
+    yield 1, first
+    total = first.get("totalResults") if isinstance(first, dict) else None
+    if not isinstance(total, int) or not _page_items(first):
+        # Unknown size: fall back to walking pages until an empty one
+        yield from _pages_sequential(page_size, max_pages, start=2)
+        return
+    last = math.ceil(total / page_size)
+    if max_pages is not None:
+        last = min(last, max_pages)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="eu_ftop") as pool:
+        window: deque = deque()
+        next_page = 2
+        try:
+            while window or next_page <= last:
+                while next_page <= last and len(window) < max_in_flight:
+                    window.append((next_page, pool.submit(_request_page, next_page, page_size)))
+                    next_page += 1
+                page, fut = window.popleft()
+                yield page, fut.result()
+        finally:
+            for _, fut in window:
+                fut.cancel()
+
+
+def fetch(
+    page_size: int = 100,
+    max_pages: int | None = None,
+    max_in_flight: int | None = None,
+) -> Iterator[Dict[str, Any]]:
     """
     Fetch open grant calls from the EU Funding & Tenders Portal API.
 
     Iterates through pages of results, yielding individual grant call records.
-    Stops early if an empty page is encountered or if an error occurs.
+    Stops at the first empty page. A failed request or an undecodable page is
+    logged and re-raised after the records already yielded.
 
     Args:
         page_size: Number of results per page (default: 100, max supported by API is likely 100)
         max_pages: Maximum number of pages to fetch. If None, fetches until no more results.
+        max_in_flight: Concurrent page requests once the first page has reported
+            totalResults (default: EU_FTOP_MAX_IN_FLIGHT env, 4). 1 fetches strictly
+            one page at a time. Records are yielded in page order either way.
 
     Yields:
         Dictionary containing grant call metadata for each result
 
     Raises:
-        requests.RequestException: If API request fails after logging the error
+        requests.RequestException: If API request fails (including timeouts) after logging the error
+        ValueError: If a page is not valid JSON, after logging the error
     """
-    page = 1
-    while True:
-        if max_pages is not None and page > max_pages:
-            break
-        try:
-            logger.info(f"Fetching page {page}/{max_pages if max_pages else '?'} with page_size={page_size}")
-
-            # Parameters passed in URL
-            params = {
-                "apiKey": API_KEY,
-                "text": "***",
-                "pageSize": page_size,
-                "pageNumber": page,
-            }
-            
-            # Use 'files' to force a multipart/form-data request, which matches Postman's behavior.
-            # 'query' is sent as a file upload (with filename and content-type).
-            files = {
-                "query": ("CS.json", json.dumps(QUERY), "application/json"),
-            }
-
-            r = requests.post(
-                API,
-                params=params,
-                files=files,
-                timeout=40,
-            )
-            r.raise_for_status()
-            data = r.json()
+    in_flight = max(1, max_in_flight if max_in_flight is not None else MAX_IN_FLIGHT)
+    if in_flight > 1:
+        pages = _pages_parallel(page_size, max_pages, in_flight)
+    else:
+        pages = _pages_sequential(page_size, max_pages)
 
+    page = 1
+    try:
+        logger.info(f"Fetching up to {max_pages if max_pages else '?'} pages with page_size={page_size}, in_flight={in_flight}")
+        for page, data in pages:
             if page == 1 and isinstance(data, dict):
                 logger.info(f"Total results available according to API: {data.get('totalResults', 'unknown')}")
 
-            items: list[Any] = []
-            if isinstance(data, dict):
-                if isinstance(data.get("results"), list):
-                    items = data["results"]
-                else:
-                    # Some responses wrap the actual hits inside ``resultList``
-                    rl = data.get("resultList")
-                    if isinstance(rl, dict):
-                        if isinstance(rl.get("results"), list):
-                            items = rl["results"]
-                        elif isinstance(rl.get("result"), list):
-                            items = rl["result"]
-
+            items = _page_items(data)
             if not items:
                 logger.info(f"No items found on page {page}, stopping pagination")
                 break
 
             logger.info(f"Retrieved {len(items)} items from page {page}")
-            for rec in items:
-                # Client-side check to ensure we only output Open or Forthcoming calls
-                metadata = rec.get("metadata", {})
-                statuses = metadata.get("status") or []
-                
-                # 1. Check top-level status (fast check)
-                if not any(s in [STATUS_FORTHCOMING, STATUS_OPEN] for s in statuses):
-                    ident = metadata.get("identifier", ["Unknown"])[0] if metadata.get("identifier") else "Unknown"
-                    logger.info(f"Skipping item {ident} with status {statuses}")
-                    continue
-
-                # 2. Check detailed 'actions' status (deep check, source of truth)
-                actions_raw = metadata.get("actions")
-                if actions_raw and isinstance(actions_raw, list):
-                    found_any_status = False
-                    found_open_status = False
-                    
-                    for action_str in actions_raw:
-                        if not isinstance(action_str, str):
-                            continue
-                        try:
-                            actions_data = json.loads(action_str)
-                            if isinstance(actions_data, list):
-                                for action in actions_data:
-                                    st_id = str(action.get("status", {}).get("id", ""))
-                                    if st_id:
-                                        found_any_status = True
-                                        if st_id in [STATUS_FORTHCOMING, STATUS_OPEN]:
-                                            found_open_status = True
-                        except (json.JSONDecodeError, TypeError):
-                            pass
-                    
-                    # If we successfully parsed statuses, but none were Open/Forthcoming, skip the item.
-                    if found_any_status and not found_open_status:
-                        ident = metadata.get("identifier", ["Unknown"])[0] if metadata.get("identifier") else "Unknown"
-                        logger.info(f"Skipping item {ident}: Deep check found no open actions.")
-                        continue
-
-                yield rec
-
-        except requests.Timeout:
-            logger.error(f"Request timeout on page {page} after 40 seconds")
-            break
-        except requests.RequestException as e:
-            logger.error(f"Failed to fetch page {page}: {e}")
-            if isinstance(e, requests.HTTPError) and e.response is not None:
-                logger.error(f"API Response: {e.response.text}")
-            raise
-        except ValueError as e:
-            logger.error(f"Failed to parse JSON response on page {page}: {e}")
-            break
-        page += 1
+            yield from _open_items(items)
+            page += 1
+
+    except requests.Timeout:
+        logger.error(f"Request timeout on page {page} after {TIMEOUT} seconds")
+        raise
+    except requests.RequestException as e:
+        logger.error(f"Failed to fetch page {page}: {e}")
+        if isinstance(e, requests.HTTPError) and e.response is not None:
+            logger.error(f"API Response: {e.response.text}")
+        raise
+    except ValueError as e:
+        logger.error(f"Failed to parse JSON response on page {page}: {e}")
+        raise
+    finally:
+        pages.close()
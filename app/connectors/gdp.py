@@ -0,0 +1,45 @@
+import logging
+import os
+from typing import Any, Dict, Iterator
+
+from .jsonstream import iter_response_items
+from .transport import client as http
+
+logger = logging.getLogger(__name__)
+
+class GdpConnector:
+    """
+    Shared connector for the Swedish research funders' GDP "utlysningar" APIs
+    (Formas, Forte, VR). Subclasses only set name, base_url and api_key_env.
+
+    Records are yielded as they are decoded from the streamed response, so
+    normalization can start before the download finishes.
+    """
+
+    name: str = ""
+    base_url: str = ""
+    api_key_env: str = ""
+
+    def fetch(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yields calls from the source. A missing API key is logged and yields
+        nothing; a failed request or an undecodable body is logged and
+        re-raised after the records already yielded, so the caller sees the
+        fetch as failed.
+        """
+        api_key = os.getenv(self.api_key_env)
+        if not api_key:
+            logger.error(f"Missing {self.api_key_env} environment variable.")
+            return
+
+        headers = {"Authorization": api_key}
+        count = 0
+        try:
+            response = http.get(self.base_url, headers=headers, stream=True)
+            response.raise_for_status()
+            for record in iter_response_items(response):
+                count += 1
+                yield record
+        except Exception as e:
+            logger.error(f"Error fetching data from {self.name} after {count} records: {e}", exc_info=True)
+            raise
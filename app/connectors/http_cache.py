@@ -0,0 +1,218 @@
+# app/connectors/http_cache.py
+"""
+On-disk response cache for the connector transport.
+
+Each entry is two files under HTTP_CACHE_DIR, named by a hash of the request
+(method, URL, params and body): <key>.json holds the metadata (status,
+ETag/Last-Modified, selected headers, when it was stored) and <key>.gz holds
+the gzip-compressed body.
+
+- Entries younger than HTTP_CACHE_TTL seconds are replayed without network.
+- Older entries are revalidated with If-None-Match / If-Modified-Since; a 304
+  replays the stored body and restarts its TTL.
+- Offline mode (HTTP_CACHE_OFFLINE=1) never touches the network: every request
+  is answered from disk regardless of age, and a miss raises CacheMissError.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", os.path.join(_ROOT, ".http_cache"))
+HTTP_CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", "0"))  # 0 = always revalidate
+HTTP_CACHE_OFFLINE = os.getenv("HTTP_CACHE_OFFLINE", "0").lower() in ("1", "true", "yes")
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE", "1").lower() in ("1", "true", "yes")
+
+# Response headers worth replaying (decoding and validators)
+_KEEP_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Date")
+
+
+class CacheMissError(requests.ConnectionError):
+    """Offline mode and no cached response for the request."""
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    url: str
+    status: int
+    headers: Dict[str, str]
+    stored_at: float
+    body: bytes
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    def validators(self) -> Dict[str, str]:
+        out = {}
+        if self.headers.get("ETag"):
+            out["If-None-Match"] = self.headers["ETag"]
+        if self.headers.get("Last-Modified"):
+            out["If-Modified-Since"] = self.headers["Last-Modified"]
+        return out
+
+    def to_response(self) -> requests.Response:
+        r = requests.Response()
+        r.status_code = self.status
+        r._content = self.body
+        r._content_consumed = True  # iter_content() then slices the stored body
+        r.headers.update(self.headers)
+        r.headers["X-Cache"] = "HIT"
+        r.url = self.url
+        return r
+
+
+def _body_fingerprint(kwargs: Dict[str, Any]) -> Any:
+    files = kwargs.get("files")
+    if files:
+        # Multipart boundaries are random; key on the parts themselves
+        files = sorted((name, repr(part)) for name, part in files.items())
+    return {
+        "params": sorted((kwargs.get("params") or {}).items()),
+        "data": kwargs.get("data"),
+        "json": kwargs.get("json"),
+        "files": files,
+    }
+
+
+def request_key(method: str, url: str, kwargs: Dict[str, Any]) -> str:
+    raw = json.dumps([method.upper(), url, _body_fingerprint(kwargs)], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class HttpCache:
+    def __init__(self, directory: str = HTTP_CACHE_DIR, *, ttl: float = HTTP_CACHE_TTL, offline: bool = HTTP_CACHE_OFFLINE):
+        self.directory = directory
+        self.ttl = ttl
+        self.offline = offline
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stored": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["HttpCache"]:
+        return cls() if HTTP_CACHE_ENABLED or HTTP_CACHE_OFFLINE else None
+
+    def _paths(self, key: str) -> tuple[str, str]:
+        base = os.path.join(self.directory, key[:2], key)
+        return base + ".json", base + ".gz"
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def load(self, key: str) -> Optional[CacheEntry]:
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with gzip.open(body_path, "rb") as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError) as e:
+            logger.warning("Ignoring unreadable cache entry %s: %s", key, e)
+            return None
+        return CacheEntry(key, meta["url"], meta["status"], meta["headers"], meta["stored_at"], body)
+
+    def _write(self, path: str, data: bytes) -> None:
+        # Write-then-rename so concurrent readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _write_meta(self, entry: CacheEntry) -> None:
+        meta_path, _ = self._paths(entry.key)
+        meta = {"url": entry.url, "status": entry.status, "headers": entry.headers, "stored_at": entry.stored_at}
+        self._write(meta_path, json.dumps(meta).encode())
+
+    @staticmethod
+    def _entry(key: str, resp: requests.Response, body: bytes) -> CacheEntry:
+        return CacheEntry(
+            key=key,
+            url=resp.url,
+            status=resp.status_code,
+            headers={h: resp.headers[h] for h in _KEEP_HEADERS if h in resp.headers},
+            stored_at=time.time(),
+            body=body,
+        )
+
+    def store(self, key: str, resp: requests.Response) -> CacheEntry:
+        entry = self._entry(key, resp, resp.content)
+        meta_path, body_path = self._paths(key)
+        try:
+            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+            self._write(body_path, gzip.compress(entry.body, compresslevel=6))
+            self._write_meta(entry)
+            self._count("stored")
+        except OSError as e:
+            logger.warning("Could not write cache entry for %s: %s", resp.url, e)
+        return entry
+
+    def store_streaming(self, key: str, resp: requests.Response) -> requests.Response:
+        """
+        Cache a streamed (stream=True) response without buffering it: the body is
+        compressed to disk as the caller consumes iter_content(), and the entry
+        is committed only if the body was read to the end.
+        """
+        entry = self._entry(key, resp, b"")
+        _, body_path = self._paths(key)
+        read = resp.iter_content
+
+        def iter_content(chunk_size: int = 1, decode_unicode: bool = False):
+            if decode_unicode:
+                yield from read(chunk_size, decode_unicode)
+                return
+            try:
+                os.makedirs(os.path.dirname(body_path), exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(body_path), suffix=".tmp")
+            except OSError as e:
+                logger.warning("Could not write cache entry for %s: %s", resp.url, e)
+                yield from read(chunk_size)
+                return
+            complete = False
+            try:
+                with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as gz:
+                    for chunk in read(chunk_size):
+                        gz.write(chunk)
+                        yield chunk
+                complete = True
+            finally:
+                if complete:
+                    os.replace(tmp, body_path)
+                    self._write_meta(entry)
+                    self._count("stored")
+                else:
+                    os.unlink(tmp)
+
+        resp.iter_content = iter_content
+        return resp
+
+    def touch(self, entry: CacheEntry) -> None:
+        """Restart the TTL of an entry the server confirmed unchanged (304)."""
+        entry.stored_at = time.time()
+        try:
+            self._write_meta(entry)
+        except OSError as e:
+            logger.warning("Could not refresh cache entry for %s: %s", entry.url, e)
@@ -0,0 +1,147 @@
+# app/connectors/jsonstream.py
+"""
+Incremental decoding of JSON list payloads.
+
+The source APIs return either a top-level array of records or an object that
+wraps the array under a key ("results", "data", ...). iter_json_items() reads
+the body chunk by chunk and yields each record as soon as it has been decoded,
+so memory is bounded by the largest single record instead of the whole body.
+Only the stdlib decoder is used (json.JSONDecoder.raw_decode per element).
+"""
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, Sequence
+
+DEFAULT_KEYS = ("results", "Result", "data")
+
+_WS = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Text buffer over a byte-chunk iterator, refilled on demand."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, at_least: int = 1) -> bool:
+        """Append at least `at_least` more characters (fewer only at EOF); False if nothing was added."""
+        if self.eof:
+            return False
+        if self.pos > 65536:  # drop what has already been consumed
+            self.buf, self.pos = self.buf[self.pos:], 0
+        added = 0
+        while added < at_least:
+            chunk = next(self._chunks, None)
+            text = self._utf8.decode(chunk or b"", final=chunk is None)
+            self.buf += text
+            added += len(text)
+            if chunk is None:
+                self.eof = True
+                break
+        return added > 0
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at EOF), without consuming it."""
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        c = self.peek()
+        if not c or c not in chars:
+            raise ValueError(f"Expected one of {chars!r} at offset {self.pos}, got {c or 'EOF'!r}")
+        self.pos += 1
+        return c
+
+    def value(self) -> Any:
+        """Decode one complete JSON value at the cursor."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Incomplete: grow geometrically so a large value is re-scanned O(log n) times
+                if not self.fill(max(len(self.buf) - self.pos, 4096)):
+                    raise
+                continue
+            # A number/literal touching the end of the buffer may continue in the next chunk
+            if end == len(self.buf) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def _iter_array(r: _Reader) -> Iterator[Any]:
+    r.expect("[")
+    if r.peek() == "]":
+        r.pos += 1
+        return
+    while True:
+        yield r.value()
+        if r.expect(",]") == "]":
+            return
+
+
+def iter_json_items(chunks: Iterable[bytes], keys: Sequence[str] = DEFAULT_KEYS) -> Iterator[Any]:
+    """
+    Yield the records of a JSON payload that is either a top-level array or an
+    object holding the array under one of `keys`. Like the old
+    `data.get(keys[0]) or data.get(keys[1]) or ...`, the first key in `keys`
+    order with a non-empty value wins, wherever it sits in the document. An
+    array is streamed once every higher-priority key has been seen empty;
+    a member that may still be outranked is decoded whole and held until the
+    end of the object. Yields nothing for an empty body.
+    """
+    r = _Reader(chunks)
+    first = r.peek()
+    if first == "[":
+        yield from _iter_array(r)
+        return
+    if first != "{":
+        if first:
+            raise ValueError(f"Expected a JSON array or object, got {first!r}")
+        return
+
+    held: Dict[str, Any] = {}
+    r.expect("{")
+    if r.peek() != "}":
+        while True:
+            key = r.value()
+            r.expect(":")
+            if key in keys and r.peek() == "[" and all(k in held and not held[k] for k in keys[:keys.index(key)]):
+                empty = True
+                for item in _iter_array(r):
+                    empty = False
+                    yield item
+                if not empty:
+                    return
+                held[key] = []
+            else:
+                value = r.value()
+                if key in keys:
+                    held[key] = value
+            if r.expect(",}") == "}":
+                break
+    for k in keys:
+        if held.get(k):
+            yield from held[k]
+            return
+
+
+def iter_response_items(resp, keys: Sequence[str] = DEFAULT_KEYS, chunk_size: int = 65536) -> Iterator[Any]:
+    """iter_json_items over a (streamed) requests.Response body."""
+    try:
+        yield from iter_json_items(resp.iter_content(chunk_size=chunk_size), keys)
+    finally:
+        resp.close()
@@ -0,0 +1,272 @@
+# app/connectors/transport.py
+"""
+Shared HTTP transport for the source connectors.
+
+- one pooled keep-alive requests.Session per host
+- per-host concurrency cap and request-rate limit
+- retries with exponential backoff + full jitter, honouring Retry-After
+- per-host circuit breaker (fails fast while a source is down)
+- per-host counters: requests, retries, errors, bytes, latency
+- optional on-disk response cache with conditional revalidation (http_cache.py)
+"""
+from __future__ import annotations
+
+import argparse
+import email.utils
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .http_cache import CacheMissError, HttpCache, request_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "40"))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "4"))
+PER_HOST_CONCURRENCY = int(os.getenv("HTTP_PER_HOST_CONCURRENCY", "4"))
+PER_HOST_RATE = float(os.getenv("HTTP_PER_HOST_RATE", "10"))  # requests/second, 0 = unlimited
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+BREAKER_THRESHOLD = 5      # consecutive failures before the circuit opens
+BREAKER_COOLDOWN = 60.0    # seconds before a trial request is let through
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised without contacting the host while its circuit breaker is open."""
+
+
+def _retry_after(resp: requests.Response) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date)."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+        return max(0.0, when.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _Host:
+    """Per-host session, limits, breaker state and counters."""
+
+    def __init__(self, concurrency: int, rate: float):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, concurrency))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.slots = threading.BoundedSemaphore(max(1, concurrency))
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_start = 0.0
+        self.failures = 0
+        self.open_until = 0.0
+        self.stats = {"requests": 0, "retries": 0, "errors": 0, "bytes": 0, "latency_total": 0.0, "latency_max": 0.0}
+
+    def reserve_start(self) -> float:
+        """Seconds to wait so request starts are spaced by the rate limit."""
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.interval
+            return start - now
+
+
+class HttpClient:
+    def __init__(
+        self,
+        *,
+        max_retries: int = MAX_RETRIES,
+        per_host_concurrency: int = PER_HOST_CONCURRENCY,
+        per_host_rate: float = PER_HOST_RATE,
+        timeout: float = DEFAULT_TIMEOUT,
+        breaker_threshold: int = BREAKER_THRESHOLD,
+        breaker_cooldown: float = BREAKER_COOLDOWN,
+        sleep: Callable[[float], None] = time.sleep,
+        cache: Optional[HttpCache] = None,
+    ):
+        self.max_retries = max_retries
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_rate = per_host_rate
+        self.timeout = timeout
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self._sleep = sleep
+        self.cache = cache
+        self._hosts: Dict[str, _Host] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url: str) -> tuple[str, _Host]:
+        netloc = urlsplit(url).netloc
+        with self._lock:
+            h = self._hosts.get(netloc)
+            if h is None:
+                h = self._hosts[netloc] = _Host(self.per_host_concurrency, self.per_host_rate)
+            return netloc, h
+
+    def _backoff(self, attempt: int, resp: Optional[requests.Response]) -> float:
+        delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+        hinted = _retry_after(resp) if resp is not None else None
+        return max(delay, min(hinted, BACKOFF_CAP * 4)) if hinted is not None else delay
+
+    def _record_outcome(self, h: _Host, ok: bool) -> None:
+        with h.lock:
+            if ok:
+                h.failures = 0
+                h.open_until = 0.0
+                return
+            h.failures += 1
+            if h.failures >= self.breaker_threshold:
+                h.open_until = time.monotonic() + self.breaker_cooldown
+
+    def request(self, method: str, url: str, *, cacheable: Optional[bool] = None, **kwargs: Any) -> requests.Response:
+        """
+        Send a request through the host's pooled session. Retries connection
+        errors, timeouts and 429/5xx responses; the last response is returned
+        as-is (callers still call raise_for_status()).
+
+        With a cache configured, GET requests (or any request passed
+        cacheable=True, e.g. an idempotent search POST) are served from disk
+        while fresh and revalidated with ETag / Last-Modified once stale.
+        """
+        if cacheable is None:
+            cacheable = method.upper() == "GET"
+        if self.cache is None or not cacheable:
+            return self._send(method, url, **kwargs)
+
+        cache = self.cache
+        key = request_key(method, url, kwargs)
+        entry = cache.load(key)
+        if entry is not None and (cache.offline or entry.age < cache.ttl):
+            cache._count("hits")
+            return entry.to_response()
+        if cache.offline:
+            cache._count("misses")
+            raise CacheMissError(f"offline and no cached response for {method} {url}")
+
+        if entry is not None:
+            kwargs["headers"] = {**entry.validators(), **(kwargs.get("headers") or {})}
+        resp = self._send(method, url, **kwargs)
+        if resp.status_code == 304 and entry is not None:
+            cache._count("revalidated")
+            cache.touch(entry)
+            return entry.to_response()
+        cache._count("misses")
+        if resp.status_code == 200:
+            if kwargs.get("stream"):
+                return cache.store_streaming(key, resp)
+            cache.store(key, resp)
+        return resp
+
+    def _send(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        netloc, h = self._host(url)
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            with h.lock:
+                if h.open_until and time.monotonic() < h.open_until:
+                    raise CircuitOpenError(f"circuit open for {netloc} after {h.failures} consecutive failures")
+            wait = h.reserve_start()
+            if wait > 0:
+                self._sleep(wait)
+
+            resp: Optional[requests.Response] = None
+            error: Optional[Exception] = None
+            t0 = time.monotonic()
+            with h.slots:
+                try:
+                    resp = h.session.request(method, url, **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+            elapsed = time.monotonic() - t0
+
+            with h.lock:
+                st = h.stats
+                st["requests"] += 1
+                st["latency_total"] += elapsed
+                st["latency_max"] = max(st["latency_max"], elapsed)
+                if resp is not None:
+                    # Streamed bodies are not read here; count what the server announced
+                    st["bytes"] += int(resp.headers.get("Content-Length") or 0) if kwargs.get("stream") else len(resp.content)
+                if error is not None or (resp is not None and resp.status_code >= 500):
+                    st["errors"] += 1
+            logger.debug(
+                "%s %s -> %s in %.3fs", method, url,
+                resp.status_code if resp is not None else type(error).__name__, elapsed,
+            )
+
+            retryable = error is not None or resp.status_code in RETRY_STATUSES
+            self._record_outcome(h, ok=not retryable)
+            if not retryable or attempt >= self.max_retries:
+                if error is not None:
+                    raise error
+                return resp
+
+            delay = self._backoff(attempt, resp)
+            if resp is not None:
+                resp.close()  # release the pooled connection of an unread (streamed) body
+            attempt += 1
+            with h.lock:
+                h.stats["retries"] += 1
+            logger.warning(
+                "Retrying %s %s in %.1fs (attempt %d/%d): %s", method, url, delay, attempt, self.max_retries,
+                error or f"HTTP {resp.status_code}",
+            )
+            self._sleep(delay)
+
+    def configure_cache(self, *, offline: Optional[bool] = None, ttl: Optional[float] = None) -> HttpCache:
+        """Enable the disk cache (if off) and override offline mode / TTL, e.g. from CLI flags."""
+        if self.cache is None:
+            self.cache = HttpCache()
+        if offline is not None:
+            self.cache.offline = offline
+        if ttl is not None:
+            self.cache.ttl = ttl
+        return self.cache
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        out = {}
+        with self._lock:
+            hosts = list(self._hosts.items())
+        for netloc, h in hosts:
+            with h.lock:
+                st = dict(h.stats)
+                st["latency_avg"] = st["latency_total"] / st["requests"] if st["requests"] else 0.0
+                st["circuit_open"] = bool(h.open_until and time.monotonic() < h.open_until)
+            out[netloc] = st
+        return out
+
+
+# Shared by all connectors
+client = HttpClient(cache=HttpCache.from_env())
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    """--offline / --cache-ttl for scripts that fetch through the shared client."""
+    parser.add_argument("--offline", action="store_true", help="replay cached API responses only, no network")
+    parser.add_argument("--cache-ttl", type=float, metavar="SECONDS",
+                        help="replay cached responses younger than this without revalidating")
+
+
+def apply_cache_arguments(args: argparse.Namespace) -> None:
+    if args.offline or args.cache_ttl is not None:
+        client.configure_cache(offline=True if args.offline else None, ttl=args.cache_ttl)
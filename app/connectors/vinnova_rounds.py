@@ -1,10 +1,20 @@
 # app/connectors/vinnova_rounds.py
 from __future__ import annotations
-import os, datetime as dt, requests
-from typing import Iterable, Dict, Any, Optional
+import logging
+import os, datetime as dt
+from typing import Iterable, Dict, Any, Optional, Union
+
+from ..dates import today
+from .jsonstream import iter_response_items
+from .transport import client as http
+
+logger = logging.getLogger(__name__)
 
 BASE = "https://data.vinnova.se/api/ansokningsomgangar"
 VINNOVA_SINCE = os.getenv("VINNOVA_SINCE", "2024-01-01")
+# Days re-fetched before the last successful sync, to cover late-published changes
+VINNOVA_OVERLAP_DAYS = int(os.getenv("VINNOVA_OVERLAP_DAYS", "3"))
+SOURCE = "VINNOVA"
 
 def _since() -> str:
     try:
@@ -13,20 +23,25 @@ def _since() -> str:
     except Exception:
         return "2024-01-01"
 
-def fetch(page_size: int = 200, max_pages: int = 50) -> Iterable[Dict[str, Any]]:
+def next_watermark(run_started: Optional[dt.date] = None) -> dt.date:
+    """Watermark to persist after a clean run that started on run_started (default: today, UTC)."""
+    return (run_started or today()) - dt.timedelta(days=VINNOVA_OVERLAP_DAYS)
+
+def fetch(
+    page_size: int = 200,
+    max_pages: int = 50,
+    since: Union[str, dt.date, None] = None,
+) -> Iterable[Dict[str, Any]]:
     """
-    The endpoint commonly supports incremental by date, sometimes with simple pagination.
-    We try date-first; if the API doesn’t page, we’ll just return the whole list.
+    Rounds changed on or after `since` (a persisted watermark; default VINNOVA_SINCE
+    for a full rebuild). The endpoint returns the whole window in one response, so
+    page_size/max_pages only exist for signature compatibility with the other
+    connectors and have no effect.
     """
-    url = f"{BASE}/{_since()}"
-    r = requests.get(url, timeout=40)
+    since = since.isoformat() if isinstance(since, dt.date) else (since or _since())
+    url = f"{BASE}/{since}"
+    logger.info("Fetching Vinnova rounds changed since %s", since)
+    r = http.get(url, timeout=40, stream=True)
     r.raise_for_status()
-    data = r.json()
-    if isinstance(data, list):
-        for x in data:
-            yield x
-        return
-    # If the API returns an object with results/pagination, handle it:
-    items = (data.get("results") or data.get("Result") or data.get("data") or [])
-    for x in items:
-        yield x
+    # A bare list, or an object with results/pagination: records are yielded as they are decoded
+    yield from iter_response_items(r, keys=("results", "Result", "data"))
@@ -1,12 +1,6 @@
-import logging
-import os
-from typing import Any, Dict, List, Optional
+from .gdp import GdpConnector
 
-import requests
-
-logger = logging.getLogger(__name__)
-
-class VrConnector:
+class VrConnector(GdpConnector):
     """
     Connector for Vr (Vetenskapsrådet).
     """
@@ -14,21 +8,4 @@ class VrConnector:
     def __init__(self):
         self.name = "Vr"
         self.base_url = "https://api.vr.se/gdp_vr/utlysningar"
-
-    def fetch(self) -> List[Dict[str, Any]]:
-        """
-        Fetches data from VR.
-        """
-        api_key = os.getenv("VR_API_KEY")
-        if not api_key:
-            logger.error("Missing VR_API_KEY environment variable.")
-            return []
-
-        headers = {"Authorization": api_key}
-        try:
-            response = requests.get(self.base_url, headers=headers)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            logger.error(f"Error fetching data from {self.name}: {e}", exc_info=True)
-            return []
\ No newline at end of file
+        self.api_key_env = "VR_API_KEY"
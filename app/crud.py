@@ -1,14 +1,50 @@
 from __future__ import annotations
 
-from datetime import date
-from typing import Optional, Tuple, List
+import base64
+import hashlib
+import json
+import re
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple, List
 
-from sqlalchemy import select, func, and_, or_, cast, String, text
+from sqlalchemy import select, update, case, func, and_, or_, cast, Date, Integer, String, text, JSON, bindparam, literal, literal_column, tuple_, type_coerce, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Session
 
-from . import models
+from . import dates, models
+from .cache import QueryCache, bump_dataset_version, dataset_version
 from .schemas import OpportunityIn
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+BULK_CHUNK_SIZE = 500
+
+# Text search configurations the query is parsed with (OR-ed together).
+# Must match the configs used for the search_tsv column built in main.py.
+FTS_CONFIGS = ("english", "swedish", "simple")
+
+class CursorError(ValueError):
+    """Malformed or mismatched pagination cursor (client error)."""
+
+class FieldsError(ValueError):
+    """Unusable sparse fieldset (client error)."""
+
+# Default pg_trgm word-similarity threshold for match=fuzzy (0..1)
+FUZZY_THRESHOLD = 0.3
+
+_WORD_RE = re.compile(r"\w{3,}", re.UNICODE)
+
+# database URL -> pg_trgm installed, looked up once per process (see _has_trgm)
+_trgm_installed: Dict[str, bool] = {}
+
+# total="estimate": counts cached per filter signature
+COUNT_CACHE_TTL = 300.0
+COUNT_CACHE_MAX = 1024
+_count_cache = QueryCache(maxsize=COUNT_CACHE_MAX, ttl=COUNT_CACHE_TTL)  # locked: handlers count on worker threads
+
 
 # --------------------------- helpers ---------------------------
 
@@ -23,34 +59,216 @@ def _coerce_date(v) -> Optional[date]:
     except Exception:
         return None
 
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+def _fts_query(term: str):
+    """websearch-style tsquery over all configured languages."""
+    tsq = None
+    for cfg in FTS_CONFIGS:
+        part = func.websearch_to_tsquery(text(f"'{cfg}'::regconfig"), term)
+        tsq = part if tsq is None else tsq.op("||")(part)
+    return tsq
+
+def _has_trgm(db: Session):
+    """
+    Whether pg_trgm is installed (init_db skips it where it is unavailable).
+    Looked up once per database; a query step generator (see run_steps).
+    """
+    if _dialect(db) != "postgresql":
+        return False
+    key = db.get_bind().url.render_as_string()
+    if key not in _trgm_installed:
+        _trgm_installed[key] = (yield ("first", text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))) is not None
+    return _trgm_installed[key]
+
+def _fuzzy_cols():
+    """Columns searched in match=fuzzy mode (each has a gin_trgm_ops index)."""
+    O = models.Opportunity
+    # Inline the key literal so the expression matches the index definition
+    t_en = O.title.op("->>")(literal_column("'en'"))
+    t_sv = O.title.op("->>")(literal_column("'sv'"))
+    return [t_en, t_sv, O.sponsor, O.programme]
+
+def encode_cursor(sort: str, row: models.Opportunity) -> str:
+    """Opaque keyset token: the sort mode, the last row's sort key and its id (tie-breaker)."""
+    key = None
+    if sort in ("deadline_asc", "deadline_desc"):
+        key = row.closes_at.isoformat() if row.closes_at else None
+    raw = json.dumps([sort, key, row.id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(cursor: str, sort: str) -> Tuple[Optional[date], str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        c_sort, key, last_id = json.loads(raw)
+    except Exception:
+        raise CursorError("invalid cursor")
+    if c_sort != sort:
+        raise CursorError(f"cursor was issued for sort={c_sort}, not sort={sort}")
+    return _coerce_date(key), str(last_id)
+
+def _keyset_cond(sort: str, cursor: str, ranked: bool = False):
+    """
+    WHERE clauses selecting rows strictly after the cursor position, mirroring
+    the ORDER BY of each sort mode (closes_at NULLS LAST, then id), as
+    (after, tail). From a dated row of a deadline sort, `after` is a plain
+    (closes_at, id) row range, which the matching index can bound, and `tail`
+    the undated rows that follow all of them; otherwise tail is None.
+    """
+    O = models.Opportunity
+    key, last_id = _decode_cursor(cursor, sort)
+    if sort == "deadline_asc":
+        if key is None:
+            return and_(O.closes_at.is_(None), O.id > last_id), None
+        return tuple_(O.closes_at, O.id) > tuple_(key, last_id), O.closes_at.is_(None)
+    if sort == "deadline_desc":
+        if key is None:
+            return and_(O.closes_at.is_(None), O.id < last_id), None
+        return tuple_(O.closes_at, O.id) < tuple_(key, last_id), O.closes_at.is_(None)
+    if ranked:
+        raise CursorError(f"cursor pagination is not supported for sort={sort}")
+    return O.id < last_id, None
+
+def _explain(db, stmt) -> Tuple[str, Any]:
+    """EXPLAIN (FORMAT JSON) SQL for stmt, with parameters in the driver's style."""
+    compiled = stmt.compile(dialect=db.get_bind().dialect)
+    params = compiled.params
+    if compiled.positiontup is not None:  # asyncpg ($1, $2, ...)
+        params = tuple(params[k] for k in compiled.positiontup)
+    return "EXPLAIN (FORMAT JSON) " + str(compiled), params
+
+def _plan_rows(plan) -> int:
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+def _planner_estimate(db: Session, stmt) -> Optional[int]:
+    """Postgres planner row estimate for stmt (EXPLAIN, nothing is executed)."""
+    sql, params = _explain(db, stmt)
+    try:
+        # Savepoint: a failed EXPLAIN must not leave the transaction aborted
+        with db.begin_nested():
+            return _plan_rows(db.connection().exec_driver_sql(sql, params).scalar_one())
+    except Exception:
+        return None
+
+async def _planner_estimate_async(db: "AsyncSession", stmt) -> Optional[int]:
+    sql, params = _explain(db, stmt)
+    try:
+        async with db.begin_nested():
+            conn = await db.connection()
+            return _plan_rows((await conn.exec_driver_sql(sql, params)).scalar_one())
+    except Exception:
+        return None
+
+def _estimate_count(db: Session, stmt, signature: tuple):
+    """
+    Cached count for this filter signature (dropped when the dataset changes);
+    else planner estimate (PG) or exact count. A query step generator (see run_steps).
+    """
+    key = ("count", dataset_version(), signature)
+    hit, n = _count_cache.get(key)
+    if hit:
+        return n
+    n = (yield ("explain", stmt)) if _dialect(db) == "postgresql" else None
+    if n is None:
+        n = yield ("scalar", select(func.count()).select_from(stmt.subquery()))
+    _count_cache.set(key, n)
+    return n
+
+def _json_array_match(db: Session, col, values: List[str], mode: str = "any"):
+    """
+    Exact element match on a JSON array column: any/all of `values` present.
+    Postgres: JSONB ?| / @> (GIN-indexed). Elsewhere: json_each subquery.
+    """
+    if _dialect(db) == "postgresql":
+        col = type_coerce(col, JSONB)  # JSON/JSONB variant column: use the JSONB operators
+        if mode == "all":
+            return col.contains(values)
+        return col.has_any(postgresql.array(values))
+    tv = func.json_each(col).table_valued("value")
+    hits = select(func.count(tv.c.value.distinct())).where(tv.c.value.in_(values)).scalar_subquery()
+    return hits == len(set(values)) if mode == "all" else hits > 0
+
+def field_columns(fields: List[str]) -> list:
+    """
+    SQL projection for a sparse fieldset. Each entry is a column name, an
+    "extra" key, or a dotted JSON path into either ("title.en",
+    "links.landing", "documents"); the expression for fields[i] is labeled
+    "f{i}". id and closes_at are always selected (identity and cursors).
+    """
+    O = models.Opportunity
+    cols = models.Opportunity.__table__.columns
+    out = [O.id.label("id"), O.closes_at.label("closes_at")]
+    for i, f in enumerate(fields):
+        head, *rest = f.split(".")
+        if head in cols and head != "extra":
+            col = getattr(O, head)
+            if rest and not isinstance(col.type, JSON):
+                raise FieldsError(f"{head} has no nested fields")
+            expr = col[tuple(rest)] if rest else col
+        else:
+            # Keys stored in the extra column are served at top level
+            expr = O.extra[(head, *rest)]
+        out.append(expr.label(f"f{i}"))
+    return out
+
 def _ilike(col, term: str):
     """Portable case-insensitive LIKE."""
     # Using lower() LIKE for portability (instead of ILIKE which is PG-only in some dialects)
     return func.lower(col).like(f"%{term.lower()}%")
 
 
+def _split_payload(data: OpportunityIn) -> Tuple[dict, dict]:
+    """Dump an OpportunityIn into (column values, extras for the "extra" column)."""
+    payload = data.model_dump()
+
+    # Ensure date types for the DB Date columns. Normalizer output carries its
+    # dates as opening_date / deadline_date (kept in "extra"); the columns are
+    # what sorting, deadline filters and recompute_status read, so fill them.
+    payload["opens_at"] = _coerce_date(payload.get("opens_at") or payload.get("opening_date"))
+    payload["closes_at"] = _coerce_date(payload.get("closes_at") or payload.get("deadline_date"))
+
+    # Separate unknown keys into the "extra" JSON column
+    cols = set(c.name for c in models.Opportunity.__table__.columns) - {"content_hash"}
+    extras = {k: payload.pop(k) for k in list(payload.keys()) if k not in cols}
+    return payload, extras
+
+
+def _content_hash(payload: dict) -> str:
+    """
+    Stable sha256 over an incoming record (columns + its own extras). Equal to the
+    stored content_hash means re-applying the record would not change the row.
+    """
+    body = {k: v for k, v in payload.items() if k != "content_hash"}
+    raw = json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
 # --------------------------- write path ---------------------------
 
 def upsert_opportunity(db: Session, data: OpportunityIn) -> models.Opportunity:
     """
     Idempotent upsert keyed on source_uid.
     Coerces date strings to date objects for Date columns.
+    A record whose content hash matches the stored row is a no-op; otherwise
+    only the columns that actually differ are written.
     """
-    payload = data.model_dump()
-
-    # Ensure date types for the DB Date columns
-    payload["opens_at"] = _coerce_date(payload.get("opens_at"))
-    payload["closes_at"] = _coerce_date(payload.get("closes_at"))
-
-    # Separate unknown keys into the "extra" JSON column
-    cols = set(c.name for c in models.Opportunity.__table__.columns)
-    extras = {k: payload.pop(k) for k in list(payload.keys()) if k not in cols}
+    payload, extras = _split_payload(data)
+    payload["extra"] = extras
+    payload["content_hash"] = _content_hash(payload)
 
     O = models.Opportunity
-    obj = db.query(O).filter(O.source_uid == data.source_uid).one_or_none()
+    obj = db.query(O).filter(O.source_uid == data.source_uid).with_for_update().one_or_none()
+    if obj is not None and obj.content_hash == payload["content_hash"]:
+        return obj
+
+    delta = _facet_keys(payload)
+    if obj is not None:
+        delta.subtract(_facet_keys(obj))
 
     if obj is None:
-        payload["extra"] = extras
         obj = O(**payload)
         db.add(obj)
     else:
@@ -59,16 +277,241 @@ def upsert_opportunity(db: Session, data: OpportunityIn) -> models.Opportunity:
         merged_extra.update(extras)
         payload["extra"] = merged_extra
         for k, v in payload.items():
-            setattr(obj, k, v)
+            if getattr(obj, k) != v:
+                setattr(obj, k, v)
 
+    _index_words(db, [payload])
+    _apply_facet_delta(db, delta)
     db.commit()
+    bump_dataset_version()
     db.refresh(obj)
     return obj
 
 
+def _index_words(db: Session, rows: Iterable[dict]) -> None:
+    """
+    Add words from titles/sponsor/programme to the search_words vocabulary
+    used for "did you mean" suggestions (Postgres only; no-op elsewhere).
+    """
+    if _dialect(db) != "postgresql":
+        return
+    words = set()
+    for r in rows:
+        title = r.get("title") or {}
+        for s in (title.get("en"), title.get("sv"), r.get("sponsor"), r.get("programme")):
+            if s:
+                words.update(w.lower() for w in _WORD_RE.findall(s))
+    if not words:
+        return
+    db.execute(
+        text("INSERT INTO search_words (word) SELECT unnest(CAST(:words AS text[])) ON CONFLICT DO NOTHING"),
+        {"words": sorted(words)},
+    )
+
+
+def _locked_rows(db: Session, uids: List[str]) -> Dict[str, Any]:
+    """
+    Stored rows for these source_uids, locked until commit (FOR UPDATE, in
+    source_uid order, so concurrent writers always lock in the same order).
+    """
+    O = models.Opportunity
+    stmt = select(O.__table__).where(O.source_uid.in_(uids)).order_by(O.source_uid).with_for_update()
+    return {r.source_uid: r._mapping for r in db.execute(stmt)}
+
+
+def _upsert_rows(db: Session, rows: List[dict]) -> Tuple[Dict[str, str], Counter, List[dict]]:
+    """
+    Write a chunk of rows; returns (source_uid -> "inserted" | "updated" |
+    "unchanged", facet_counts delta, rows written).
+
+    Rows whose content_hash matches the stored one are skipped. Changed rows get
+    an UPDATE of just the differing columns (executemany, grouped by column set),
+    so untouched JSON/TOASTed values are not rewritten. New rows go through
+    INSERT ... ON CONFLICT DO NOTHING; a row another writer inserted first is
+    then updated like any other. The facet delta is taken from the locked rows
+    actually replaced, so concurrent writers cannot make it drift.
+    """
+    dialect = db.get_bind().dialect.name
+    O = models.Opportunity
+    T = O.__table__
+    by_uid = {r["source_uid"]: r for r in rows}
+    old = _locked_rows(db, list(by_uid))
+
+    outcome: Dict[str, str] = {}
+    delta = Counter()
+    new_rows = [r for uid, r in by_uid.items() if uid not in old]
+    if new_rows:
+        ins = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = ins(O).values(new_rows).on_conflict_do_nothing(index_elements=["source_uid"]).returning(O.source_uid)
+        for uid in db.execute(stmt).scalars():
+            outcome[uid] = "inserted"
+            delta.update(_facet_keys(by_uid[uid]))
+        raced = [r["source_uid"] for r in new_rows if r["source_uid"] not in outcome]
+        if raced:
+            old.update(_locked_rows(db, raced))
+
+    updates: Dict[tuple, List[dict]] = {}  # changed column set -> bind params
+    for uid, prev in old.items():
+        r = by_uid[uid]
+        if prev["content_hash"] == r["content_hash"]:
+            outcome[uid] = "unchanged"
+            continue
+        new = {**r, "extra": {**(prev["extra"] or {}), **r["extra"]}}
+        diff = {k: v for k, v in new.items() if k != "source_uid" and prev[k] != v}
+        updates.setdefault(tuple(sorted(diff)), []).append(
+            {"b_source_uid": uid, **{f"b_{k}": v for k, v in diff.items()}}
+        )
+        outcome[uid] = "updated"
+        delta.subtract(_facet_keys(dict(prev)))
+        delta.update(_facet_keys(r))
+    for cols, params in updates.items():
+        stmt = (
+            T.update()
+            .where(T.c.source_uid == bindparam("b_source_uid"))
+            .values({k: bindparam(f"b_{k}") for k in cols})
+        )
+        db.execute(stmt, params)
+    written = [by_uid[uid] for uid, st in outcome.items() if st != "unchanged"]
+    return outcome, delta, written
+
+
+def upsert_many(
+    db: Session,
+    items: Iterable[Any],
+    *,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> List[Dict[str, Any]]:
+    """
+    Set-based upsert keyed on source_uid.
+
+    Accepts OpportunityIn instances or plain dicts (validated here) and returns
+    one result per input, in input order:
+        {"index": i, "id": ..., "source_uid": ..., "ok": bool, "error": str|None,
+         "status": "inserted" | "updated" | "unchanged" | None}
+
+    Rows are written in source_uid order in chunks, each chunk in its own
+    savepoint. If a chunk fails, its rows are retried one by one so a single bad
+    record does not take the rest of the batch down with it. Records identical
+    to the stored row (same content hash) are not written at all. The facet
+    summary and search vocabulary are updated once, just before the commit.
+    """
+    results: List[Dict[str, Any]] = []
+    pending: Dict[str, Tuple[List[int], dict]] = {}  # source_uid -> (result indexes, row)
+
+    for i, item in enumerate(items):
+        res = {"index": i, "id": None, "source_uid": None, "ok": False, "error": None, "status": None}
+        results.append(res)
+        try:
+            data = item if isinstance(item, OpportunityIn) else OpportunityIn.model_validate(item)
+        except Exception as e:
+            res["error"] = str(e)
+            continue
+        payload, extras = _split_payload(data)
+        payload["extra"] = extras
+        res["id"], res["source_uid"] = data.id, data.source_uid
+
+        # ON CONFLICT cannot touch the same row twice in one statement:
+        # fold duplicates within the batch, later values win (like sequential upserts).
+        idxs = [i]
+        prev = pending.pop(data.source_uid, None)
+        if prev is not None:
+            idxs = prev[0] + idxs
+            payload["extra"] = {**prev[1]["extra"], **extras}
+        payload["content_hash"] = _content_hash(payload)
+        pending[data.source_uid] = (idxs, payload)
+
+    # One lock order for every writer: rows by source_uid, then facet rows (sorted) at the end
+    batch = [pending[uid] for uid in sorted(pending)]
+    delta = Counter()
+    written: List[dict] = []
+    for start in range(0, len(batch), max(1, chunk_size)):
+        chunk = batch[start:start + chunk_size]
+        try:
+            with db.begin_nested():
+                outcome, d, w = _upsert_rows(db, [row for _, row in chunk])
+            delta.update(d)  # update() adds negative counts too
+            written += w
+            for idxs, row in chunk:
+                for idx in idxs:
+                    results[idx]["ok"], results[idx]["status"] = True, outcome[row["source_uid"]]
+            continue
+        except Exception:
+            pass
+        # Pinpoint the failing rows
+        for idxs, row in chunk:
+            try:
+                with db.begin_nested():
+                    outcome, d, w = _upsert_rows(db, [row])
+                delta.update(d)
+                written += w
+                ok, err, status = True, None, outcome[row["source_uid"]]
+            except Exception as e:
+                ok, err, status = False, str(getattr(e, "orig", None) or e), None
+            for idx in idxs:
+                results[idx]["ok"], results[idx]["error"], results[idx]["status"] = ok, err, status
+
+    _index_words(db, written)
+    _apply_facet_delta(db, delta)
+    db.commit()
+    if written:
+        bump_dataset_version()
+    return results
+
+
 # --------------------------- read/search path ---------------------------
+# The read path is written once, as generators that yield query steps
+# (kind, statement) and are sent each step's result. run_steps drives them on
+# a Session, run_steps_async awaits every step natively on an AsyncSession.
+
+def run_steps(db: Session, steps):
+    """Drive a query step generator on a sync Session; returns its return value."""
+    result = None
+    try:
+        while True:
+            kind, arg = steps.send(result)
+            if kind == "explain":
+                result = _planner_estimate(db, arg)
+            elif kind == "get":
+                result = db.get(*arg)
+            elif kind == "call":
+                result = arg(db)
+            else:
+                result = _step_result(kind, db.execute(arg))
+    except StopIteration as done:
+        return done.value
+
 
-def search_opportunities(
+async def run_steps_async(db: "AsyncSession", steps):
+    """Drive a query step generator on an AsyncSession; each step is awaited."""
+    result = None
+    try:
+        while True:
+            kind, arg = steps.send(result)
+            if kind == "explain":
+                result = await _planner_estimate_async(db, arg)
+            elif kind == "get":
+                result = await db.get(*arg)
+            elif kind == "call":
+                result = await db.run_sync(arg)
+            else:
+                result = _step_result(kind, await db.execute(arg))
+    except StopIteration as done:
+        return done.value
+
+
+def _step_result(kind: str, result):
+    if kind == "all":
+        return result.all()
+    if kind == "scalars":
+        return result.scalars().all()
+    if kind == "scalar":
+        return result.scalar_one()
+    if kind == "first":
+        return result.first()
+    return None  # "execute"
+
+
+def _search_conditions(
     db: Session,
     *,
     q: Optional[str] = None,
@@ -76,25 +519,21 @@ def search_opportunities(
     sponsor: Optional[str] = None,
     programme: Optional[str] = None,
     tag: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    tag_mode: str = "any",
+    topic_codes: Optional[List[str]] = None,
     deadline_before: Optional[str] = None,
     deadline_after: Optional[str] = None,
-    sort: str = "recent",         # recent | deadline_asc | deadline_desc
-    page: int = 1,
-    page_size: int = 20,
-) -> Tuple[List[models.Opportunity], int]:
+    match: str = "text",
+    threshold: float = FUZZY_THRESHOLD,
+):
     """
-    Full-featured search with filters + sorting + pagination.
-    - Text search over title/summary in sv/en (JSON->>key)
-    - Filters: status, sponsor, programme, tag, deadline range
-    - Sorting: recent (by id desc), deadline_asc, deadline_desc
-    - Pagination: page/page_size
+    WHERE conditions for the search filters, plus the relevance expression (or
+    None). A query step generator (see run_steps): fuzzy matching first sets
+    the transaction's similarity threshold, or falls back to ILIKE where
+    pg_trgm is not installed.
     """
-    page = max(1, page)
-    page_size = max(1, min(page_size, 100))
-    offset = (page - 1) * page_size
-
     O = models.Opportunity
-    stmt = select(O)
     conds = []
 
     # Filters
@@ -104,10 +543,12 @@ def search_opportunities(
         conds.append(O.sponsor == sponsor)
     if programme:
         conds.append(O.programme == programme)
-    if tag:
-        from sqlalchemy import text
-        # Portable: LOWER(CAST(tags AS TEXT)) LIKE '%tag%'
-        conds.append(func.lower(cast(O.tags, String)).like(f"%{tag.lower()}%"))
+    # Exact tag / topic code membership (no substring matches)
+    tag_values = list(tags or []) + ([tag] if tag else [])
+    if tag_values:
+        conds.append(_json_array_match(db, O.tags, tag_values, tag_mode))
+    if topic_codes:
+        conds.append(_json_array_match(db, O.topic_codes, list(topic_codes), "any"))
 
     # Deadline window (strings → Python dates, compare with Date column)
     d_after = _coerce_date(deadline_after)
@@ -119,32 +560,196 @@ def search_opportunities(
         conds.append(O.closes_at.isnot(None))
         conds.append(O.closes_at <= d_before)
 
-    # Free-text search across localized title/summary (Postgres JSON ->> operator)
-    if q:
+    # Free-text search across localized title/summary
+    rank = None
+    fuzzy = bool(q) and match == "fuzzy"
+    if fuzzy and (yield from _has_trgm(db)):
+        # <% uses pg_trgm.word_similarity_threshold and can use the trigram indexes
+        yield ("execute", text("SELECT set_config('pg_trgm.word_similarity_threshold', :t, true)").bindparams(
+            t=str(max(0.0, min(threshold, 1.0)))
+        ))
+        cols = _fuzzy_cols()
+        conds.append(or_(*[literal(q, String).op("<%")(c) for c in cols]))
+        rank = func.greatest(*[func.word_similarity(q, c) for c in cols])
+    elif q and not fuzzy and _dialect(db) == "postgresql":
+        tsv = literal_column("opportunities.search_tsv")
+        tsq = _fts_query(q)
+        conds.append(tsv.op("@@")(tsq))
+        rank = func.ts_rank(tsv, tsq)
+    elif fuzzy:  # no pg_trgm: substring match over the same columns
+        conds.append(or_(*[_ilike(c, q) for c in _fuzzy_cols()]))
+    elif q:
         t_en = O.title.op("->>")("en")
         t_sv = O.title.op("->>")("sv")
         s_en = O.summary.op("->>")("en")
         s_sv = O.summary.op("->>")("sv")
         conds.append(or_(_ilike(t_en, q), _ilike(t_sv, q), _ilike(s_en, q), _ilike(s_sv, q)))
 
+    return conds, rank
+
+
+def _search_steps(
+    db,
+    *,
+    q: Optional[str] = None,
+    status: Optional[str] = None,
+    sponsor: Optional[str] = None,
+    programme: Optional[str] = None,
+    tag: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    tag_mode: str = "any",        # any | all
+    topic_codes: Optional[List[str]] = None,
+    deadline_before: Optional[str] = None,
+    deadline_after: Optional[str] = None,
+    sort: str = "recent",         # recent | deadline_asc | deadline_desc | relevance
+    match: str = "text",          # text | fuzzy
+    threshold: float = FUZZY_THRESHOLD,
+    page: int = 1,
+    page_size: int = 20,
+    cursor: Optional[str] = None,
+    total_mode: str = "exact",    # exact | estimate | none
+    fields: Optional[List[str]] = None,
+):
+    """
+    Full-featured search with filters + sorting + pagination (query steps of
+    search_opportunities / search_opportunities_async, see run_steps).
+    - Text search over title/summary in sv/en: Postgres full-text search on the
+      weighted search_tsv column (GIN-indexed); LIKE over JSON->>key elsewhere
+    - match="fuzzy": typo-tolerant pg_trgm word similarity over titles, sponsor
+      and programme (trigram-indexed), ranked by similarity above `threshold`
+    - Filters: status, sponsor, programme, deadline range, exact tag membership
+      (tag / tags with tag_mode any|all) and topic_codes (any)
+    - Sorting: recent (by id desc), deadline_asc, deadline_desc,
+      relevance (ts_rank; falls back to recent without a query or on SQLite)
+    - Pagination: page/page_size, or keyset via `cursor` (from encode_cursor of the
+      previous page's last row; page is then ignored). Raises CursorError on a bad cursor.
+    - total_mode: "exact" (count(*) OVER () in the page query), "estimate" (cached
+      per filter signature / planner estimate) or "none" (total is None)
+    - fields: sparse fieldset (see field_columns); rows are then Row objects
+      carrying only those columns instead of full ORM instances
+    """
+    page = max(1, page)
+    page_size = max(1, min(page_size, 100))
+    offset = (page - 1) * page_size
+
+    O = models.Opportunity
+    conds, rank = yield from _search_conditions(
+        db, q=q, status=status, sponsor=sponsor, programme=programme, tag=tag,
+        tags=tags, tag_mode=tag_mode, topic_codes=topic_codes,
+        deadline_before=deadline_before, deadline_after=deadline_after,
+        match=match, threshold=threshold,
+    )
+    stmt = select(*field_columns(fields)) if fields else select(O)
     if conds:
         stmt = stmt.where(and_(*conds))
+    if cursor:
+        offset = 0
 
     # Sorting
-    if sort == "deadline_asc":
-        stmt = stmt.order_by(O.closes_at.asc().nulls_last())
+    if sort == "relevance" and rank is not None:
+        stmt = stmt.order_by(rank.desc(), O.id.desc())
+    elif sort == "deadline_asc":
+        stmt = stmt.order_by(O.closes_at.asc().nulls_last(), O.id.asc())
     elif sort == "deadline_desc":
-        stmt = stmt.order_by(O.closes_at.desc().nulls_last())
+        stmt = stmt.order_by(O.closes_at.desc().nulls_last(), O.id.desc())
     else:
         # "recent" proxy until an updated_at field exists
         stmt = stmt.order_by(O.id.desc())
 
-    # Count + page
-    total = db.execute(select(func.count()).select_from(stmt.subquery())).scalar_one()
-    rows = db.execute(stmt.offset(offset).limit(page_size)).scalars().all()
+    # Count + page (total covers the whole filtered set, not just what follows the cursor)
+    total = None
+    if total_mode == "estimate":
+        signature = (
+            q, status, sponsor, programme, tag, tuple(tags or ()), tag_mode, tuple(topic_codes or ()),
+            deadline_before, deadline_after, match, threshold,
+        )
+        total = yield from _estimate_count(db, stmt, signature)
+    elif total_mode == "exact" and cursor:
+        # The keyset condition would shrink a window count; count separately
+        total = yield ("scalar", select(func.count()).select_from(stmt.subquery()))
+
+    tail = None
+    if cursor:
+        after, tail = _keyset_cond(sort, cursor, ranked=sort == "relevance" and rank is not None)
+        if tail is not None:
+            tail = stmt.where(tail)
+        stmt = stmt.where(after)
+
+    if total_mode == "exact" and total is None:
+        # One round trip: the window count is evaluated before LIMIT/OFFSET
+        result = yield ("all", stmt.add_columns(func.count().over().label("_total")).offset(offset).limit(page_size))
+        rows = result if fields else [r[0] for r in result]
+        if result:
+            total = result[0][-1]
+        elif offset:
+            # Paged past the end: no row to carry the window count
+            total = yield ("scalar", select(func.count()).select_from(stmt.subquery()))
+        else:
+            total = 0
+        return rows, total
+
+    kind = "all" if fields else "scalars"
+    rows = yield (kind, stmt.offset(offset).limit(page_size))
+    if tail is not None and len(rows) < page_size:
+        # Past the last dated row: continue into the undated ones
+        rows = list(rows) + (yield (kind, tail.limit(page_size - len(rows))))
     return rows, total
 
 
+def search_opportunities(db: Session, **kwargs) -> Tuple[List[Any], Optional[int]]:
+    """Search with filters, sorting and pagination; keyword arguments as in _search_steps."""
+    return run_steps(db, _search_steps(db, **kwargs))
+
+
+async def search_opportunities_async(db: "AsyncSession", **kwargs) -> Tuple[List[Any], Optional[int]]:
+    return await run_steps_async(db, _search_steps(db, **kwargs))
+
+
+def _get_steps(oid: str, fields: Optional[List[str]] = None):
+    if fields:
+        O = models.Opportunity
+        return (yield ("first", select(*field_columns(fields)).where(O.id == oid)))
+    return (yield ("get", (models.Opportunity, oid)))
+
+
+def get_opportunity(db: Session, oid: str, fields: Optional[List[str]] = None) -> Optional[Any]:
+    return run_steps(db, _get_steps(oid, fields))
+
+
+async def get_opportunity_async(db: "AsyncSession", oid: str, fields: Optional[List[str]] = None) -> Optional[Any]:
+    return await run_steps_async(db, _get_steps(oid, fields))
+
+
+def _suggest_steps(db, q: str, threshold: float = FUZZY_THRESHOLD):
+    """
+    "Did you mean": replace each query word with its nearest vocabulary word
+    (KNN over the GiST trigram index on search_words). Returns None when nothing
+    better is found or pg_trgm is not available.
+    """
+    if not q or not (yield from _has_trgm(db)):
+        return None
+    out, changed = [], False
+    for word in q.split():
+        best = yield ("first", text(
+            "SELECT word, similarity(word, :w) AS sim FROM search_words "
+            "ORDER BY word <-> :w LIMIT 1"
+        ).bindparams(w=word.lower()))
+        if best and best.sim >= threshold and best.word != word.lower():
+            out.append(best.word)
+            changed = True
+        else:
+            out.append(word)
+    return " ".join(out) if changed else None
+
+
+def suggest_query(db: Session, q: str, threshold: float = FUZZY_THRESHOLD) -> Optional[str]:
+    return run_steps(db, _suggest_steps(db, q, threshold))
+
+
+async def suggest_query_async(db: "AsyncSession", q: str, threshold: float = FUZZY_THRESHOLD) -> Optional[str]:
+    return await run_steps_async(db, _suggest_steps(db, q, threshold))
+
+
 def list_opportunities(db: Session, limit: int = 50, offset: int = 0) -> List[models.Opportunity]:
     """Simple listing (older fallback)."""
     O = models.Opportunity
@@ -157,38 +762,302 @@ def list_opportunities(db: Session, limit: int = 50, offset: int = 0) -> List[mo
     )
 
 
-def get_facets(db: Session) -> dict:
-    """Collect distinct values used for filtering (facets)."""
+# --------------------------- facets ---------------------------
+
+# facet_counts.dimension -> key in the /facets response
+FACET_DIMENSIONS = {"sponsor": "sponsors", "programme": "programmes", "status": "statuses", "tag": "tags"}
+
+
+def _facet_keys(row) -> Counter:
+    """(dimension, value) pairs a single opportunity contributes to the facet summary."""
+    get = row.get if isinstance(row, dict) else lambda k: getattr(row, k, None)
+    keys = Counter()
+    for dim in ("sponsor", "programme", "status"):
+        if get(dim) is not None:
+            keys[(dim, get(dim))] += 1
+    for tag in set(get("tags") or []):
+        keys[("tag", tag)] += 1
+    return keys
+
+
+def _tag_values(db: Session):
+    """Table-valued expansion of the tags JSON array (one row per element, column "value")."""
     O = models.Opportunity
+    if _dialect(db) == "postgresql":
+        return func.jsonb_array_elements_text(O.tags).table_valued("value")
+    return func.json_each(O.tags).table_valued("value")
+
+
+def _apply_facet_delta(db: Session, delta: Counter) -> None:
+    """Add per-(dimension, value) document count changes to facet_counts."""
+    delta = Counter({k: v for k, v in delta.items() if v})
+    if not delta:
+        return
+    F = models.FacetCount
+    dialect = _dialect(db)
+    ins = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = ins(F).values([  # sorted: concurrent writers lock the facet rows in the same order
+        {"dimension": dim, "value": val, "doc_count": n} for (dim, val), n in sorted(delta.items())
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["dimension", "value"],
+        set_={"doc_count": F.doc_count + stmt.excluded.doc_count},
+    )
+    db.execute(stmt)
+    db.execute(
+        F.__table__.delete().where(
+            F.doc_count <= 0,
+            tuple_(F.dimension, F.value).in_(list(delta)),
+        )
+    )
 
-    sponsors = [
-        r[0]
-        for r in db.query(O.sponsor)
-        .filter(O.sponsor.isnot(None))
-        .distinct()
-        .order_by(O.sponsor)
+
+def refresh_facets(db: Session) -> None:
+    """Rebuild facet_counts from scratch with GROUP BY queries (startup / repair)."""
+    O, F = models.Opportunity, models.FacetCount
+    parts = [
+        select(literal(dim, String), col, func.count())
+        .where(col.isnot(None))
+        .group_by(col)
+        for dim, col in (("sponsor", O.sponsor), ("programme", O.programme), ("status", O.status))
     ]
+    tv = _tag_values(db)
+    parts.append(
+        select(literal("tag", String), tv.c.value, func.count(O.id.distinct()))
+        .select_from(O)
+        .join(tv, literal(True))
+        .where(tv.c.value.isnot(None))
+        .group_by(tv.c.value)
+    )
+    db.execute(F.__table__.delete())
+    db.execute(
+        F.__table__.insert().from_select(["dimension", "value", "doc_count"], union_all(*parts))
+    )
+    db.commit()
+    bump_dataset_version()
 
-    programmes = [
-        r[0]
-        for r in db.query(O.programme)
-        .filter(O.programme.isnot(None))
-        .distinct()
-        .order_by(O.programme)
+
+def _live_facet_rows(db, conds: list, limit: Optional[int]):
+    """
+    (dimension, value, doc_count) for every facet over the rows matching conds,
+    in a single statement: the filtered set is a CTE scanned once per dimension
+    (UNION ALL, portable equivalent of GROUPING SETS), truncated to the top
+    `limit` values per dimension with row_number().
+    """
+    O = models.Opportunity
+    f = select(O.id, O.sponsor, O.programme, O.status, O.tags)
+    if conds:
+        f = f.where(and_(*conds))
+    f = f.cte("filtered")
+
+    if _dialect(db) == "postgresql":
+        tv = func.jsonb_array_elements_text(f.c.tags).table_valued("value")
+    else:
+        tv = func.json_each(f.c.tags).table_valued("value")
+    parts = [
+        select(literal(dim, String).label("dimension"), col.label("value"), func.count().label("doc_count"))
+        .where(col.isnot(None))
+        .group_by(col)
+        for dim, col in (("sponsor", f.c.sponsor), ("programme", f.c.programme), ("status", f.c.status))
     ]
+    parts.append(
+        select(literal("tag", String), tv.c.value, func.count(f.c.id.distinct()))
+        .select_from(f)
+        .join(tv, literal(True))
+        .where(tv.c.value.isnot(None))
+        .group_by(tv.c.value)
+    )
+    u = union_all(*parts).subquery("u")
+    stmt = select(u.c.dimension, u.c.value, u.c.doc_count)
+    if limit:
+        rn = func.row_number().over(
+            partition_by=u.c.dimension, order_by=(u.c.doc_count.desc(), u.c.value)
+        ).label("rn")
+        ranked = select(u.c.dimension, u.c.value, u.c.doc_count, rn).subquery("ranked")
+        stmt = select(ranked.c.dimension, ranked.c.value, ranked.c.doc_count).where(ranked.c.rn <= limit)
+    return stmt
+
+
+def _facets_steps(db, *, limit: Optional[int] = None, **filters):
+    """
+    Facet values with document counts, most frequent first in "counts"
+    (query steps of get_facets / get_facets_async, see run_steps).
+
+    Without filters this reads the precomputed facet_counts summary (built on
+    demand the first time it is found empty). With any search filter
+    (the keyword arguments of search_opportunities) all dimensions are counted
+    live over the matching rows in one query. `limit` keeps the top-N values
+    per dimension.
+    """
+    filters = {k: v for k, v in filters.items() if v not in (None, "", [])}
+    F = models.FacetCount
+    search_keys = (
+        "q", "status", "sponsor", "programme", "tag", "tags", "topic_codes", "deadline_before", "deadline_after",
+    )
+    if any(k in filters for k in search_keys):
+        conds, _ = yield from _search_conditions(db, **filters)
+        rows = yield ("all", _live_facet_rows(db, conds, limit))
+    else:
+        rows = yield ("all", select(F.dimension, F.value, F.doc_count))
+        if not rows and (yield ("first", select(models.Opportunity.id).limit(1))):
+            yield ("call", refresh_facets)
+            rows = yield ("all", select(F.dimension, F.value, F.doc_count))
+
+    counts: dict = {key: [] for key in FACET_DIMENSIONS.values()}
+    for dim, value, n in rows:
+        key = FACET_DIMENSIONS.get(dim)
+        if key:
+            counts[key].append({"value": value, "count": n})
+    out: dict = {}
+    for key, vals in counts.items():
+        vals.sort(key=lambda c: (-c["count"], c["value"]))
+        if limit:
+            del vals[limit:]
+        out[key] = sorted(c["value"] for c in vals)
+    out["counts"] = counts
+    return out
+
+
+def get_facets(db: Session, *, limit: Optional[int] = None, **filters) -> dict:
+    return run_steps(db, _facets_steps(db, limit=limit, **filters))
+
+
+async def get_facets_async(db: "AsyncSession", *, limit: Optional[int] = None, **filters) -> dict:
+    return await run_steps_async(db, _facets_steps(db, limit=limit, **filters))
+
+
+# --------------------------- sync state ---------------------------
+
+def get_sync_state(db: Session, source: str) -> Optional[models.SyncState]:
+    return db.get(models.SyncState, source)
+
+
+def set_watermark(db: Session, source: str, watermark: date) -> models.SyncState:
+    """Record the date the next incremental fetch of `source` should start from."""
+    state = db.get(models.SyncState, source)
+    if state is None:
+        state = models.SyncState(source=source)
+        db.add(state)
+    state.watermark = watermark
+    state.synced_at = datetime.now(timezone.utc)
+    db.commit()
+    db.refresh(state)
+    return state
+
+
+# --------------------------- maintenance ---------------------------
+
+# Statuses derived from the dates; anything else (e.g. "Cancelled") is left alone
+LIFECYCLE_STATUSES = ("forthcoming", "upcoming", "open", "closed", "unknown")
+
+
+def _valid_date(db: Session, s):
+    """
+    Condition that the text expression s is a real YYYY-MM-DD date. Portable
+    across Postgres versions (no pg_input_is_valid, which needs 16+): the
+    month-length check only runs, inside the CASE, on text already known to be
+    well-formed, so nothing is ever cast that could raise.
+    """
+    if _dialect(db) == "postgresql":
+        well_formed = and_(s.op("~")(r"^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])$"), func.substr(s, 1, 4) != "0000")
+        month = func.make_date(cast(func.substr(s, 1, 4), Integer), cast(func.substr(s, 6, 2), Integer), 1)
+        last_day = func.date_part("day", month + literal_column("interval '1 month - 1 day'"))
+        return case((well_formed, cast(func.substr(s, 9, 2), Integer) <= last_day), else_=False)
+    # With a modifier date() normalizes out-of-range days ("2025-02-30" -> "2025-03-02"), so only real dates round-trip
+    return and_(func.substr(s, 1, 4) != "0000", func.date(s, "+0 days") == s)
+
+
+def _deadline_values(db: Session):
+    """
+    Elements of each row's deadlines JSON array as (table-valued FROM, date
+    text, condition that the text is a real YYYY-MM-DD date).
+    """
+    O = models.Opportunity
+    if _dialect(db) == "postgresql":
+        arr = case((func.json_typeof(O.deadlines) == "array", O.deadlines), else_=literal_column("'[]'::json"))
+        tv = func.json_array_elements(arr).table_valued("value")
+        ds = tv.c.value.op("->>")("date")
+        return tv, ds, _valid_date(db, ds)
+    tv = func.json_each(O.deadlines).table_valued("value", "type")
+    ds = func.json_extract(tv.c.value, "$.date")
+    return tv, ds, and_(tv.c.type == "object", _valid_date(db, ds))
+
+
+def _as_date(db: Session, s):
+    return cast(s, Date) if _dialect(db) == "postgresql" else type_coerce(s, Date)
+
+
+def recompute_status(db: Session, today: Optional[date] = None, *, dry_run: bool = False) -> int:
+    """
+    Re-derive closes_at and status for every row from its stored deadlines and
+    opens_at, as of `today` (default: current UTC date), in one set-based UPDATE
+    that only touches rows whose values change. Returns the number of rows
+    changed (or that would change, with dry_run).
+
+    closes_at is the next deadline on or after today, else the latest past one
+    (rows without a valid deadline keep their closes_at); a deadline_date key
+    in "extra" (normalizer output, served at top level) is rewritten with it.
+    status follows the normalizers: Forthcoming before the opening date
+    (opens_at, else a valid extra opening_date for rows stored before the
+    columns were filled on ingest), Open until closes_at, Closed after it.
+    Rows without dates, or whose status is not one of LIFECYCLE_STATUSES, keep
+    their status, and a status that only differs in case is not rewritten.
+    """
+    O = models.Opportunity
+    today = today or dates.today()
+    tv, ds, valid = _deadline_values(db)
+    next_dl = select(func.min(ds)).select_from(tv).where(valid, ds >= today.isoformat()).scalar_subquery()
+    last_dl = select(func.max(ds)).select_from(tv).where(valid).scalar_subquery()
+    calc = select(O.id.label("id"), func.coalesce(next_dl, last_dl).label("deadline")).subquery("calc")
+
+    closes_at = func.coalesce(_as_date(db, calc.c.deadline), O.closes_at)
+    opening = O.extra["opening_date"].as_string()
+    opens_at = func.coalesce(O.opens_at, case((_valid_date(db, opening), _as_date(db, opening)), else_=None))
+    derived = case(
+        (opens_at > today, "Forthcoming"),
+        (closes_at >= today, "Open"),
+        (closes_at < today, "Closed"),
+        else_=O.status,
+    )
+    status = case(
+        (func.lower(O.status).notin_(LIFECYCLE_STATUSES), O.status),
+        (func.lower(derived) == func.lower(O.status), O.status),
+        else_=derived,
+    )
+    closes_text = cast(closes_at, String)
+    extra_deadline = O.extra["deadline_date"].as_string()
+    stale_extra = and_(extra_deadline.isnot(None), closes_at.isnot(None), extra_deadline != closes_text)
+    if _dialect(db) == "postgresql":
+        synced = cast(func.jsonb_set(cast(O.extra, JSONB), literal_column("'{deadline_date}'"), func.to_jsonb(closes_text)), JSON)
+    else:
+        synced = func.json_set(O.extra, "$.deadline_date", closes_text)
+    extra = case((stale_extra, synced), else_=O.extra)
+    changed = and_(
+        O.id == calc.c.id,
+        or_(closes_at.is_distinct_from(O.closes_at), status != O.status, stale_extra),
+    )
+
+    if dry_run:
+        return db.execute(select(func.count()).select_from(O).join(calc, O.id == calc.c.id).where(changed)).scalar_one()
+
+    n = db.execute(
+        update(O).where(changed).values(closes_at=closes_at, status=status, extra=extra),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    if n:
+        refresh_facets(db)  # status facet counts moved; commits and bumps the dataset version
+    else:
+        db.commit()
+    return n
+
+
+# --------------------------- async write path ---------------------------
+# Upserts are savepoint- and chunk-heavy and run on the ingest side as well;
+# the async handlers run them through run_sync rather than keep a second copy.
+
+async def upsert_opportunity_async(db: "AsyncSession", data: OpportunityIn) -> models.Opportunity:
+    return await db.run_sync(lambda s: upsert_opportunity(s, data))
+
 
-    statuses = [r[0] for r in db.query(O.status).distinct().order_by(O.status)]
-
-    tag_rows = db.query(O.tags).all()
-    tag_set = set()
-    for arr, in tag_rows:
-        if arr:
-            tag_set.update(arr)
-    tags = sorted(tag_set)
-
-    return {
-        "sponsors": sponsors,
-        "programmes": programmes,
-        "statuses": statuses,
-        "tags": tags,
-    }
+async def upsert_many_async(db: "AsyncSession", items: Iterable[Any], **kwargs) -> List[Dict[str, Any]]:
+    return await db.run_sync(lambda s: upsert_many(s, items, **kwargs))
@@ -0,0 +1,103 @@
+# app/dates.py
+"""
+Date parsing shared by the normalizers (app/normalize.py, app/normalize_utils.py).
+
+Source payloads repeat the same handful of date strings many times over (EU
+topics of one call share their deadline arrays), so:
+
+- ISO values ("2025-01-19", "2025-01-19T17:00:00+0100") take a regex fast path
+  and never reach strptime.
+- Everything else (EU "19 January 2025", odd formats) is parsed once per
+  distinct string through an LRU cache.
+- today() is fixed for the duration of a `with batch_today():` block, so a batch
+  is judged against one date instead of calling datetime.now() per record.
+"""
+from __future__ import annotations
+
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional
+
+# EU sometimes uses "19 January 2025", plus ISO strings; Vinnova uses ISO.
+DATE_FMTS = (
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M",
+    "%Y-%m-%d",
+    "%d %B %Y",      # 19 January 2025
+    "%d %b %Y",      # 19 Jan 2025
+)
+DATE_CACHE_SIZE = 4096
+
+_ISO_PREFIX_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_ISO_DATE_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+_TZ_RE = re.compile(r"([+-]\d{2})(\d{2})$")
+_ISO_ANYWHERE_RE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+
+_today: ContextVar[Optional[date]] = ContextVar("normalize_today", default=None)
+
+
+def today() -> date:
+    """Current UTC date, or the one pinned by the enclosing batch_today()."""
+    pinned = _today.get()
+    return pinned if pinned is not None else datetime.now(timezone.utc).date()
+
+
+@contextmanager
+def batch_today(day: Optional[date] = None) -> Iterator[date]:
+    """Pin today() for a batch (nested blocks keep the outer date unless given one)."""
+    token = _today.set(day or today())
+    try:
+        yield _today.get()
+    finally:
+        _today.reset(token)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_slow(s: str) -> Optional[str]:
+    s = s.strip()
+    s = _TZ_RE.sub(r"\1:\2", s)  # +0000 -> +00:00
+    if _ISO_PREFIX_RE.match(s):
+        return s[:10]
+    for fmt in DATE_FMTS:
+        try:
+            return datetime.strptime(s, fmt).date().isoformat()
+        except ValueError:
+            continue
+    m = _ISO_ANYWHERE_RE.search(s)  # last resort: yyyy-mm-dd somewhere in the string
+    return m.group(1) if m else None
+
+
+def parse_date_maybe(s: Optional[str]) -> Optional[str]:
+    """Best-effort "YYYY-MM-DD" for a source date string; None if it has no date."""
+    if not s:
+        return None
+    if _ISO_PREFIX_RE.match(s):  # no leading space, so strip/tz rewriting cannot change s[:10]
+        return s[:10]
+    return _parse_slow(s)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def to_date(s: str) -> Optional[date]:
+    """date for a "YYYY-MM-DD" string (strptime semantics), None if invalid."""
+    if _ISO_DATE_RE.fullmatch(s):
+        try:
+            return date(int(s[:4]), int(s[5:7]), int(s[8:]))
+        except ValueError:
+            return None
+    try:
+        return datetime.strptime(s, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def next_or_latest(values: Iterable[Optional[str]], on: Optional[date] = None) -> Optional[str]:
+    """Earliest date on or after `on` (default today()); if none, the latest past one."""
+    parsed = [d for d in (to_date(v) for v in values if v) if d is not None]
+    if not parsed:
+        return None
+    on = on or today()
+    future = [d for d in parsed if d >= on]
+    return (min(future) if future else max(parsed)).isoformat()
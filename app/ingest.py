@@ -0,0 +1,248 @@
+# app/ingest.py
+"""
+Concurrent multi-source ingest pipeline.
+
+    fetch (one thread per source) -> raw queue -> normalize workers
+        -> normalized queue -> upsert workers (per-source batches) -> sink
+
+With normalize_processes > 0 the normalize workers drain the raw queue in
+batches and hand them to normalize_many() on a shared process pool, so
+CPU-bound normalization (EU HTML parsing) uses more than one core.
+
+Queues are bounded, so a fast source blocks instead of buffering its whole
+payload when normalization or the sink falls behind. A source that raises is
+recorded in its stats and does not stop the others; so is an unexpected error
+in a normalize or upsert worker, which fails that batch and keeps draining its
+queue (a dead worker would leave the bounded queues full and the run hung).
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from .dates import batch_today, today
+from .normalize import MP_CONTEXT, normalize, normalize_many
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+# name -> (fetch callable, source hint passed to normalize())
+Sources = Dict[str, Tuple[Callable[[], Iterable[Dict[str, Any]]], Optional[str]]]
+# Receives one batch of normalized records and returns how many of them failed,
+# or a mapping with "failed" and optionally "inserted" / "updated" / "unchanged"
+Sink = Callable[[List[Dict[str, Any]]], Union[int, Mapping[str, int]]]
+
+
+@dataclass
+class SourceStats:
+    name: str
+    fetched: int = 0
+    normalized: int = 0
+    normalize_failed: int = 0
+    upserted: int = 0
+    upsert_failed: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    error: Optional[str] = None
+    started: float = 0.0
+    fetch_done: float = 0.0
+    finished: float = 0.0
+
+    @property
+    def seconds(self) -> float:
+        return max(self.finished - self.started, 0.0)
+
+    @property
+    def per_second(self) -> float:
+        return self.upserted / self.seconds if self.seconds else 0.0
+
+
+def run_pipeline(
+    sources: Sources,
+    sink: Sink,
+    *,
+    normalizer: Callable[..., Dict[str, Any]] = normalize,
+    normalize_workers: int = 2,
+    normalize_processes: int = 0,
+    upsert_workers: int = 2,
+    batch_size: int = 200,
+    queue_size: int = 1000,
+) -> Dict[str, SourceStats]:
+    """Run every source concurrently through fetch -> normalize -> sink; returns per-source stats."""
+    stats = {name: SourceStats(name) for name in sources}
+    run_day = today()  # the caller's batch_today() date, if any; worker threads do not inherit it
+    lock = threading.Lock()
+    raw_q: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    norm_q: "queue.Queue" = queue.Queue(maxsize=queue_size)
+
+    def fetch(name: str) -> None:
+        fetcher, _ = sources[name]
+        st = stats[name]
+        st.started = time.monotonic()
+        try:
+            for rec in fetcher():
+                raw_q.put((name, rec))
+                st.fetched += 1
+        except Exception as e:
+            logger.error("Fetch from %s failed after %d records: %s", name, st.fetched, e, exc_info=True)
+            st.error = f"{type(e).__name__}: {e}"
+        finally:
+            st.fetch_done = time.monotonic()
+
+    procs = None
+    if normalize_processes > 0:
+        procs = ProcessPoolExecutor(max_workers=normalize_processes, mp_context=MP_CONTEXT)
+
+    def fail(name: str, stage: str, count: int, e: Exception) -> None:
+        """Count `count` records of `name` as failed in `stage` after an unexpected worker error."""
+        logger.error("%s worker failed on %d %s records: %s", stage.capitalize(), count, name, e, exc_info=True)
+        with lock:
+            st = stats[name]
+            if stage == "normalize":
+                st.normalize_failed += count
+            else:
+                st.upsert_failed += count
+            st.error = st.error or f"{type(e).__name__}: {e}"
+
+    def emit(name: str, ok: bool, value: Any) -> None:
+        if not ok:
+            logger.warning("Normalize failed for %s record: %s", name, value)
+            with lock:
+                stats[name].normalize_failed += 1
+            return
+        with lock:
+            stats[name].normalized += 1
+        norm_q.put((name, value))
+
+    def normalize_worker() -> None:
+        with batch_today(run_day):  # one "today" for the run, as normalize_many pins one per chunk
+            while True:
+                item = raw_q.get()
+                if item is _DONE:
+                    return
+                name, rec = item
+                try:
+                    hint = sources[name][1]
+                    n = normalizer(rec, source=hint) if hint is not None else normalizer(rec)
+                except Exception as e:
+                    emit(name, False, e)
+                    continue
+                try:
+                    emit(name, True, n)
+                except Exception as e:
+                    fail(name, "normalize", 1, e)
+
+    def normalize_batch_worker() -> None:
+        done = False
+        while not done:
+            item = raw_q.get()
+            if item is _DONE:
+                return
+            batch = [item]
+            while len(batch) < batch_size:
+                try:
+                    item = raw_q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _DONE:
+                    done = True
+                    break
+                batch.append(item)
+            by_source: Dict[str, List[Dict[str, Any]]] = {}
+            for name, rec in batch:
+                by_source.setdefault(name, []).append(rec)
+            for name, recs in by_source.items():
+                try:
+                    results = normalize_many(recs, source=sources[name][1], executor=procs, normalizer=normalizer)
+                except Exception as e:  # e.g. BrokenProcessPool on submit
+                    fail(name, "normalize", len(recs), e)
+                    continue
+                for i, r in enumerate(results):
+                    try:
+                        emit(name, r["ok"], r["record"] if r["ok"] else r["error"])
+                    except Exception as e:
+                        fail(name, "normalize", len(results) - i, e)
+                        break
+
+    def flush(name: str, batch: List[Dict[str, Any]]) -> None:
+        try:
+            outcome = sink(batch)
+        except Exception as e:
+            logger.error("Upsert batch of %d %s records failed: %s", len(batch), name, e)
+            outcome = len(batch)
+        if isinstance(outcome, int):
+            outcome = {"failed": outcome}
+        failed = outcome.get("failed", 0)
+        with lock:
+            st = stats[name]
+            st.inserted += outcome.get("inserted", 0)
+            st.updated += outcome.get("updated", 0)
+            st.unchanged += outcome.get("unchanged", 0)
+            st.upsert_failed += failed
+            st.upserted += len(batch) - failed
+            st.finished = time.monotonic()
+
+    def safe_flush(name: str, batch: List[Dict[str, Any]]) -> None:
+        try:
+            flush(name, batch)
+        except Exception as e:  # e.g. a sink returning something flush cannot tally
+            fail(name, "upsert", len(batch), e)
+
+    def upsert_worker() -> None:
+        buffers: Dict[str, List[Dict[str, Any]]] = {}
+        while True:
+            item = norm_q.get()
+            if item is _DONE:
+                break
+            name, n = item
+            buf = buffers.setdefault(name, [])
+            buf.append(n)
+            if len(buf) >= batch_size:
+                buffers[name] = []
+                safe_flush(name, buf)
+        for name, buf in buffers.items():
+            if buf:
+                safe_flush(name, buf)
+
+    target = normalize_batch_worker if procs is not None else normalize_worker
+    normalizers = [threading.Thread(target=target, daemon=True) for _ in range(max(1, normalize_workers))]
+    upserters = [threading.Thread(target=upsert_worker, daemon=True) for _ in range(max(1, upsert_workers))]
+    for t in normalizers + upserters:
+        t.start()
+
+    with ThreadPoolExecutor(max_workers=max(1, len(sources)), thread_name_prefix="fetch") as pool:
+        list(pool.map(fetch, sources))
+
+    for _ in normalizers:
+        raw_q.put(_DONE)
+    for t in normalizers:
+        t.join()
+    if procs is not None:
+        procs.shutdown()
+    for _ in upserters:
+        norm_q.put(_DONE)
+    for t in upserters:
+        t.join()
+
+    for st in stats.values():
+        st.finished = max(st.finished, st.fetch_done)
+    return stats
+
+
+def format_summary(stats: Dict[str, SourceStats]) -> str:
+    lines = [
+        f"{'source':<10} {'fetched':>8} {'upserted':>9} {'inserted':>9} {'updated':>8} {'unchanged':>10} "
+        f"{'failed':>7} {'secs':>7} {'rec/s':>8}  error"
+    ]
+    for st in stats.values():
+        failed = st.normalize_failed + st.upsert_failed
+        lines.append(
+            f"{st.name:<10} {st.fetched:>8} {st.upserted:>9} {st.inserted:>9} {st.updated:>8} {st.unchanged:>10} "
+            f"{failed:>7} {st.seconds:>7.1f} {st.per_second:>8.1f}  {st.error or ''}"
+        )
+    return "\n".join(lines)
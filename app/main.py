@@ -1,16 +1,20 @@
 import os
+from collections import Counter
 from datetime import date
 from typing import Optional, List
 
-from fastapi import FastAPI, Depends, Query, HTTPException
+from fastapi import FastAPI, Depends, Query, HTTPException, Request
 from sqlalchemy import text
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.middleware.cors import CORSMiddleware
 
-from .db import engine, get_db
+from .db import engine, get_db, get_async_db, SessionLocal
 from . import models, crud
+from .cache import make_key, query_cache
+from .serialize import FastJSONResponse, dumps, opportunity_to_dict, projected_to_dict
 
-from .schemas import OpportunityIn, OpportunityOut, Facets
+from .schemas import OpportunityIn, OpportunityOut, Facets, BulkResponse, SyncStateIn, SyncStateOut
 from typing import Optional, List
 from datetime import date
 
@@ -42,30 +46,127 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create DB objects and indexes on startup (simple path; Alembic can be added later)
-if os.getenv("TESTING") != "1":
+# Schema upgrades run on startup (simple path; Alembic can be added later).
+# Each step commits on its own, so one that cannot run here (e.g. CREATE
+# EXTENSION without the privilege on managed Postgres) only skips itself and
+# what depends on it, never the columns the write path needs.
+SCHEMA_STEPS = [
+    # Column added after the table was first created (create_all does not alter)
+    ("content_hash", "ALTER TABLE opportunities ADD COLUMN IF NOT EXISTS content_hash varchar(64);"),
+    # Facet values were varchar(200); tags, sponsors and programmes have no length limit
+    ("facet_counts.value", "ALTER TABLE facet_counts ALTER COLUMN value TYPE text;"),
+    # Scalar indexes to accelerate filters/sorting
+    ("idx_opps_status", "CREATE INDEX IF NOT EXISTS idx_opps_status ON opportunities (status);"),
+    ("idx_opps_sponsor", "CREATE INDEX IF NOT EXISTS idx_opps_sponsor ON opportunities (sponsor);"),
+    ("idx_opps_programme", "CREATE INDEX IF NOT EXISTS idx_opps_programme ON opportunities (programme);"),
+    ("idx_opps_closes_at", "CREATE INDEX IF NOT EXISTS idx_opps_closes_at ON opportunities (closes_at);"),
+    # tags/topic_codes as JSONB (tables created before the column type change)
+    ("jsonb tags/topic_codes", """
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM information_schema.columns
+                       WHERE table_name = 'opportunities' AND column_name = 'tags' AND data_type = 'json') THEN
+                ALTER TABLE opportunities
+                    ALTER COLUMN tags TYPE jsonb USING tags::jsonb,
+                    ALTER COLUMN topic_codes TYPE jsonb USING topic_codes::jsonb;
+            END IF;
+        END $$;
+    """),
+    # GIN (jsonb_ops) for exact containment: tags @> / ?| and topic_codes ?|
+    ("idx_opps_tags", "CREATE INDEX IF NOT EXISTS idx_opps_tags ON opportunities USING GIN (tags);"),
+    ("idx_opps_topic_codes", "CREATE INDEX IF NOT EXISTS idx_opps_topic_codes ON opportunities USING GIN (topic_codes);"),
+    # Keyset pagination: (sort key, tie-breaker) range scans
+    ("idx_opps_closes_at_id", "CREATE INDEX IF NOT EXISTS idx_opps_closes_at_id ON opportunities (closes_at, id);"),
+    ("idx_opps_closes_at_id_desc",
+     "CREATE INDEX IF NOT EXISTS idx_opps_closes_at_id_desc ON opportunities (closes_at DESC NULLS LAST, id DESC);"),
+    # Functional indexes over JSON text for lightweight search
+    ("idx_opps_title_en", "CREATE INDEX IF NOT EXISTS idx_opps_title_en   ON opportunities ((title->>'en'));"),
+    ("idx_opps_summary_en", "CREATE INDEX IF NOT EXISTS idx_opps_summary_en ON opportunities ((summary->>'en'));"),
+    ("idx_opps_title_sv", "CREATE INDEX IF NOT EXISTS idx_opps_title_sv   ON opportunities ((title->>'sv'));"),
+    ("idx_opps_summary_sv", "CREATE INDEX IF NOT EXISTS idx_opps_summary_sv ON opportunities ((summary->>'sv'));"),
+    # Weighted full-text vector (title A, summary B, description C), kept
+    # up to date by Postgres as a stored generated column, behind a GIN index.
+    ("search_tsv", """
+        ALTER TABLE opportunities ADD COLUMN IF NOT EXISTS search_tsv tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english'::regconfig, coalesce(title->>'en', '')), 'A') ||
+            setweight(to_tsvector('swedish'::regconfig, coalesce(title->>'sv', '')), 'A') ||
+            setweight(to_tsvector('english'::regconfig, coalesce(summary->>'en', '')), 'B') ||
+            setweight(to_tsvector('swedish'::regconfig, coalesce(summary->>'sv', '')), 'B') ||
+            setweight(to_tsvector('simple'::regconfig, coalesce(extra->>'description_text', '')), 'C')
+        ) STORED;
+    """),
+    ("idx_opps_search_tsv", "CREATE INDEX IF NOT EXISTS idx_opps_search_tsv ON opportunities USING GIN (search_tsv);"),
+    # Word vocabulary for "did you mean" (upserts write to it, with or without pg_trgm)
+    ("search_words", "CREATE TABLE IF NOT EXISTS search_words (word text PRIMARY KEY);"),
+    # Backfill the vocabulary from rows written before it existed
+    ("search_words backfill", """
+        INSERT INTO search_words (word)
+        SELECT word FROM ts_stat($$
+            SELECT to_tsvector('simple'::regconfig,
+                concat_ws(' ', title->>'en', title->>'sv', sponsor, programme))
+            FROM opportunities
+        $$) WHERE length(word) >= 3 AND NOT EXISTS (SELECT 1 FROM search_words)
+        ON CONFLICT DO NOTHING;
+    """),
+]
+
+# Trigram indexes for match=fuzzy and suggestions; skipped without pg_trgm
+TRGM_STEPS = [
+    ("pg_trgm", "CREATE EXTENSION IF NOT EXISTS pg_trgm;"),
+    ("idx_opps_title_en_trgm", "CREATE INDEX IF NOT EXISTS idx_opps_title_en_trgm ON opportunities USING GIN ((title->>'en') gin_trgm_ops);"),
+    ("idx_opps_title_sv_trgm", "CREATE INDEX IF NOT EXISTS idx_opps_title_sv_trgm ON opportunities USING GIN ((title->>'sv') gin_trgm_ops);"),
+    ("idx_opps_sponsor_trgm", "CREATE INDEX IF NOT EXISTS idx_opps_sponsor_trgm ON opportunities USING GIN (sponsor gin_trgm_ops);"),
+    ("idx_opps_programme_trgm", "CREATE INDEX IF NOT EXISTS idx_opps_programme_trgm ON opportunities USING GIN (programme gin_trgm_ops);"),
+    ("idx_search_words_trgm", "CREATE INDEX IF NOT EXISTS idx_search_words_trgm ON search_words USING GIST (word gist_trgm_ops);"),
+]
+
+
+def _run_step(bind, name: str, sql: str) -> bool:
+    """One schema step in its own transaction; False (logged) if it failed."""
     try:
-        with engine.begin() as conn:
-            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pgcrypto;"))
-        models.Base.metadata.create_all(bind=engine)
+        with bind.begin() as conn:
+            conn.execute(text(sql))
+        return True
+    except Exception as e:
+        print(f"[startup] {name} skipped: {e}")
+        return False
+
+
+def init_db(bind=engine) -> None:
+    """Create tables and run the schema steps against `bind` (idempotent)."""
+    _run_step(bind, "pgcrypto", "CREATE EXTENSION IF NOT EXISTS pgcrypto;")
+    try:
+        models.Base.metadata.create_all(bind=bind)
     except Exception as e:
         print(f"[startup] DB init skipped or failed: {e}")
+        return
+    failed = [name for name, sql in SCHEMA_STEPS if not _run_step(bind, name, sql)]
+    name, sql = TRGM_STEPS[0]
+    if _run_step(bind, name, sql):
+        failed += [name for name, sql in TRGM_STEPS[1:] if not _run_step(bind, name, sql)]
+    else:
+        failed.append("trigram indexes (match=fuzzy and suggestions need pg_trgm)")
+    print(f"[startup] Index checks complete{'; skipped: ' + ', '.join(failed) if failed else ''}")
+
+
+if os.getenv("TESTING") != "1":
+    init_db()
 
+    # Rebuild the facet summary once; upserts keep it current afterwards
     try:
-        with engine.begin() as conn:
-            # Scalar indexes to accelerate filters/sorting
-            conn.execute(text("CREATE INDEX IF NOT EXISTS idx_opps_status ON opportunities (status);"))
-            conn.execute(text("CREATE INDEX IF NOT EXISTS idx_opps_sponsor ON opportunities (sponsor);"))
-            conn.execute(text("CREATE INDEX IF NOT EXISTS idx_opps_programme ON opportunities (programme);"))
-            conn.execute(text("CREATE INDEX IF NOT EXISTS idx_opps_closes_at ON opportunities (closes_at);"))
-            # Functional indexes over JSON text for lightweight search
-            conn.execute(text("CREATE INDEX IF NOT EXISTS idx_opps_title_en   ON opportunities ((title->>'en'));"))
-            conn.execute(text("CREATE INDEX IF NOT EXISTS idx_opps_summary_en ON opportunities ((summary->>'en'));"))
-            conn.execute(text("CREATE INDEX IF NOT EXISTS idx_opps_title_sv   ON opportunities ((title->>'sv'));"))
-            conn.execute(text("CREATE INDEX IF NOT EXISTS idx_opps_summary_sv ON opportunities ((summary->>'sv'));"))
-        print("[startup] Index checks complete")
+        with SessionLocal() as db:
+            crud.refresh_facets(db)
     except Exception as e:
-        print(f"[startup] Index creation skipped: {e}")
+        print(f"[startup] Facet refresh skipped: {e}")
+
+
+# --------------------------- helpers ---------------------------
+
+def _csv(v: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated query parameter; None when empty."""
+    vals = [x.strip() for x in (v or "").split(",") if x.strip()]
+    return vals or None
 
 
 # --------------------------- health ---------------------------
@@ -75,18 +176,69 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/_cache")
+def cache_stats():
+    """Hit/miss statistics of the in-process query cache."""
+    return query_cache.stats()
+
+
 
 @app.get("/facets", response_model=Facets)
-def facets(db: Session = Depends(get_db)):
-    return crud.get_facets(db)
+async def facets(
+    request: Request,
+    q: Optional[str] = Query(None, description="Free text query"),
+    query: Optional[str] = Query(None, description="Alias for q"),
+    sponsor: Optional[str] = None,
+    programme: Optional[str] = None,
+    status: Optional[str] = None,
+    tag: Optional[str] = Query(None, description="Exact tag"),
+    tags: Optional[str] = Query(None, description="Comma-separated tags"),
+    tag_mode: str = Query("any", pattern="^(any|all)$", description="any | all (for tags)"),
+    topic_code: Optional[str] = Query(None, description="Comma-separated topic codes (any)"),
+    deadline_after: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    deadline_before: Optional[str] = Query(None, description="YYYY-MM-DD"),
+    match: str = Query("text", description="text | fuzzy (typo-tolerant)"),
+    similarity: float = Query(crud.FUZZY_THRESHOLD, ge=0, le=1, description="Fuzzy match threshold"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Top-N values per facet"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Facet values with counts. Accepts the same filters as /opportunities;
+    counts then reflect the matching set (drill-down navigation).
+    """
+    key = make_key("facets", request.query_params.multi_items())
+    hit, cached = query_cache.get(key)
+    if hit:
+        return FastJSONResponse(cached)
+    result = await crud.get_facets_async(
+        db,
+        limit=limit,
+        q=q or query,
+        status=status,
+        sponsor=sponsor,
+        programme=programme,
+        tag=tag,
+        tags=_csv(tags),
+        tag_mode=tag_mode,
+        topic_codes=_csv(topic_code),
+        deadline_before=deadline_before,
+        deadline_after=deadline_after,
+        match=match,
+        threshold=similarity,
+    )
+    body = dumps(result)
+    query_cache.set(key, body)
+    return FastJSONResponse(body)
 
 # --------------------------- list/search ---------------------------
 
 class OpportunitiesResponse(BaseModel):
     items: List[OpportunityOut] = Field(default_factory=list)
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
+    suggestion: Optional[str] = None
+    next_cursor: Optional[str] = None
     if V2:
         model_config = ConfigDict(extra="ignore")
     else:
@@ -94,48 +246,83 @@ class OpportunitiesResponse(BaseModel):
             extra = "ignore"
 
 @app.get("/opportunities", response_model=OpportunitiesResponse)
-
-def list_opps(
+async def list_opps(
+    request: Request,
     q: Optional[str] = Query(None, description="Free text query"),
     query: Optional[str] = Query(None, description="Alias for q"),
     sponsor: Optional[str] = None,
     programme: Optional[str] = None,
     status: Optional[str] = None,
-    tag: Optional[str] = Query(None, description="Match a tag string"),
+    tag: Optional[str] = Query(None, description="Exact tag"),
+    tags: Optional[str] = Query(None, description="Comma-separated tags"),
+    tag_mode: str = Query("any", pattern="^(any|all)$", description="any | all (for tags)"),
+    topic_code: Optional[str] = Query(None, description="Comma-separated topic codes (any)"),
     deadline_after: Optional[str] = Query(None, description="YYYY-MM-DD"),
     deadline_before: Optional[str] = Query(None, description="YYYY-MM-DD"),
-    sort: str = Query("recent", description="recent | deadline_asc | deadline_desc"),
+    sort: str = Query("recent", description="recent | deadline_asc | deadline_desc | relevance"),
+    match: str = Query("text", description="text | fuzzy (typo-tolerant)"),
+    similarity: float = Query(crud.FUZZY_THRESHOLD, ge=0, le=1, description="Fuzzy match threshold"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page (keyset pagination)"),
+    total: str = Query("exact", pattern="^(exact|estimate|none)$", description="exact | estimate | none"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. title.en,sponsor,status,closes_at"),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Paged list with filters. Returns {"items":[...], "total":N, "page":x, "page_size":y}.
     Accepts both ?q= and ?query= for convenience.
+    Pass the returned next_cursor back as ?cursor= for stable, offset-free paging.
+    ?total=estimate|none skips the exact count ("total" is approximate or null).
+    ?fields= limits both the selected columns and the returned item keys.
     """
+    key = make_key("opportunities", request.query_params.multi_items())
+    hit, cached = query_cache.get(key)
+    if hit:
+        return FastJSONResponse(cached)
     try:
         term = q or query
-        rows, total = crud.search_opportunities(
+        field_list = _csv(fields)
+        rows, n_total = await crud.search_opportunities_async(
             db,
             q=term,
             status=status,
             sponsor=sponsor,
             programme=programme,
             tag=tag,
+            tags=_csv(tags),
+            tag_mode=tag_mode,
+            topic_codes=_csv(topic_code),
             deadline_before=deadline_before,
             deadline_after=deadline_after,
             sort=sort,
+            match=match,
+            threshold=similarity,
             page=page,
             page_size=page_size,
+            cursor=cursor,
+            total_mode=total,
+            fields=field_list,
         )
-        # Serialize ORM → schema (ensures clean JSON)
-        items = []
-        for o in rows:
-            base = OpportunityOut.model_validate(o, from_attributes=True).model_dump()
-            if getattr(o, "extra", None):
-                base.update(o.extra)
-            items.append(base)
-        return {"items": items, "total": total, "page": page, "page_size": page_size}
+        # Serialize ORM rows straight to JSON (rows were validated on ingest)
+        if field_list:
+            items = [projected_to_dict(r, field_list) for r in rows]
+        else:
+            items = [opportunity_to_dict(o) for o in rows]
+        suggestion = None
+        if term and not rows and page == 1 and not cursor:
+            suggestion = await crud.suggest_query_async(db, term, similarity)
+        next_cursor = None
+        if len(rows) == page_size and not (sort == "relevance" and term):
+            next_cursor = crud.encode_cursor(sort, rows[-1])
+        body = dumps({
+            "items": items, "total": n_total, "page": page, "page_size": page_size,
+            "suggestion": suggestion, "next_cursor": next_cursor,
+        })
+        query_cache.set(key, body)
+        return FastJSONResponse(body)
+    except (crud.CursorError, crud.FieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -143,31 +330,73 @@ def list_opps(
 # --------------------------- get one ---------------------------
 
 @app.get("/opportunities/{oid}", response_model=OpportunityOut)
-def get_one(oid: str, db: Session = Depends(get_db)):
-    obj = db.query(models.Opportunity).filter(models.Opportunity.id == oid).one_or_none()
+async def get_one(
+    oid: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    key = make_key("opportunity", [("id", oid), ("fields", fields)])
+    hit, cached = query_cache.get(key)
+    if hit:
+        return FastJSONResponse(cached)
+    field_list = _csv(fields)
+    try:
+        obj = await crud.get_opportunity_async(db, oid, field_list)
+    except crud.FieldsError as e:
+        raise HTTPException(400, str(e))
     if not obj:
         raise HTTPException(404, "not found")
-    base = OpportunityOut.model_validate(obj, from_attributes=True).model_dump()
-    if getattr(obj, "extra", None):
-        base.update(obj.extra)
-    return base
+    body = dumps(projected_to_dict(obj, field_list) if field_list else opportunity_to_dict(obj))
+    query_cache.set(key, body)
+    return FastJSONResponse(body)
 
 
 # --------------------------- upsert ---------------------------
 
 @app.post("/opportunities", response_model=OpportunityOut)
-def create_or_update(opportunity: OpportunityIn, db: Session = Depends(get_db)):
+async def create_or_update(opportunity: OpportunityIn, db: AsyncSession = Depends(get_async_db)):
     try:
-        obj = crud.upsert_opportunity(db, opportunity)
-        base = OpportunityOut.model_validate(obj, from_attributes=True).model_dump()
-        if getattr(obj, "extra", None):
-            base.update(obj.extra)
-        return base
+        obj = await crud.upsert_opportunity_async(db, opportunity)
+        return FastJSONResponse(opportunity_to_dict(obj))
     except Exception as e:
         # During development, expose the exact cause to the client
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/opportunities/_bulk", response_model=BulkResponse)
+async def bulk_upsert(items: List[dict], db: AsyncSession = Depends(get_async_db)):
+    """
+    Batched upsert. Each item is validated on its own, so one bad record is
+    reported in "results" instead of rejecting the whole request.
+    """
+    try:
+        results = await crud.upsert_many_async(db, items)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    ok = sum(1 for r in results if r["ok"])
+    by_status = Counter(r["status"] for r in results)
+    return {
+        "total": len(results), "succeeded": ok, "failed": len(results) - ok,
+        "inserted": by_status["inserted"], "updated": by_status["updated"], "unchanged": by_status["unchanged"],
+        "results": results,
+    }
+
+
+# --------------------------- sync state ---------------------------
+
+@app.get("/_sync/{source}", response_model=SyncStateOut)
+def get_sync_state(source: str, db: Session = Depends(get_db)):
+    """Incremental-sync watermark for a source (null watermark = never synced)."""
+    state = crud.get_sync_state(db, source.upper())
+    return state or SyncStateOut(source=source.upper())
+
+
+@app.put("/_sync/{source}", response_model=SyncStateOut)
+def put_sync_state(source: str, body: SyncStateIn, db: Session = Depends(get_db)):
+    """Advance (or reset) the watermark; called by ingest after a clean run."""
+    return crud.set_watermark(db, source.upper(), body.watermark)
+
+
 # --------------------------- dev seed ---------------------------
 
 @app.post("/_seed")
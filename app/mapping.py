@@ -0,0 +1,346 @@
+# app/mapping.py
+"""
+Declarative field mappings, compiled to plain Python functions.
+
+A Mapping describes how one source record becomes an API record:
+
+    VINNOVA = Mapping(
+        "VINNOVA",
+        let=[
+            ("desc_html", Or(Get("BeskrivningEngelska"), Get("Beskrivning"))),
+            ("desc_text", Call(_strip_html, Var("desc_html"))),
+        ],
+        fields={
+            "id": Fmt("VINNOVA:{}", Get("Diarienummer")),
+            "title": {"sv": Get("Titel"), "en": Get("TitelEngelska")},
+            "contacts": Each(Get("KontaktLista"), {"name": Item("Namn"), "email": Item("Epost")}),
+            "extra_json": Get(),
+        },
+    )
+
+`let` bindings are evaluated in order and can be referenced by later bindings
+and fields with Var(); `fields` gives the output keys in order. Plain dicts and
+lists inside a spec are templates (built fresh per record), anything that is
+not an Expr is a literal.
+
+compile_mapping() turns a spec into source code for one function (a straight
+sequence of assignments and a dict display, with paths and fallbacks inlined)
+and compiles it once, so a mapped normalizer runs as fast as a hand-written
+one. The generated code is kept on the function as `__mapping_source__`.
+"""
+from __future__ import annotations
+
+import json
+import keyword
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+_ROOT = "rec"  # name of the source record inside generated functions
+
+
+class MappingError(ValueError):
+    """The mapping spec is malformed (unknown variable, bad name, ...)."""
+
+
+class Expr:
+    def emit(self, c: "_Compiler") -> str:
+        raise NotImplementedError
+
+
+def _expr(x: Any) -> Expr:
+    if isinstance(x, Expr):
+        return x
+    if isinstance(x, dict):
+        return _Template(x)
+    if isinstance(x, list):
+        return ListOf(*x)
+    return Lit(x)
+
+
+class Get(Expr):
+    """
+    Path into the source record (or into `of`): Get("a", "b") is
+    rec.get("a") then .get("b"), a missing or empty step yielding None.
+    Get() is the record itself.
+    """
+
+    def __init__(self, *keys: str, of: Optional[Expr] = None):
+        self.keys = keys
+        self.of = of
+
+    def _base(self, c: "_Compiler") -> str:
+        return self.of.emit(c) if self.of is not None else _ROOT
+
+    def emit(self, c: "_Compiler") -> str:
+        code = self._base(c)
+        for i, k in enumerate(self.keys):
+            code = f"{code}.get({k!r})" if i == 0 else f"({code} or {{}}).get({k!r})"
+        return code
+
+
+class Item(Get):
+    """Like Get, relative to the current element of the innermost Each()."""
+
+    def _base(self, c: "_Compiler") -> str:
+        if not c.items:
+            raise MappingError("Item() used outside Each()")
+        return c.items[-1]
+
+
+class Var(Expr):
+    """Value of an earlier `let` binding."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def emit(self, c: "_Compiler") -> str:
+        if self.name not in c.bound:
+            raise MappingError(f"{c.name}: Var({self.name!r}) used before it is bound")
+        return self.name
+
+
+class Lit(Expr):
+    """A constant; containers are rebuilt on every call, never shared between records."""
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def emit(self, c: "_Compiler") -> str:
+        v = self.value
+        if isinstance(v, dict):
+            return _Template(v).emit(c)
+        if isinstance(v, (list, tuple)):
+            inner = ", ".join(Lit(x).emit(c) for x in v)
+            return f"[{inner}]" if isinstance(v, list) else f"({inner}{',' if len(v) == 1 else ''})"
+        if v is None or isinstance(v, (bool, int, float, str)):
+            return repr(v)
+        raise MappingError(f"{c.name}: unsupported literal {v!r}")
+
+
+class Call(Expr):
+    """Transform: fn(*args), args being expressions or literals."""
+
+    def __init__(self, fn: Callable[..., Any], *args: Any):
+        self.fn = fn
+        self.args = [_expr(a) for a in args]
+
+    def emit(self, c: "_Compiler") -> str:
+        return f"{c.ref(self.fn)}({', '.join(a.emit(c) for a in self.args)})"
+
+
+class First(Expr):
+    """First element of a list value, None if it is not a non-empty list."""
+
+    def __init__(self, arg: Any):
+        self.arg = _expr(arg)
+
+    def emit(self, c: "_Compiler") -> str:
+        if c.in_iterable:  # := is not allowed in a comprehension's iterable
+            return f"{c.ref(_first)}({self.arg.emit(c)})"
+        t = c.temp()
+        return f"({t}[0] if isinstance({t} := {self.arg.emit(c)}, list) and {t} else None)"
+
+
+def _first(x):
+    return x[0] if isinstance(x, list) and x else None
+
+
+class Concat(Expr):
+    """Lists (or strings) joined with +."""
+
+    def __init__(self, *parts: Any):
+        self.parts = [_expr(p) for p in parts]
+
+    def emit(self, c: "_Compiler") -> str:
+        return "(" + " + ".join(p.emit(c) for p in self.parts) + ")"
+
+
+class Or(Expr):
+    """Fallbacks: the first truthy alternative, else the last one."""
+
+    def __init__(self, *alternatives: Any):
+        if not alternatives:
+            raise MappingError("Or() needs at least one alternative")
+        self.alternatives = [_expr(a) for a in alternatives]
+
+    def emit(self, c: "_Compiler") -> str:
+        if len(self.alternatives) == 1:
+            return self.alternatives[0].emit(c)
+        return "(" + " or ".join(a.emit(c) for a in self.alternatives) + ")"
+
+
+class Cond(Expr):
+    """`then` if `test` is truthy, else `otherwise`."""
+
+    def __init__(self, test: Any, then: Any, otherwise: Any = None):
+        self.test, self.then, self.otherwise = _expr(test), _expr(then), _expr(otherwise)
+
+    def emit(self, c: "_Compiler") -> str:
+        return f"({self.then.emit(c)} if {self.test.emit(c)} else {self.otherwise.emit(c)})"
+
+
+class Fmt(Expr):
+    """str.format-style template with positional "{}" fields."""
+
+    def __init__(self, template: str, *args: Any):
+        if template.count("{}") != len(args) or template.replace("{}", "").count("{") or template.replace("{}", "").count("}"):
+            raise MappingError(f"Fmt template {template!r} must have one '{{}}' per argument and no other braces")
+        self.template = template
+        self.args = [_expr(a) for a in args]
+
+    def emit(self, c: "_Compiler") -> str:
+        parts = self.template.split("{}")
+        args = [a if a.isidentifier() else f"({a})" for a in (arg.emit(c) for arg in self.args)]
+        # An f-string unless some argument's code has a double quote or backslash (not allowed inside one)
+        if all('"' not in a and "\\" not in a for a in args):
+            body = "".join(json.dumps(p)[1:-1] + (f"{{{a}}}" if a is not None else "") for p, a in zip(parts, args + [None]))
+            return f'f"{body}"'
+        return f"{self.template!r}.format({', '.join(args)})"
+
+
+class ListOf(Expr):
+    """A list built from expressions."""
+
+    def __init__(self, *items: Any):
+        self.items = [_expr(i) for i in items]
+
+    def emit(self, c: "_Compiler") -> str:
+        return "[" + ", ".join(i.emit(c) for i in self.items) + "]"
+
+
+class Each(Expr):
+    """
+    List expansion: one `item` per element of `over` (None or empty -> []),
+    optionally keeping only elements for which `when` is truthy. Inside
+    `item` and `when`, Item() refers to the current element.
+    """
+
+    def __init__(self, over: Any, item: Any, when: Any = None):
+        self.over = _expr(over)
+        self.item = _expr(item)
+        self.when = _expr(when) if when is not None else None
+
+    def emit(self, c: "_Compiler") -> str:
+        if isinstance(self.over, ListOf) and all(isinstance(i, Var) for i in self.over.items):
+            return self._unrolled(c)
+        c.in_iterable += 1
+        try:
+            over = self.over.emit(c)
+        finally:
+            c.in_iterable -= 1
+        var = f"_e{len(c.items)}"
+        c.items.append(var)
+        try:
+            item = self.item.emit(c)
+            cond = f" if {self.when.emit(c)}" if self.when is not None else ""
+        finally:
+            c.items.pop()
+        if c.in_iterable:  # := is not allowed in a comprehension's iterable
+            return f"[{item} for {var} in ({over} or []){cond}]"
+        # None / empty skip the comprehension (a function call of its own) altogether
+        t = c.temp()
+        return f"([{item} for {var} in {t}{cond}] if ({t} := {over}) else [])"
+
+    def _unrolled(self, c: "_Compiler") -> str:
+        # Each([Var("a"), ...], ...): the elements are already names, so Item()
+        # can refer to them directly and no comprehension is needed
+        parts = []
+        for name in (i.emit(c) for i in self.over.items):
+            c.items.append(name)
+            try:
+                item = self.item.emit(c)
+                cond = self.when.emit(c) if self.when is not None else None
+            finally:
+                c.items.pop()
+            parts.append(f"[{item}]" if cond is None else f"([{item}] if {cond} else [])")
+        if len(parts) == 1:
+            return parts[0]
+        return "[" + ", ".join(f"*{p}" for p in parts) + "]"
+
+
+class _Template(Expr):
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = {k: _expr(v) for k, v in spec.items()}
+
+    def emit(self, c: "_Compiler") -> str:
+        return "{" + ", ".join(f"{k!r}: {v.emit(c)}" for k, v in self.spec.items()) + "}"
+
+
+Target = Union[str, Tuple[str, ...]]
+
+
+@dataclass
+class Mapping:
+    """
+    name:   source name (used for the generated function's name and errors)
+    let:    ordered (name, expr) bindings; a tuple of names unpacks the value
+    fields: output key -> expr, in output order
+    """
+    name: str
+    fields: Dict[str, Any]
+    let: Sequence[Tuple[Target, Any]] = field(default_factory=list)
+
+
+class _Compiler:
+    def __init__(self, name: str):
+        self.name = name
+        self.bound: set = set()
+        self.items: List[str] = []
+        self.globals: Dict[str, Any] = {}
+        self._refs: Dict[int, str] = {}
+        self._temps = 0
+        self.in_iterable = 0
+
+    def temp(self) -> str:
+        """Fresh scratch name for an inlined sub-expression."""
+        self._temps += 1
+        return f"_t{self._temps}"
+
+    def ref(self, fn: Callable[..., Any]) -> str:
+        """Global name under which the generated code calls `fn`."""
+        name = self._refs.get(id(fn))
+        if name is None:
+            base = getattr(fn, "__name__", "fn").strip("_") or "fn"
+            name = self._refs[id(fn)] = f"_f{len(self._refs)}_{base}" if base.isidentifier() else f"_f{len(self._refs)}"
+            self.globals[name] = fn
+        return name
+
+    def bind(self, target: Target) -> str:
+        names = (target,) if isinstance(target, str) else tuple(target)
+        for n in names:
+            if not n.isidentifier() or keyword.iskeyword(n) or n == _ROOT or n.startswith("_"):
+                raise MappingError(f"{self.name}: invalid variable name {n!r}")
+        self.bound.update(names)
+        return names[0] if isinstance(target, str) else ", ".join(names)
+
+
+def mapping_source(mapping: Mapping, func_name: str) -> Tuple[str, Dict[str, Any]]:
+    """Python source of the compiled mapping and the globals it needs."""
+    c = _Compiler(mapping.name)
+    lines = [f"def {func_name}({_ROOT}):"]
+    for target, expr in mapping.let:
+        value = _expr(expr).emit(c)  # emitted before binding: `x = f(x)` reads the old x
+        lines.append(f"    {c.bind(target)} = {value}")
+    lines.append("    return {")
+    for key, expr in mapping.fields.items():
+        lines.append(f"        {key!r}: {_expr(expr).emit(c)},")
+    lines.append("    }")
+    return "\n".join(lines) + "\n", c.globals
+
+
+def compile_mapping(mapping: Mapping, *, name: Optional[str] = None, module: Optional[str] = None) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Compile `mapping` into fn(record) -> dict. Pass the module-level name the
+    result is assigned to (and the module) to keep it picklable, e.g. for
+    process pools.
+    """
+    func_name = name or f"map_{''.join(ch if ch.isalnum() else '_' for ch in mapping.name.lower())}"
+    src, env = mapping_source(mapping, func_name)
+    env["__name__"] = module or __name__
+    exec(compile(src, f"<mapping {mapping.name}>", "exec"), env)
+    fn = env[func_name]
+    fn.__module__ = module or __name__
+    fn.__qualname__ = func_name
+    fn.__mapping_source__ = src
+    fn.mapping = mapping
+    return fn
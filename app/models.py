@@ -1,6 +1,11 @@
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import String, Date, JSON, Text
+from sqlalchemy import String, Date, DateTime, JSON, Text, Integer
+from sqlalchemy.dialects.postgresql import JSONB
 from typing import Dict, List, Optional, Any
+from datetime import date, datetime
+
+# JSONB on Postgres (GIN-indexable containment), plain JSON elsewhere (SQLite tests)
+JSONList = JSON().with_variant(JSONB(), "postgresql")
 
 class Base(DeclarativeBase):
     pass
@@ -20,10 +25,10 @@ class Opportunity(Base):
     sponsor: Mapped[Optional[str]] = mapped_column(String(200))
 
     # Topic or call identifiers (e.g. EU FTOP topic codes)
-    topic_codes: Mapped[List[str]] = mapped_column(JSON, default=list)
+    topic_codes: Mapped[List[str]] = mapped_column(JSONList, default=list)
 
     # JSON arrays
-    tags: Mapped[List[str]] = mapped_column(JSON, default=list)
+    tags: Mapped[List[str]] = mapped_column(JSONList, default=list)
     deadlines: Mapped[List[dict]] = mapped_column(JSON, default=list)
 
     status: Mapped[str] = mapped_column(String(20), nullable=False)
@@ -36,3 +41,24 @@ class Opportunity(Base):
 
     # Store any additional metadata that doesn't have dedicated columns
     extra: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+
+    # sha256 of the last upserted record (crud._content_hash); unchanged records are skipped
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64))
+
+
+class FacetCount(Base):
+    """Precomputed facet summary: documents per (dimension, value), kept in sync by crud."""
+    __tablename__ = "facet_counts"
+
+    dimension: Mapped[str] = mapped_column(String(20), primary_key=True)  # sponsor | programme | status | tag
+    value: Mapped[str] = mapped_column(Text, primary_key=True)  # tags etc. have no length limit
+    doc_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class SyncState(Base):
+    """Per-source incremental sync high-water mark, advanced by ingest after a clean run."""
+    __tablename__ = "sync_state"
+
+    source: Mapped[str] = mapped_column(String(50), primary_key=True)
+    watermark: Mapped[Optional[date]] = mapped_column(Date)  # fetch changes since this date
+    synced_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
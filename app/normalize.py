@@ -1,9 +1,16 @@
 # app/normalize.py
 import json
+import multiprocessing
+import os
 import re
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from html import unescape
 from html.parser import HTMLParser
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .dates import batch_today, next_or_latest, parse_date_maybe, to_date, today
+from .mapping import Call, Concat, Cond, Each, First, Fmt, Get, Item, Mapping, Or, Var, compile_mapping
 
 # =========================
 # Shared helpers (stdlib)
@@ -12,42 +19,122 @@ from typing import Any, Dict, List, Optional, Tuple
 def _ensure_str(x: Optional[str]) -> str:
     return x if isinstance(x, str) else ""
 
-class _LinkExtractor(HTMLParser):
+# Tag-or-whitespace runs collapse to one space: same result as replacing each
+# tag with " " and then squeezing whitespace, in a single regex pass.
+_TAG_OR_WS_RE = re.compile(r"(?:<[^>]+>|\s)+")
+# Cheap pre-check: only blobs with an <a> start tag need link extraction
+_ANCHOR_RE = re.compile(r"<a[\s/>\x00]", re.IGNORECASE)
+
+class _HTMLScan(HTMLParser):
+    """
+    One pass over an HTML blob: its text (tags and whitespace runs collapsed to
+    one space and entities kept as written, like _strip_html, but comments and
+    script/style content dropped), the (href, text) of its <a> elements, and
+    those links split like _split_documents_vs_links. reset() makes an
+    instance reusable.
+    """
+
     def __init__(self):
-        super().__init__()
-        self.links: List[Tuple[str, str]] = []
+        super().__init__(convert_charrefs=False)
+
+    def reset(self):
+        super().reset()
+        self.anchors: List[Tuple[str, str]] = []
+        self.documents: List[Dict[str, Optional[str]]] = []
+        self.links: List[Dict[str, Optional[str]]] = []
+        self._text: List[str] = []
         self._in_a = False
         self._href = ""
-        self._text_chunks: List[str] = []
+        self._a_text: List[str] = []
+        self._a_run = False  # the next data continues the current text run of the <a>
+
+    def text(self) -> Optional[str]:
+        return " ".join("".join(self._text).split()) or None
+
+    def updatepos(self, i, j):
+        # Skip the line/column bookkeeping (newline counting per token): getpos() is never used
+        return j
 
     def handle_starttag(self, tag, attrs):
-        if tag.lower() == "a":
+        self._text.append(" ")
+        self._a_run = False
+        if tag == "a":
             self._in_a = True
             self._href = dict(attrs).get("href", "")
 
     def handle_endtag(self, tag):
-        if tag.lower() == "a" and self._in_a:
-            text = " ".join(self._text_chunks).strip()
-            self.links.append((self._href, text))
+        self._text.append(" ")
+        self._a_run = False
+        if tag == "a" and self._in_a:
+            text = " ".join(self._a_text).strip()
+            self.anchors.append((self._href, text))
+            href = (self._href or "").strip()
+            if href:
+                is_doc, item = _link_item(href, text)
+                (self.documents if is_doc else self.links).append(item)
             self._in_a = False
             self._href = ""
-            self._text_chunks = []
+            self._a_text = []
 
     def handle_data(self, data):
+        if self.cdata_elem is None:  # not <script>/<style> content
+            self._text.append(data)
         if self._in_a:
-            self._text_chunks.append(data)
+            self._a_data(data)
 
-def _extract_links(html: Optional[str]) -> List[Dict[str, Optional[str]]]:
-    if not html:
-        return []
-    p = _LinkExtractor()
+    def _a_data(self, data):
+        # Data between two tags is one label chunk, entities decoded, as with convert_charrefs
+        if self._a_run:
+            self._a_text[-1] += data
+        else:
+            self._a_text.append(data)
+            self._a_run = True
+
+    def handle_entityref(self, name):
+        self._ref(f"&{name};")
+
+    def handle_charref(self, name):
+        self._ref(f"&#{name};")
+
+    def _ref(self, raw):
+        self._text.append(raw)
+        if self._in_a:
+            self._a_data(unescape(raw))
+
+    def handle_comment(self, data):
+        self._text.append(" ")
+
+    handle_decl = handle_pi = unknown_decl = handle_comment
+
+_parsers = threading.local()
+
+def _html_parser() -> _HTMLScan:
+    """Per-thread parser, reset before each use instead of rebuilt per blob."""
+    p = getattr(_parsers, "scan", None)
+    if p is None:
+        p = _parsers.scan = _HTMLScan()
+    else:
+        p.reset()
+    return p
+
+def _feed(html: str) -> Optional[_HTMLScan]:
+    p = _html_parser()
     try:
         p.feed(html)
+        p.close()
     except Exception:
+        return None
+    return p
+
+def _extract_links(html: Optional[str]) -> List[Dict[str, Optional[str]]]:
+    if not html or not _ANCHOR_RE.search(html):
+        return []
+    p = _feed(html)
+    if p is None:
         return []
     seen = set()
     out: List[Dict[str, Optional[str]]] = []
-    for href, text in p.links:
+    for href, text in p.anchors:
         href = (href or "").strip()
         text = (text or "").strip() or None
         if not href:
@@ -62,9 +149,43 @@ def _extract_links(html: Optional[str]) -> List[Dict[str, Optional[str]]]:
 def _strip_html(html: Optional[str]) -> Optional[str]:
     if not html:
         return None
-    text = re.sub(r"<[^>]+>", " ", html)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip() or None
+    return _TAG_OR_WS_RE.sub(" ", html).strip() or None
+
+def _scan_html(
+    urls: Iterable[str],
+    blobs: Iterable[Optional[str]],
+    text_blob: Optional[str] = None,
+) -> Tuple[Optional[str], List[Dict[str, Any]], List[Dict[str, Optional[str]]]]:
+    """
+    (text of text_blob, documents, links) from root urls plus the links in
+    several HTML blobs, split as _split_documents_vs_links would. Each distinct
+    blob is fed to the parser once, and only if it has an <a> tag or is
+    text_blob (normally one of the blobs).
+    """
+    docs: List[Dict[str, Any]] = []
+    other: List[Dict[str, Optional[str]]] = []
+    for url in urls:
+        is_doc, item = _link_item((url or "").strip(), "")
+        (docs if is_doc else other).append(item)
+    text = None
+    seen = set()
+    for html in [text_blob, *blobs]:
+        if not html or html in seen:
+            continue
+        seen.add(html)
+        is_text = html == text_blob
+        if not is_text and not _ANCHOR_RE.search(html):
+            continue
+        p = _feed(html)
+        if p is None:
+            if is_text:
+                text = _strip_html(html)
+            continue
+        if is_text:
+            text = p.text()
+        docs.extend(p.documents)
+        other.extend(p.links)
+    return text, _dedupe_urls(docs), _dedupe_urls(other)
 
 def _truncate(s: Optional[str], max_len: int) -> Optional[str]:
     if s is None:
@@ -72,69 +193,24 @@ def _truncate(s: Optional[str], max_len: int) -> Optional[str]:
     s = str(s)
     return s if len(s) <= max_len else s[: max_len - 1] + "…"
 
-_DATE_FMTS = (
-    "%Y-%m-%dT%H:%M:%S",
-    "%Y-%m-%dT%H:%M",
-    "%Y-%m-%d",
-    "%d %B %Y",      # 19 January 2025
-    "%d %b %Y",      # 19 Jan 2025
-)
-
 def _parse_date_maybe(s: Optional[str]) -> Optional[str]:
-    if not s:
-        return None
-    s = s.strip()
-    s = re.sub(r"([+-]\d{2})(\d{2})$", r"\1:\2", s)  # +0000 -> +00:00
-    if re.match(r"^\d{4}-\d{2}-\d{2}", s):
-        return s[:10]
-    for fmt in _DATE_FMTS:
-        try:
-            return datetime.strptime(s, fmt).date().isoformat()
-        except ValueError:
-            continue
-    m = re.search(r"\b(\d{4}-\d{2}-\d{2})\b", s)
-    return m.group(1) if m else None
+    return parse_date_maybe(s)
 
 def _compute_deadline_date(deadlines: List[Dict[str, Optional[str]]]) -> Optional[str]:
     """Pick the next upcoming date; if none upcoming, return the latest past (for display)."""
-    today = datetime.now(timezone.utc).date()
-    parsed = []
-    for d in deadlines:
-        ds = d.get("date")
-        if not ds:
-            continue
-        try:
-            parsed.append(datetime.strptime(ds, "%Y-%m-%d").date())
-        except ValueError:
-            pass
-    if not parsed:
-        return None
-    future = sorted([d for d in parsed if d >= today])
-    if future:
-        return future[0].isoformat()
-    return max(parsed).isoformat()
+    return next_or_latest(d.get("date") for d in deadlines)
 
 def _compute_status(opening_date: Optional[str], deadline_date: Optional[str]) -> str:
     if not opening_date and not deadline_date:
         return "Unknown"
-    today = datetime.now(timezone.utc).date()
-    od = None
-    dd = None
-    if opening_date:
-        try:
-            od = datetime.strptime(opening_date, "%Y-%m-%d").date()
-        except ValueError:
-            pass
-    if deadline_date:
-        try:
-            dd = datetime.strptime(deadline_date, "%Y-%m-%d").date()
-        except ValueError:
-            pass
-    if od and today < od:
+    now = today()
+    od = to_date(opening_date) if opening_date else None
+    dd = to_date(deadline_date) if deadline_date else None
+    if od and now < od:
         return "Forthcoming"
-    if dd and today <= dd:
+    if dd and now <= dd:
         return "Open"
-    if dd and today > dd:
+    if dd and now > dd:
         return "Closed"
     return "Unknown"
 
@@ -142,178 +218,159 @@ _DOC_KEYWORDS = (
     "call", "work programme", "work program", "guide", "guidance",
     "template", "terms", "conditions", "instructions"
 )
+_DOC_KEYWORDS_RE = re.compile("|".join(re.escape(k) for k in _DOC_KEYWORDS))
 
-def _split_documents_vs_links(links: List[Dict[str, Optional[str]]]):
-    """PDFs or doc-like labels -> documents; others -> links."""
-    docs, other = [], []
-    for l in links:
-        url = (l.get("url") or "").strip()
-        label = (l.get("label") or "").strip()
-        lower = f"{label} {url}".lower()
-        is_pdf = url.lower().endswith(".pdf")
-        is_doc_like = is_pdf or any(k in lower for k in _DOC_KEYWORDS)
-        doc_item = {
+def _link_item(url: str, label: str) -> Tuple[bool, Dict[str, Any]]:
+    """(is document, item): PDFs or doc-like labels -> document items; others -> link items."""
+    lower = f"{label} {url}".lower()
+    if url.lower().endswith(".pdf") or _DOC_KEYWORDS_RE.search(lower) is not None:
+        return True, {
             "title": label or None, "description": None, "url": url, "lang": None,
             "primary": None, "filename": None, "external_id": None
         }
-        if is_doc_like:
-            docs.append(doc_item)
-        else:
-            other.append({"label": label or None, "url": url})
-    # de-dup by URL
-    def dedupe(lst, key):
-        seen = set(); out = []
-        for x in lst:
-            k = x.get(key)
-            if k and k not in seen:
-                seen.add(k); out.append(x)
-        return out
-    return dedupe(docs, "url"), dedupe(other, "url")
+    return False, {"label": label or None, "url": url}
+
+def _dedupe_urls(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    seen = set(); out = []
+    for x in items:
+        k = x.get("url")
+        if k and k not in seen:
+            seen.add(k); out.append(x)
+    return out
+
+def _split_documents_vs_links(links: List[Dict[str, Optional[str]]]):
+    """PDFs or doc-like labels -> documents; others -> links (de-duplicated by URL)."""
+    docs, other = [], []
+    for l in links:
+        is_doc, item = _link_item((l.get("url") or "").strip(), (l.get("label") or "").strip())
+        (docs if is_doc else other).append(item)
+    return _dedupe_urls(docs), _dedupe_urls(other)
 
 def _first(x):
     return x[0] if isinstance(x, list) and x else None
 
 # =========================
-# VINNOVA normalizer
+# Source mappings
 # =========================
-
-def normalize_vinnova(rec: Dict[str, Any]) -> Dict[str, Any]:
-    # Titles & descriptions (prefer English, fallback Swedish)
-    title_sv = rec.get("Titel")
-    title_en = rec.get("TitelEngelska")
-    desc_html = rec.get("BeskrivningEngelska") or rec.get("Beskrivning")
-    desc_text = _strip_html(desc_html)
-
-    # Multilingual title/summary dicts
-    title_dict = {"sv": title_sv, "en": title_en}
-
-    summary_sv = None
-    summary_en = None
-    for w in (rec.get("WebTextLista") or []):
-        if not summary_en and w.get("TextEn"):
-            summary_en = w["TextEn"]
-        if not summary_sv and w.get("TextSv"):
-            summary_sv = w["TextSv"]
-    if not summary_sv and desc_text:
-        summary_sv = desc_text[:400]
-    if not summary_en and desc_text:
-        summary_en = desc_text[:400]
-    summary_dict = {"sv": summary_sv, "en": summary_en}
-
-    # Dates
-    opening_date = _parse_date_maybe(rec.get("Oppningsdatum"))
-    closing = _parse_date_maybe(rec.get("Stangningsdatum"))
-    deadlines = [{"type": "single", "date": d} for d in [closing] if d]  # API requires 'type'
-
-    # Documents (already structured)
-    documents = []
-    for d in (rec.get("DokumentLista") or []):
-        documents.append({
-            "title": d.get("Titel"),
-            "description": d.get("Beskrivning"),
-            "url": d.get("fileURL"),
-            "lang": d.get("Lang"),
-            "primary": bool(d.get("Primary")) if d.get("Primary") is not None else None,
-            "filename": d.get("FileName"),
-            "external_id": d.get("DokumentID"),
-        })
-
-    # Links (structured) → plus classify doc-like links into documents
-    links_list = []
-    for l in (rec.get("LankLista") or []):
-        links_list.append({"label": l.get("Beskrivning") or None, "url": l.get("URL") or ""})
-    doclike_from_links, links_list = _split_documents_vs_links(links_list)
-    documents = doclike_from_links + documents
-
-    # Apply URL heuristic
-    apply_url = None
-    for l in links_list:
-        if (l.get("label") or "").lower().find("Ansök här") >= 0:
-            apply_url = l.get("url"); break
-
-    # Links object required by API (strings, not null)
-    diarienummer = rec.get("Diarienummer")
-    if diarienummer:
-        landing = f"https://www.vinnova.se/ao/{diarienummer}"
-    else:
-        landing = links_list[0]["url"] if links_list else (rec.get("Webbsida") or apply_url)
-    landing = _ensure_str(landing)
-    apply_url = _ensure_str(apply_url or landing)
-    links_obj = {"landing": landing, "apply": apply_url}
-
-    # Contacts
-    contacts = []
-    for c in (rec.get("KontaktLista") or []):
-        contacts.append({
-            "name": c.get("Namn"),
-            "email": c.get("Epost"),
-            "phone": c.get("Telefon"),
-            "role": c.get("Roll"),
-            "external_id": c.get("KontaktID"),
-        })
-
-    language = ["en"] if (title_en or rec.get("BeskrivningEngelska")) else ["sv"]
-
-    # Required IDs
-    source_uid = rec.get("Diarienummer") or (rec.get("DiarienummerUtlysning") or _ensure_str(title_en or title_sv) or "unknown")
-    deadline_date = _compute_deadline_date(deadlines) if deadlines else None
-    status = _compute_status(opening_date, deadline_date)
-
-    return {
-        "id": f"VINNOVA:{source_uid}",
-        "source_uid": source_uid,
+#
+# Each source is a declarative Mapping (app/mapping.py) compiled once at import
+# into normalize_<source>(record). Field paths and fallbacks live in the spec;
+# logic that does not fit a path goes through the small transforms below.
+
+def _excerpt(text: Optional[str]) -> Optional[str]:
+    return text[:400] if text else None
+
+def _opt_bool(x: Any) -> Optional[bool]:
+    return bool(x) if x is not None else None
+
+def _web_texts(items: Optional[List[Dict[str, Any]]]) -> Tuple[Optional[str], Optional[str]]:
+    """First non-empty (TextSv, TextEn) of a Vinnova WebTextLista."""
+    text_sv = text_en = None
+    for w in (items or []):
+        if not text_en and w.get("TextEn"):
+            text_en = w["TextEn"]
+        if not text_sv and w.get("TextSv"):
+            text_sv = w["TextSv"]
+    return text_sv, text_en
+
+def _first_url(links: List[Dict[str, Any]]) -> Any:
+    return links[0]["url"] if links else None
+
+def _labelled_url(links: List[Dict[str, Any]], label: str) -> Any:
+    for l in links:
+        if (l.get("label") or "").lower().find(label) >= 0:
+            return l.get("url")
+    return None
+
+def _deadlines(dates: Any) -> Each:
+    return Each(dates, {"type": "single", "date": Item()}, when=Item())  # API requires 'type'
+
+def _deadline_date(deadlines: Var) -> Cond:
+    return Cond(deadlines, Call(_compute_deadline_date, deadlines), None)
+
+# --- VINNOVA ---
+
+VINNOVA_MAPPING = Mapping(
+    "VINNOVA",
+    let=[
+        ("diarienummer", Get("Diarienummer")),
+        # Titles & descriptions (prefer English, fallback Swedish)
+        ("title_sv", Get("Titel")),
+        ("title_en", Get("TitelEngelska")),
+        ("desc_html", Or(Get("BeskrivningEngelska"), Get("Beskrivning"))),
+        ("desc_text", Call(_strip_html, Var("desc_html"))),
+        (("summary_sv", "summary_en"), Call(_web_texts, Get("WebTextLista"))),
+        ("summary_sv", Or(Var("summary_sv"), Call(_excerpt, Var("desc_text")))),
+        ("summary_en", Or(Var("summary_en"), Call(_excerpt, Var("desc_text")))),
+        # Dates
+        ("opening_date", Call(_parse_date_maybe, Get("Oppningsdatum"))),
+        ("closing_date", Call(_parse_date_maybe, Get("Stangningsdatum"))),
+        ("deadlines", _deadlines([Var("closing_date")])),
+        # Links (structured) -> doc-like ones join the structured documents
+        (("doclike", "links_list"), Call(_split_documents_vs_links, Each(Get("LankLista"), {
+            "label": Or(Item("Beskrivning"), None),
+            "url": Or(Item("URL"), ""),
+        }))),
+        ("apply_url", Call(_labelled_url, Var("links_list"), "Ansök här")),
+        # Links object required by API (strings, not null)
+        ("landing", Call(_ensure_str, Cond(
+            Var("diarienummer"),
+            Fmt("https://www.vinnova.se/ao/{}", Var("diarienummer")),
+            Cond(Var("links_list"), Call(_first_url, Var("links_list")), Or(Get("Webbsida"), Var("apply_url"))),
+        ))),
+        ("apply_url", Call(_ensure_str, Or(Var("apply_url"), Var("landing")))),
+        # Required IDs
+        ("source_uid", Or(
+            Var("diarienummer"), Get("DiarienummerUtlysning"),
+            Call(_ensure_str, Or(Var("title_en"), Var("title_sv"))), "unknown",
+        )),
+        ("deadline_date", _deadline_date(Var("deadlines"))),
+    ],
+    fields={
+        "id": Fmt("VINNOVA:{}", Var("source_uid")),
+        "source_uid": Var("source_uid"),
         "source": "VINNOVA",
-        "source_id": source_uid,  # optional duplicate; harmless
-        "call_identifier": rec.get("DiarienummerUtlysning"),
-        "title": title_dict,                      # dict per API
-        "summary": summary_dict,                  # dict per API
-        "description_html": desc_html,
-        "description_text": desc_text,
-        "language": language,
+        "source_id": Var("source_uid"),  # optional duplicate; harmless
+        "call_identifier": Get("DiarienummerUtlysning"),
+        "title": {"sv": Var("title_sv"), "en": Var("title_en")},
+        "summary": {"sv": Var("summary_sv"), "en": Var("summary_en")},
+        "description_html": Var("desc_html"),
+        "description_text": Var("desc_text"),
+        "language": Cond(Or(Var("title_en"), Get("BeskrivningEngelska")), ["en"], ["sv"]),
         "programme": None,
-        "opening_date": opening_date,
-        "deadline_date": deadline_date,
-        "deadlines": deadlines,                   # with 'type'
-        "status": status,
+        "opening_date": Var("opening_date"),
+        "deadline_date": Var("deadline_date"),
+        "deadlines": Var("deadlines"),
+        "status": Call(_compute_status, Var("opening_date"), Var("deadline_date")),
         "country": "SE",
-        "apply_url": apply_url,
-        "documents": documents,
-        "contacts": contacts,
-        "links": links_obj,                       # dict of strings
+        "apply_url": Var("apply_url"),
+        "documents": Concat(Var("doclike"), Each(Get("DokumentLista"), {
+            "title": Item("Titel"),
+            "description": Item("Beskrivning"),
+            "url": Item("fileURL"),
+            "lang": Item("Lang"),
+            "primary": Call(_opt_bool, Item("Primary")),
+            "filename": Item("FileName"),
+            "external_id": Item("DokumentID"),
+        })),
+        "contacts": Each(Get("KontaktLista"), {
+            "name": Item("Namn"),
+            "email": Item("Epost"),
+            "phone": Item("Telefon"),
+            "role": Item("Roll"),
+            "external_id": Item("KontaktID"),
+        }),
+        "links": {"landing": Var("landing"), "apply": Var("apply_url")},
         "budget_total": None,
         "currency": None,
-        "extra_json": rec,
-    }
+        "extra_json": Get(),
+    },
+)
 
-# =========================
-# SE Generic normalizer (Formas, Forte, VR)
-# =========================
+# --- SE generic (Formas, Forte, VR) ---
 
-def normalize_se_generic(rec: Dict[str, Any]) -> Dict[str, Any]:
-    source = rec.get("finansiarNamn") or "SE_GENERIC"
-    diarienummer = rec.get("diarienummer")
-    source_uid = diarienummer or "unknown"
-
-    title_sv = rec.get("titel")
-    title_en = rec.get("titelEng")
-    desc_sv = rec.get("beskrivning")
-    desc_en = rec.get("beskrivningEng")
-
-    title_dict = {"sv": title_sv, "en": title_en}
-    summary_dict = {"sv": desc_sv, "en": desc_en}
-    
-    # Prefer English for generic text
-    desc_text = desc_en or desc_sv
-
-    opening_date = rec.get("oppningsdatum")
-    closing_date = rec.get("stangningsdatum")
-    
-    deadlines = []
-    if closing_date:
-        deadlines.append({"type": "single", "date": closing_date})
-
-    # Status
-    raw_status = (rec.get("status") or "").lower()
+def _se_status(raw: Optional[str], opening_date: Optional[str], closing_date: Optional[str]) -> str:
+    raw_status = (raw or "").lower()
     status = "Unknown"
     if "Kommande" in raw_status:
         status = "Forthcoming"
@@ -321,72 +378,66 @@ def normalize_se_generic(rec: Dict[str, Any]) -> Dict[str, Any]:
         status = "Open"
     elif "Avslutad" in raw_status:
         status = "Closed"
-    
     if status == "Unknown":
         status = _compute_status(opening_date, closing_date)
+    return status
 
-    # Links
-    landing_url = ""
-    pub_places = rec.get("publiceringsplatser")
+def _se_landing(pub_places: Any) -> str:
     if isinstance(pub_places, list) and pub_places:
-        landing_url = pub_places[0].get("webbadress") or ""
-    
-    links_obj = {"landing": landing_url, "apply": landing_url}
-
-    language = ["sv"]
-    if title_en or desc_en:
-        language.append("en")
-
-    return {
-        "id": f"{source}:{source_uid}",
-        "source_uid": source_uid,
-        "source": source,
-        "source_id": source_uid,
-        "call_identifier": diarienummer,
-        "title": title_dict,
-        "summary": summary_dict,
+        return pub_places[0].get("webbadress") or ""
+    return ""
+
+SE_GENERIC_MAPPING = Mapping(
+    "SE_GENERIC",
+    let=[
+        ("source", Or(Get("finansiarNamn"), "SE_GENERIC")),
+        ("diarienummer", Get("diarienummer")),
+        ("source_uid", Or(Var("diarienummer"), "unknown")),
+        ("title_en", Get("titelEng")),
+        ("desc_sv", Get("beskrivning")),
+        ("desc_en", Get("beskrivningEng")),
+        ("opening_date", Get("oppningsdatum")),
+        ("closing_date", Get("stangningsdatum")),
+        ("landing_url", Call(_se_landing, Get("publiceringsplatser"))),
+    ],
+    fields={
+        "id": Fmt("{}:{}", Var("source"), Var("source_uid")),
+        "source_uid": Var("source_uid"),
+        "source": Var("source"),
+        "source_id": Var("source_uid"),
+        "call_identifier": Var("diarienummer"),
+        "title": {"sv": Get("titel"), "en": Var("title_en")},
+        "summary": {"sv": Var("desc_sv"), "en": Var("desc_en")},
         "description_html": None,
-        "description_text": desc_text,
-        "language": language,
-        "programme": rec.get("program"),
-        "opening_date": opening_date,
-        "deadline_date": closing_date,
-        "deadlines": deadlines,
-        "status": status,
+        "description_text": Or(Var("desc_en"), Var("desc_sv")),  # prefer English
+        "language": Cond(Or(Var("title_en"), Var("desc_en")), ["sv", "en"], ["sv"]),
+        "programme": Get("program"),
+        "opening_date": Var("opening_date"),
+        "deadline_date": Var("closing_date"),
+        "deadlines": _deadlines([Var("closing_date")]),
+        "status": Call(_se_status, Get("status"), Var("opening_date"), Var("closing_date")),
         "country": "SE",
-        "apply_url": landing_url,
+        "apply_url": Var("landing_url"),
         "documents": [],
         "contacts": [],
-        "links": links_obj,
-        "budget_total": rec.get("budgetBelopp"),
-        "currency": rec.get("budgetValuta"),
-        "extra_json": rec,
+        "links": {"landing": Var("landing_url"), "apply": Var("landing_url")},
+        "budget_total": Get("budgetBelopp"),
+        "currency": Get("budgetValuta"),
+        "extra_json": Get(),
         "keywords": [],
-    }
-
-# =========================
-# EU normalizer
-# =========================
-
-def normalize_eu(result: Dict[str, Any]) -> Dict[str, Any]:
-    meta = result.get("metadata") or {}
+    },
+)
 
-    # Title & descriptions
-    title = _first(meta.get("title")) or result.get("summary") or _first(result.get("title"))
-    desc_html = _first(meta.get("descriptionByte")) or _first(meta.get("destinationDetails")) or None
-    desc_text = _strip_html(desc_html)
-    summary = result.get("summary") or (desc_text[:400] if desc_text else None)
+# --- EU ---
 
-    # Multilingual dicts (EU content typically English)
-    title_dict = {"en": title}
-    summary_dict = {"en": summary}
+_EU_STATUS_IDS = {"31094501": "Forthcoming", "31094502": "Open", "31094503": "Closed"}
+_EU_HTML_KEYS = ("descriptionByte", "destinationDetails", "topicConditions", "supportInfo")
 
-    # Dates from actions (stringified JSON) + fallbacks
+def _eu_actions(actions_raw: Optional[str]) -> Tuple[Optional[str], List[str], str]:
+    """(opening date, deadline dates, status) from the stringified `actions` JSON."""
     opening_date = None
     raw_deadlines: List[str] = []
     status = "unknown"
-
-    actions_raw = _first(meta.get("actions"))
     if actions_raw:
         try:
             actions = json.loads(actions_raw)
@@ -397,107 +448,98 @@ def normalize_eu(result: Dict[str, Any]) -> Dict[str, Any]:
                     pd = _parse_date_maybe(d)
                     if pd:
                         raw_deadlines.append(pd)
-                
+
                 # Map status ID to "Forthcoming", "Open", "Closed"
                 st_id = str((a0.get("status") or {}).get("id", ""))
-                if st_id == "31094501":
-                    status = "Forthcoming"
-                elif st_id == "31094502":
-                    status = "Open"
-                elif st_id == "31094503":
-                    status = "Closed"
+                if st_id in _EU_STATUS_IDS:
+                    status = _EU_STATUS_IDS[st_id]
                 else:
                     st_abbr = (a0.get("status") or {}).get("abbreviation")
                     if isinstance(st_abbr, str) and st_abbr:
                         status = st_abbr.capitalize()
         except Exception:
             pass
+    return opening_date, raw_deadlines, status
 
-    if not opening_date:
-        opening_date = _parse_date_maybe(_first(meta.get("startDate")))
-    if not raw_deadlines:
-        dl = _parse_date_maybe(_first(meta.get("deadlineDate")))
-        if dl:
-            raw_deadlines.append(dl)
-
-    deadlines = [{"type": "single", "date": d} for d in raw_deadlines]  # API requires 'type'
-    deadline_date = _compute_deadline_date(deadlines) if deadlines else None
-    
+def _eu_status(status: str, top_status: List[str], opening_date: Optional[str], deadline_date: Optional[str]) -> str:
     if status == "unknown":
         # Try top-level status list if deep check failed
-        top_status = meta.get("status") or []
-        if "31094501" in top_status:
-            status = "Forthcoming"
-        elif "31094502" in top_status:
-            status = "Open"
-        elif "31094503" in top_status:
-            status = "Closed"
-
+        for st_id, label in _EU_STATUS_IDS.items():
+            if st_id in top_status:
+                status = label
+                break
     if status == "unknown":
         status = _compute_status(opening_date, deadline_date)
-
     # Sanity check: If the calculated deadline is in the past, the call is Closed,
     # regardless of what the API status says (indexes can be stale).
     if deadline_date:
-        try:
-            dd_obj = datetime.strptime(deadline_date, "%Y-%m-%d").date()
-            today = datetime.now(timezone.utc).date()
-            if dd_obj < today:
-                status = "Closed"
-        except ValueError:
-            pass
-
-    # Collect links: root urls + links from HTML blobs
-    links_list: List[Dict[str, Optional[str]]] = []
-    for u in (result.get("url") or []):
-        links_list.append({"label": None, "url": u})
-    for html_key in ("descriptionByte", "destinationDetails", "topicConditions", "supportInfo"):
-        for html_str in (meta.get(html_key) or []):
-            links_list.extend(_extract_links(html_str))
-
-    documents, links_list = _split_documents_vs_links(links_list)
-
-    # Landing/apply links (must be strings)
-    landing = _first(meta.get("esST_URL")) or (links_list[0]["url"] if links_list else _first(result.get("url")))
-    landing = _ensure_str(landing)
-    apply_url = _ensure_str(landing)  # portal is the entry point; can refine later
-    links_obj = {"landing": landing, "apply": apply_url}
-
-    # Programme & identifiers
-    programme_full = _first(meta.get("callTitle"))
-    programme = _truncate(programme_full, 200)
-    call_identifier = _first(meta.get("callIdentifier"))
-    source_uid = _first(meta.get("identifier")) or result.get("reference") or _ensure_str(title) or "unknown"
-
-    # Keywords/tags kept for enrichment (harmless if API ignores)
-    keywords = (meta.get("keywords") or []) + (meta.get("tags") or [])
-
-    return {
-        "id": f"EU:{source_uid}",
-        "source_uid": source_uid,
+        dd_obj = to_date(deadline_date)
+        if dd_obj and dd_obj < today():
+            status = "Closed"
+    return status
+
+def _eu_html(urls: List[str], meta: Dict[str, Any], desc_html: Optional[str]):
+    """(description text, documents, links): root urls + one parse of each HTML blob."""
+    blobs = [html_str for html_key in _EU_HTML_KEYS for html_str in (meta.get(html_key) or [])]
+    return _scan_html(urls, blobs, desc_html)
+
+def _meta(*keys: str) -> Get:
+    return Get(*keys, of=Var("meta"))
+
+EU_MAPPING = Mapping(
+    "EU",
+    let=[
+        ("meta", Or(Get("metadata"), {})),
+        # Title & descriptions
+        ("title", Or(First(_meta("title")), Get("summary"), First(Get("title")))),
+        ("desc_html", Or(First(_meta("descriptionByte")), First(_meta("destinationDetails")), None)),
+        # Description text, documents and links in one parse of each HTML blob
+        (("desc_text", "documents", "links_list"), Call(_eu_html, Or(Get("url"), []), Var("meta"), Var("desc_html"))),
+        # Dates from actions (stringified JSON) + fallbacks
+        (("opening_date", "raw_deadlines", "status"), Call(_eu_actions, First(_meta("actions")))),
+        ("opening_date", Or(Var("opening_date"), Call(_parse_date_maybe, First(_meta("startDate"))))),
+        ("deadlines", _deadlines(Or(Var("raw_deadlines"), [Call(_parse_date_maybe, First(_meta("deadlineDate")))]))),
+        ("deadline_date", _deadline_date(Var("deadlines"))),
+        ("status", Call(_eu_status, Var("status"), Or(_meta("status"), []), Var("opening_date"), Var("deadline_date"))),
+        # Landing/apply links (must be strings); the portal is the entry point
+        ("landing", Call(_ensure_str, Or(
+            First(_meta("esST_URL")),
+            Cond(Var("links_list"), Call(_first_url, Var("links_list")), First(Get("url"))),
+        ))),
+        ("source_uid", Or(First(_meta("identifier")), Get("reference"), Call(_ensure_str, Var("title")), "unknown")),
+    ],
+    fields={
+        "id": Fmt("EU:{}", Var("source_uid")),
+        "source_uid": Var("source_uid"),
         "source": "EU",
-        "source_id": source_uid,          # optional duplicate
-        "call_identifier": call_identifier,
-        "title": title_dict,              # dict per API
-        "summary": summary_dict,          # dict per API
-        "description_html": desc_html,
-        "description_text": desc_text,
-        "language": meta.get("language") or ([result.get("language")] if result.get("language") else ["en"]),
-        "programme": programme,
-        "opening_date": opening_date,
-        "deadline_date": deadline_date,
-        "deadlines": deadlines,           # with 'type'
-        "status": status,
+        "source_id": Var("source_uid"),  # optional duplicate
+        "call_identifier": First(_meta("callIdentifier")),
+        "title": {"en": Var("title")},  # EU content typically English
+        "summary": {"en": Or(Get("summary"), Call(_excerpt, Var("desc_text")))},
+        "description_html": Var("desc_html"),
+        "description_text": Var("desc_text"),
+        "language": Or(_meta("language"), Cond(Get("language"), [Get("language")], ["en"])),
+        "programme": Call(_truncate, First(_meta("callTitle")), 200),
+        "opening_date": Var("opening_date"),
+        "deadline_date": Var("deadline_date"),
+        "deadlines": Var("deadlines"),
+        "status": Var("status"),
         "country": None,
-        "apply_url": apply_url,
-        "documents": documents,
-        "contacts": [],                   # parse mailto: later if needed
-        "links": links_obj,               # dict of strings
+        "apply_url": Var("landing"),
+        "documents": Var("documents"),
+        "contacts": [],  # parse mailto: later if needed
+        "links": {"landing": Var("landing"), "apply": Var("landing")},
         "budget_total": None,
         "currency": None,
-        "extra_json": result,
-        "keywords": keywords,
-    }
+        "extra_json": Get(),
+        # Keywords/tags kept for enrichment (harmless if API ignores)
+        "keywords": Concat(Or(_meta("keywords"), []), Or(_meta("tags"), [])),
+    },
+)
+
+normalize_vinnova = compile_mapping(VINNOVA_MAPPING, name="normalize_vinnova", module=__name__)
+normalize_se_generic = compile_mapping(SE_GENERIC_MAPPING, name="normalize_se_generic", module=__name__)
+normalize_eu = compile_mapping(EU_MAPPING, name="normalize_eu", module=__name__)
 
 # =========================
 # Unified dispatcher
@@ -541,3 +583,84 @@ def normalize(record: Dict[str, Any], source: Optional[str] = None) -> Dict[str,
         return normalize_eu(record)
     except Exception:
         return normalize_vinnova(record)
+
+
+# =========================
+# Batch normalization (process pool)
+# =========================
+
+NORMALIZE_CHUNK_SIZE = 64
+# Pool workers are spawned rather than forked: the pools are fed from threaded
+# code (the ingest pipeline's fetch/normalize threads), and a child forked while
+# another thread holds a lock (logging, the HTTP client) can deadlock on it.
+MP_CONTEXT = multiprocessing.get_context("spawn")
+
+def _normalize_chunk(
+    records: List[Dict[str, Any]],
+    source: Optional[str],
+    normalizer: Callable[..., Dict[str, Any]],
+) -> List[Tuple[bool, Any]]:
+    """Worker side: normalize a chunk, one (ok, record-or-error) per input."""
+    out: List[Tuple[bool, Any]] = []
+    with batch_today():  # one "today" for the whole chunk
+        for rec in records:
+            try:
+                out.append((True, normalizer(rec, source=source) if source is not None else normalizer(rec)))
+            except Exception as e:
+                out.append((False, f"{type(e).__name__}: {e}"))
+    return out
+
+def normalize_many(
+    records: Iterable[Dict[str, Any]],
+    source: Optional[str] = None,
+    *,
+    workers: Optional[int] = None,
+    chunk_size: int = NORMALIZE_CHUNK_SIZE,
+    executor: Optional[Executor] = None,
+    normalizer: Callable[..., Dict[str, Any]] = normalize,
+) -> List[Dict[str, Any]]:
+    """
+    Normalize a batch across CPU cores. Returns one result per input, in input order:
+        {"index": i, "ok": bool, "record": dict | None, "error": str | None}
+
+    Records are sent to a process pool in chunks of chunk_size (normalize_eu is
+    CPU-bound HTML parsing, so threads would serialize on the GIL). A failing
+    record only marks its own result. Pass `executor` to reuse a pool across
+    batches; otherwise one is started for this call with `workers` processes
+    (default: CPU count). workers=1, or a batch smaller than one chunk, runs
+    in-process. `normalizer` must be a picklable module-level function; it is
+    called as normalizer(record, source=source), or as normalizer(record) when
+    no source is given, so the single-source normalizers (normalize_eu, ...)
+    can be passed directly. A pool passed as `executor`
+    should be created with mp_context=MP_CONTEXT when threads are running.
+    """
+    records = list(records)
+    chunks = [records[i:i + chunk_size] for i in range(0, len(records), max(1, chunk_size))]
+    workers = workers or os.cpu_count() or 1
+
+    if executor is None and (workers <= 1 or len(chunks) <= 1):
+        done = [_normalize_chunk(c, source, normalizer) for c in chunks]
+    else:
+        own = executor is None
+        pool = executor or ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=MP_CONTEXT)
+        try:
+            futures = [pool.submit(_normalize_chunk, c, source, normalizer) for c in chunks]
+            done = []
+            for chunk, fut in zip(chunks, futures):
+                try:
+                    done.append(fut.result())
+                except Exception as e:  # worker died (e.g. BrokenProcessPool): fail just this chunk
+                    done.append([(False, f"{type(e).__name__}: {e}")] * len(chunk))
+        finally:
+            if own:
+                pool.shutdown()
+
+    results = []
+    for i, (ok, value) in enumerate(r for chunk in done for r in chunk):
+        results.append({
+            "index": i,
+            "ok": ok,
+            "record": value if ok else None,
+            "error": None if ok else value,
+        })
+    return results
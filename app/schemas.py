@@ -1,5 +1,5 @@
 from typing import Any, Dict, List, Optional
-from datetime import date
+from datetime import date, datetime
 from pydantic import BaseModel, Field, ConfigDict
 
 class Links(BaseModel):
@@ -56,8 +56,41 @@ class OpportunityOut(BaseModel):
 
     model_config = ConfigDict(extra="allow")
 
+class FacetValue(BaseModel):
+    value: str
+    count: int
+
 class Facets(BaseModel):
     sponsors: List[str] = Field(default_factory=list)
     programmes: List[str] = Field(default_factory=list)
     statuses: List[str] = Field(default_factory=list)
     tags: List[str] = Field(default_factory=list)
+    # Same values with document counts, most frequent first
+    counts: Dict[str, List[FacetValue]] = Field(default_factory=dict)
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[str] = None
+    source_uid: Optional[str] = None
+    ok: bool
+    error: Optional[str] = None
+    status: Optional[str] = None  # inserted | updated | unchanged
+
+class BulkResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    results: List[BulkItemResult] = Field(default_factory=list)
+
+class SyncStateIn(BaseModel):
+    watermark: date
+
+class SyncStateOut(BaseModel):
+    source: str
+    watermark: Optional[date] = None
+    synced_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,95 @@
+# app/serialize.py
+"""
+Fast path from ORM rows to JSON bytes for the read/write endpoints.
+
+Rows coming out of the database were validated on the way in (OpportunityIn),
+so they are not run through OpportunityOut again: opportunity_to_dict builds
+the same shape directly, and the endpoints return pre-rendered bytes so
+FastAPI does not validate the response a second time.
+"""
+from datetime import date
+from typing import Any, Dict, List
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:  # stdlib fallback
+    import json
+
+    def _default(o):
+        if isinstance(o, date):
+            return o.isoformat()
+        raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+
+
+def _localized(v) -> Dict[str, Any]:
+    v = v or {}
+    return {"sv": v.get("sv"), "en": v.get("en")}
+
+
+def _iso(v):
+    return v.isoformat() if isinstance(v, date) else v
+
+
+def opportunity_to_dict(o) -> Dict[str, Any]:
+    """
+    Same output as OpportunityOut.model_validate(o, from_attributes=True).model_dump(mode="json")
+    followed by merging o.extra, without the pydantic round trip.
+    """
+    links = o.links or {}
+    out = {
+        "id": o.id,
+        "source": o.source,
+        "source_uid": o.source_uid,
+        "title": _localized(o.title),
+        "summary": _localized(o.summary),
+        "programme": o.programme,
+        "sponsor": o.sponsor,
+        "topic_codes": list(o.topic_codes or []),
+        "tags": list(o.tags or []),
+        "deadlines": [{"type": d.get("type"), "date": d.get("date")} for d in (o.deadlines or [])],
+        "status": o.status,
+        "links": {"landing": links.get("landing", ""), **links},
+        "opens_at": _iso(o.opens_at),
+        "closes_at": _iso(o.closes_at),
+        "notes": o.notes,
+    }
+    if o.extra:
+        out.update(o.extra)
+    return out
+
+
+def projected_to_dict(row, fields: List[str]) -> Dict[str, Any]:
+    """
+    Nest a sparse-fieldset row (labels from crud.field_columns) back into the
+    response shape: "title.en" -> {"title": {"en": ...}}. id is always included.
+    """
+    m = row._mapping
+    out: Dict[str, Any] = {"id": m["id"]}
+    for i, f in enumerate(fields):
+        *parents, leaf = f.split(".")
+        node = out
+        for p in parents:
+            node = node.setdefault(p, {})
+            if not isinstance(node, dict):
+                break
+        else:
+            node[leaf] = _iso(m[f"f{i}"])
+    return out
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with the fast encoder (accepts pre-rendered bytes)."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
@@ -0,0 +1,98 @@
+# scripts/bench_db.py
+"""
+Compare the sync (psycopg2 + threadpool) and async (asyncpg) DB paths used by
+the API handlers, against the database configured through DB_* env vars.
+
+The sync path mimics FastAPI's threadpool (40 workers by default) running
+crud.search_opportunities; the async path runs crud.search_opportunities_async
+on one event loop, like a single uvicorn worker. Both issue the same
+statements (the crud read path is shared); the async one awaits each of them
+on asyncpg.
+
+    python scripts/bench_db.py --requests 2000 --concurrency 100
+
+Recorded on Postgres 16, 5000 opportunities, 1 CPU, 1000 mixed searches:
+
+    sync  (40 threads)    136-142 req/s  p50 177-190 ms  p95 382-422 ms  p99 2794-4856 ms
+    async (40 in flight)  126-129 req/s  p50 261-265 ms  p95 442-478 ms  p99 1257-1358 ms
+    async (100 in flight) 125-127 req/s  p50 323-672 ms  p95 2188-2356 ms p99 3083-3721 ms
+
+At the same concurrency async gives up ~10% throughput for a 2-4x shorter
+tail; past the pool size (30 connections) requests just queue for one.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path to allow importing app modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import crud
+from app.db import SessionLocal, AsyncSessionLocal, async_engine
+
+QUERIES = [
+    {},
+    {"status": "Open"},
+    {"q": "hydrogen"},
+    {"sort": "deadline_asc", "page_size": 50},
+    {"q": "energy", "sort": "relevance"},
+]
+
+
+def _report(label: str, latencies: list, elapsed: float) -> None:
+    latencies.sort()
+    p = lambda x: latencies[min(len(latencies) - 1, int(len(latencies) * x))] * 1000
+    print(
+        f"{label:<6} {len(latencies) / elapsed:8.1f} req/s   "
+        f"p50 {p(0.50):7.1f} ms   p95 {p(0.95):7.1f} ms   p99 {p(0.99):7.1f} ms   "
+        f"mean {statistics.mean(latencies) * 1000:7.1f} ms"
+    )
+
+
+def bench_sync(n: int, workers: int) -> None:
+    def one(i: int) -> float:
+        t0 = time.perf_counter()
+        with SessionLocal() as db:
+            crud.search_opportunities(db, **QUERIES[i % len(QUERIES)])
+        return time.perf_counter() - t0
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        latencies = list(pool.map(one, range(n)))
+    _report("sync", latencies, time.perf_counter() - start)
+
+
+async def bench_async(n: int, concurrency: int) -> None:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> float:
+        async with sem:
+            t0 = time.perf_counter()
+            async with AsyncSessionLocal() as db:
+                await crud.search_opportunities_async(db, **QUERIES[i % len(QUERIES)])
+            return time.perf_counter() - t0
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(i) for i in range(n)))
+    _report("async", list(latencies), time.perf_counter() - start)
+    await async_engine.dispose()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--requests", type=int, default=1000)
+    ap.add_argument("--concurrency", type=int, default=40, help="in-flight requests for the async path")
+    ap.add_argument("--threads", type=int, default=40, help="threadpool size for the sync path")
+    args = ap.parse_args()
+
+    print(f"{args.requests} searches; sync threads={args.threads}, async concurrency={args.concurrency}")
+    bench_sync(args.requests, args.threads)
+    asyncio.run(bench_async(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+# scripts/bench_normalize.py
+"""
+Benchmark suite for app/normalize.py: normalize_vinnova, normalize_se_generic,
+normalize_eu and the normalize() dispatcher (auto-detecting, over all three
+sources interleaved) on the recorded payloads
+
+    scripts/vinnova_sample_data.json   Vinnova calls
+    scripts/se_sample_data.json        Formas / Forte / Vetenskapsrådet (GDP)
+    scripts/eu_sample_data.json        EU Funding & Tenders topics
+
+at several batch sizes (records are cycled to fill a batch, and each batch
+runs under one batch_today(), like a normalize_many chunk). Reports
+records/sec (best of --repeat timings) and the peak traced memory of one
+batch, with its outputs kept, and compares both against the stored baseline
+(scripts/bench_normalize_baseline.json):
+
+    python scripts/bench_normalize.py                    # run, compare, exit 1 on regression
+    python scripts/bench_normalize.py --save-baseline --runs 5   # record a new baseline
+    python scripts/bench_normalize.py --threshold 0.1 --mem-threshold 0.05
+
+Timings are machine-specific: record the baseline on the machine that runs
+the check, while it is otherwise idle. With --runs N every case reports the
+median of N suite runs, so one noisy run does not set the bar.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Add project root to path to allow importing app modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+from sample_connectors import DummyEUConnector
+from app.dates import batch_today
+from app.normalize import normalize, normalize_eu, normalize_se_generic, normalize_vinnova
+
+SAMPLES = os.path.join(ROOT, "scripts")
+BASELINE = os.path.join(SAMPLES, "bench_normalize_baseline.json")
+BATCH_SIZES = (1, 10, 100, 1000)
+THRESHOLD = 0.25      # allowed records/sec drop vs. baseline (fraction)
+MEM_THRESHOLD = 0.25  # allowed peak memory growth vs. baseline (fraction)
+
+Case = Tuple[str, Callable[[Dict[str, Any]], Dict[str, Any]], List[Dict[str, Any]]]
+
+
+def load_cases(samples: str = SAMPLES) -> List[Case]:
+    """(name, normalizer, recorded records) per benchmark case."""
+    def load(name: str) -> List[Dict[str, Any]]:
+        with open(os.path.join(samples, name), encoding="utf-8") as f:
+            return json.load(f)
+
+    vinnova = load("vinnova_sample_data.json")
+    se = load("se_sample_data.json")
+    eu = list(DummyEUConnector(os.path.join(samples, "eu_sample_data.json")))
+    mixed = [r for rs in itertools.zip_longest(vinnova, se, eu) for r in rs if r is not None]
+    return [
+        ("normalize_vinnova", normalize_vinnova, vinnova),
+        ("normalize_se_generic", normalize_se_generic, se),
+        ("normalize_eu", normalize_eu, eu),
+        ("normalize", normalize, mixed),
+    ]
+
+
+def run_batch(fn: Callable[[Dict[str, Any]], Dict[str, Any]], batch: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    with batch_today():
+        return [fn(r) for r in batch]
+
+
+def measure(fn, records: Sequence[Dict[str, Any]], size: int, repeat: int, min_time: float) -> Dict[str, float]:
+    """records/sec and peak KiB for batches of `size` records."""
+    batch = list(itertools.islice(itertools.cycle(records), size))
+    run_batch(fn, batch)  # warm-up (regexes, date caches)
+
+    # Enough batches per timing that short ones are not lost in timer noise
+    loops = 1
+    while True:
+        t0 = time.process_time()
+        for _ in range(loops):
+            run_batch(fn, batch)
+        elapsed = time.process_time() - t0
+        if elapsed >= min_time:
+            break
+        loops *= 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        t0 = time.process_time()
+        for _ in range(loops):
+            run_batch(fn, batch)
+        best = min(best, time.process_time() - t0)
+
+    tracemalloc.start()
+    try:
+        out = run_batch(fn, batch)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del out
+    return {
+        "records_per_sec": round(size * loops / best, 1) if best > 0 else float("inf"),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run_suite(
+    cases: Sequence[Case],
+    sizes: Sequence[int] = BATCH_SIZES,
+    repeat: int = 5,
+    min_time: float = 0.2,
+) -> Dict[str, Dict[str, float]]:
+    """Results keyed "<normalizer>/<batch size>"."""
+    return {
+        f"{name}/{size}": measure(fn, records, size, repeat, min_time)
+        for name, fn, records in cases
+        for size in sizes
+    }
+
+
+def median_results(runs: Sequence[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """Per case and metric, the median over several run_suite() results."""
+    return {
+        key: {metric: statistics.median(r[key][metric] for r in runs) for metric in runs[0][key]}
+        for key in runs[0]
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float = THRESHOLD,
+    mem_threshold: float = MEM_THRESHOLD,
+) -> List[str]:
+    """One message per regression beyond the thresholds; cases missing from the baseline are skipped."""
+    problems = []
+    for key, res in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if res["records_per_sec"] < base["records_per_sec"] * (1 - threshold):
+            problems.append(
+                f"{key}: {res['records_per_sec']:.0f} records/s vs. baseline {base['records_per_sec']:.0f} "
+                f"({res['records_per_sec'] / base['records_per_sec'] - 1:+.0%}, allowed -{threshold:.0%})"
+            )
+        if res["peak_kib"] > base["peak_kib"] * (1 + mem_threshold):
+            problems.append(
+                f"{key}: peak {res['peak_kib']:.1f} KiB vs. baseline {base['peak_kib']:.1f} KiB "
+                f"({res['peak_kib'] / base['peak_kib'] - 1:+.0%}, allowed +{mem_threshold:.0%})"
+            )
+    return problems
+
+
+def load_baseline(path: str = BASELINE) -> Optional[Dict[str, Dict[str, float]]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["results"]
+    except FileNotFoundError:
+        return None
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=list(BATCH_SIZES), help="batch sizes (records)")
+    ap.add_argument("--repeat", type=int, default=5, help="timings per case; the best one counts")
+    ap.add_argument("--min-time", type=float, default=0.2, help="CPU seconds per timing (short batches are looped)")
+    ap.add_argument("--runs", type=int, default=1, help="suite runs; each case reports the median")
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    ap.add_argument("--threshold", type=float, default=THRESHOLD,
+                    help="fail if records/sec drops by more than this fraction (default %(default)s)")
+    ap.add_argument("--mem-threshold", type=float, default=MEM_THRESHOLD,
+                    help="fail if peak memory grows by more than this fraction (default %(default)s)")
+    args = ap.parse_args()
+
+    cases = load_cases()
+    results = median_results([run_suite(cases, args.sizes, args.repeat, args.min_time) for _ in range(args.runs)])
+    baseline = None if args.save_baseline else load_baseline(args.baseline)
+
+    print(f"{'case':<28} {'records/s':>12} {'peak KiB':>10} {'vs. baseline':>14}")
+    for key, res in results.items():
+        base = (baseline or {}).get(key)
+        delta = f"{res['records_per_sec'] / base['records_per_sec'] - 1:+.1%}" if base else "-"
+        print(f"{key:<28} {res['records_per_sec']:>12.1f} {res['peak_kib']:>10.1f} {delta:>14}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": f"{platform.system()} {platform.machine()}",
+                "records": {name: len(records) for name, _, records in cases},
+                "results": results,
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one.")
+        return
+
+    problems = compare(results, baseline, args.threshold, args.mem_threshold)
+    for p in problems:
+        print(f"REGRESSION {p}")
+    if problems:
+        sys.exit(1)
+    print("No regressions beyond the thresholds.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# scripts/bench_normalize_html.py
+"""
+CPU of the HTML handling in normalize_eu, before and after the single-pass
+rework, on the recorded EU Funding & Tenders topics (scripts/eu_sample_data.json).
+
+    before: two regex passes to strip the description, then a new HTMLParser
+            per blob (descriptionByte, destinationDetails, topicConditions,
+            supportInfo) to extract links, then a pass splitting them into
+            documents and links
+    after:  one reused HTMLParser feed per distinct blob, only for the
+            description and blobs with an <a> tag, collecting the description
+            text and the documents / links together (and skipping the
+            parser's line/column bookkeeping)
+
+    python scripts/bench_normalize_html.py --rounds 500
+
+Recorded on 1 CPU, --rounds 500, median of 3 runs:
+
+    html before    1924.3 us / record
+    html after     1773.1 us / record  (1.09x)
+    normalize_eu   1855.6 us / record (after)
+
+Tokenizing the blobs in HTMLParser is nearly all of it; the single pass saves
+the separate text pass and the link split, not the parse itself.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from html.parser import HTMLParser
+
+# Add project root to path to allow importing app modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+from sample_connectors import DummyEUConnector
+from app.normalize import _eu_html, _first, _split_documents_vs_links, normalize_eu
+
+HTML_KEYS = ("descriptionByte", "destinationDetails", "topicConditions", "supportInfo")
+
+
+# ---- before: pinned copy of the per-blob code the single pass replaced ----
+
+class _LegacyLinkExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.links = []
+        self._in_a = False
+        self._href = ""
+        self._text_chunks = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag.lower() == "a":
+            self._in_a = True
+            self._href = dict(attrs).get("href", "")
+
+    def handle_endtag(self, tag):
+        if tag.lower() == "a" and self._in_a:
+            text = " ".join(self._text_chunks).strip()
+            self.links.append((self._href, text))
+            self._in_a = False
+            self._href = ""
+            self._text_chunks = []
+
+    def handle_data(self, data):
+        if self._in_a:
+            self._text_chunks.append(data)
+
+
+def _legacy_strip_html(html):
+    if not html:
+        return None
+    text = re.sub(r"<[^>]+>", " ", html)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip() or None
+
+
+def _legacy_extract_links(html):
+    if not html:
+        return []
+    p = _LegacyLinkExtractor()
+    try:
+        p.feed(html)
+    except Exception:
+        return []
+    seen, out = set(), []
+    for href, text in p.links:
+        href = (href or "").strip()
+        text = (text or "").strip() or None
+        if href and (href, text) not in seen:
+            seen.add((href, text))
+            out.append({"url": href, "label": text})
+    return out
+
+
+def before(records):
+    for rec in records:
+        meta = rec.get("metadata") or {}
+        _legacy_strip_html(_first(meta.get("descriptionByte")) or _first(meta.get("destinationDetails")))
+        links = [{"label": None, "url": u} for u in rec.get("url") or []]
+        for key in HTML_KEYS:
+            for html in meta.get(key) or []:
+                links.extend(_legacy_extract_links(html))
+        _split_documents_vs_links(links)
+
+
+def after(records):
+    for rec in records:
+        meta = rec.get("metadata") or {}
+        _eu_html(rec.get("url") or [], meta, _first(meta.get("descriptionByte")) or _first(meta.get("destinationDetails")))
+
+
+def timeit(fn, arg, rounds: int) -> float:
+    fn(arg)  # warm-up
+    t0 = time.process_time()
+    for _ in range(rounds):
+        fn(arg)
+    return (time.process_time() - t0) / rounds
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rounds", type=int, default=500)
+    args = ap.parse_args()
+
+    records = list(DummyEUConnector(os.path.join(ROOT, "scripts", "eu_sample_data.json")))
+    metas = [r.get("metadata") or {} for r in records]
+    size = sum(len(h) for m in metas for k in HTML_KEYS for h in (m.get(k) or []))
+
+    t_old = timeit(before, records, args.rounds)
+    t_new = timeit(after, records, args.rounds)
+    t_full = timeit(lambda recs: [normalize_eu(r) for r in recs], records, args.rounds)
+    n = len(records)
+    print(f"records={n}  html={size / 1024:.0f} KiB")
+    print(f"html before  {t_old / n * 1e6:8.1f} us / record")
+    print(f"html after   {t_new / n * 1e6:8.1f} us / record  ({t_old / t_new:.2f}x)")
+    print(f"normalize_eu {t_full / n * 1e6:8.1f} us / record (after)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# scripts/bench_normalize_mapping.py
+"""
+CPU of the compiled mapping normalizers (app/normalize.py) against the
+hand-written ones they replaced (scripts/legacy_normalizers.py), on the recorded
+samples (scripts/eu_sample_data.json, scripts/vinnova_sample_data.json).
+Outputs are compared first; the run aborts if they differ.
+
+    python scripts/bench_normalize_mapping.py --rounds 20 --repeat 25 [--no-html]
+
+Reference timings (defaults, 3 runs, 1 CPU, Python 3.11):
+
+    VINNOVA  hand-written  34.9 us  mapped  34.9 us  (1.00-1.01x)
+    EU       hand-written 1963.0 us  mapped 1830.0 us  (1.07x)
+    EU --no-html          83.3 us  mapped  66.1 us  (1.26x)
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add project root to path to allow importing app modules
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+import legacy_normalizers as legacy
+from sample_connectors import DummyEUConnector
+from app import normalize as mapped
+from app.dates import batch_today
+
+HTML_KEYS = ("descriptionByte", "destinationDetails", "topicConditions", "supportInfo")
+
+
+def timeit(fn, records, rounds: int) -> float:
+    t0 = time.process_time()
+    for _ in range(rounds):
+        for r in records:
+            fn(r)
+    return (time.process_time() - t0) / rounds / len(records)
+
+
+def best_of(old, new, records, rounds: int, repeat: int):
+    """Interleaved runs, best of `repeat` each, so drift hits both sides alike."""
+    t_old, t_new = [], []
+    for i in range(repeat):
+        if i % 2:  # alternate which side runs first
+            t_new.append(timeit(new, records, rounds))
+            t_old.append(timeit(old, records, rounds))
+        else:
+            t_old.append(timeit(old, records, rounds))
+            t_new.append(timeit(new, records, rounds))
+    return min(t_old), min(t_new)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rounds", type=int, default=20)
+    ap.add_argument("--repeat", type=int, default=25)
+    ap.add_argument("--no-html", action="store_true",
+                    help="drop the EU HTML blobs, which both sides parse with the same helpers, to time the mapping itself")
+    args = ap.parse_args()
+
+    with open(os.path.join(ROOT, "scripts", "vinnova_sample_data.json"), encoding="utf-8") as f:
+        vinnova = json.load(f)
+    cases = [
+        ("VINNOVA", "normalize_vinnova", vinnova),
+        ("EU", "normalize_eu", list(DummyEUConnector(os.path.join(ROOT, "scripts", "eu_sample_data.json")))),
+    ]
+    if args.no_html:
+        for r in cases[1][2]:
+            for key in HTML_KEYS:
+                (r.get("metadata") or {}).pop(key, None)
+    with batch_today():
+        for source, name, records in cases:
+            old, new = getattr(legacy, name), getattr(mapped, name)
+            for r in records:
+                if old(r) != new(r):
+                    sys.exit(f"{source}: mapped output differs from the hand-written normalizer")
+            t_old, t_new = best_of(old, new, records, args.rounds, args.repeat)
+            print(f"{source:8} records={len(records)}  hand-written {t_old * 1e6:8.1f} us  "
+                  f"mapped {t_new * 1e6:8.1f} us  ({t_old / t_new:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# scripts/bench_serialize.py
+"""
+Per-request CPU of serializing one /opportunities page: the previous pydantic
+path (model_validate + model_dump + extra merge, then response_model validation
+and json.dumps, as FastAPI does) vs the serialize.py fast path.
+
+Rows are built from the recorded Vinnova sample (normalized, so "extra" holds
+the full raw record and HTML description).
+
+    python scripts/bench_serialize.py --page-size 100 --rounds 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add project root to path to allow importing app modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("TESTING", "1")
+
+from app import crud, models
+from app.main import OpportunitiesResponse
+from app.normalize import normalize_vinnova
+from app.schemas import OpportunityIn, OpportunityOut
+from app.serialize import dumps, opportunity_to_dict
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "vinnova_sample_data.json")
+
+
+def build_rows(n: int):
+    with open(SAMPLE, encoding="utf-8") as f:
+        raw = json.load(f)
+    rows = []
+    for i in range(n):
+        rec = normalize_vinnova(raw[i % len(raw)])
+        rec["id"] = f"{rec['id']}-{i}"
+        rec["source_uid"] = f"{rec['source_uid']}-{i}"
+        payload, extras = crud._split_payload(OpportunityIn.model_validate(rec))
+        rows.append(models.Opportunity(**payload, extra=extras))
+    return rows
+
+
+def legacy(rows) -> bytes:
+    items = []
+    for o in rows:
+        base = OpportunityOut.model_validate(o, from_attributes=True).model_dump()
+        if getattr(o, "extra", None):
+            base.update(o.extra)
+        items.append(base)
+    result = {"items": items, "total": 1000, "page": 1, "page_size": len(rows)}
+    content = OpportunitiesResponse.model_validate(result).model_dump(mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast(rows) -> bytes:
+    items = [opportunity_to_dict(o) for o in rows]
+    return dumps({"items": items, "total": 1000, "page": 1, "page_size": len(rows)})
+
+
+def timeit(fn, rows, rounds: int) -> float:
+    fn(rows)  # warm-up
+    t0 = time.process_time()
+    for _ in range(rounds):
+        fn(rows)
+    return (time.process_time() - t0) / rounds
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--page-size", type=int, default=100)
+    ap.add_argument("--rounds", type=int, default=200)
+    args = ap.parse_args()
+
+    rows = build_rows(args.page_size)
+    size = len(fast(rows))
+    t_old = timeit(legacy, rows, args.rounds)
+    t_new = timeit(fast, rows, args.rounds)
+    print(f"page_size={args.page_size}  body={size / 1024:.0f} KiB")
+    print(f"legacy  {t_old * 1000:8.2f} ms CPU / request")
+    print(f"fast    {t_new * 1000:8.2f} ms CPU / request")
+    print(f"saved   {(t_old - t_new) * 1000:8.2f} ms ({t_old / t_new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
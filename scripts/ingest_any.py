@@ -1,6 +1,8 @@
 # scripts/ingest_any.py
+import argparse
 import os
 import time
+from datetime import date
 import sys
 import requests
 from typing import Optional
@@ -9,15 +11,22 @@ from dotenv import load_dotenv
 # Add project root to path to allow importing app modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from app.normalize import normalize  # unified dispatcher
-from app.connectors.vinnova_rounds import fetch as vinnova_rounds_fetch
+from app.dates import today
+from app.ingest import run_pipeline, format_summary
+from app.connectors.vinnova_rounds import fetch as vinnova_rounds_fetch, next_watermark as vinnova_next_watermark
 from app.connectors.eu_ftop import fetch as ftop_fetch
-# NOTE: we no longer import per-source normalizers here; normalize() handles routing.
+from app.connectors.transport import add_cache_arguments, apply_cache_arguments, client as http_client
 from app.connectors.formas import FormasConnector
 from app.connectors.forte import ForteConnector
 from app.connectors.vr import VrConnector
 
 API_URL = os.getenv("API_URL", "http://localhost:8080")
+BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "200"))
+NORMALIZE_WORKERS = int(os.getenv("INGEST_NORMALIZE_WORKERS", "2"))
+# Worker processes for normalization (0 = normalize on the worker threads); one per core by default.
+# They are spawned, not forked (app.normalize.MP_CONTEXT), so starting them from the pipeline threads is safe.
+NORMALIZE_PROCESSES = int(os.getenv("INGEST_NORMALIZE_PROCESSES", str(os.cpu_count() if (os.cpu_count() or 1) > 1 else 0)))
+UPSERT_WORKERS = int(os.getenv("INGEST_UPSERT_WORKERS", "2"))
 
 def wait_for_api(timeout: int = 90) -> None:
     start = time.time()
@@ -33,55 +42,78 @@ def wait_for_api(timeout: int = 90) -> None:
     print(f"ERROR: API not reachable at {API_URL} within {timeout}s", file=sys.stderr)
     sys.exit(1)
 
-def upsert(record: dict, *, source: Optional[str] = None, already_normalized: bool = False) -> None:
-    """
-    Send one opportunity to the API.
-    - If already_normalized=True, 'record' is assumed to match the API schema.
-    - Otherwise we normalize it here. You can pass source="VINNOVA" or "EU" to skip auto-detection.
-    """
-    n = record if already_normalized else normalize(record, source=source)
-
-    r = requests.post(f"{API_URL}/opportunities", json=n, timeout=30)
+def _post_bulk(batch: list) -> dict:
+    """POST one batch to /opportunities/_bulk; returns failed/inserted/updated/unchanged counts."""
+    r = requests.post(f"{API_URL}/opportunities/_bulk", json=batch, timeout=120)
     if r.status_code != 200:
-        print(
-            f"❌ Upsert failed [{r.status_code}] for {n.get('source')}:{n.get('source_id')}: {r.text}",
-            file=sys.stderr,
-        )
+        print(f"❌ Bulk upsert failed [{r.status_code}]: {r.text}", file=sys.stderr)
         r.raise_for_status()
-
-    print(f"✅ {n.get('source')}:{n.get('source_id')}")
+    body = r.json()
+    for res in body.get("results", []):
+        n = batch[res["index"]]
+        if not res.get("ok"):
+            print(f"❌ {n.get('source')}:{n.get('source_id')}: {res.get('error')}", file=sys.stderr)
+        elif res.get("status") != "unchanged":
+            print(f"✅ {n.get('source')}:{n.get('source_id')} ({res.get('status')})")
+    return {k: body.get(k, 0) for k in ("failed", "inserted", "updated", "unchanged")}
+
+def _get_watermark(source: str) -> Optional[str]:
+    """Persisted incremental-sync watermark for a source (None = never synced)."""
+    r = requests.get(f"{API_URL}/_sync/{source}", timeout=30)
+    r.raise_for_status()
+    return r.json().get("watermark")
+
+def _put_watermark(source: str, watermark: date) -> None:
+    r = requests.put(f"{API_URL}/_sync/{source}", json={"watermark": watermark.isoformat()}, timeout=30)
+    r.raise_for_status()
 
 def main() -> None:
+    ap = argparse.ArgumentParser(description="Fetch all sources and upsert them through the API.")
+    ap.add_argument("--full", action="store_true",
+                    help="ignore the stored Vinnova watermark and re-fetch everything since VINNOVA_SINCE")
+    add_cache_arguments(ap)
+    args = ap.parse_args()
+    apply_cache_arguments(args)
     load_dotenv()
     wait_for_api()
 
-    # 1) Mixed dummy JSON; let normalize() auto-detect source
-    #for rec in DummyJSONConnector().fetch():
-    #    upsert(rec)
-
-    # 2) Vinnova dummy connector; route explicitly for clarity
-    #for rec in DummyVinnovaConnector():
-    #    upsert(rec, source="VINNOVA")
-
-    # 3) EU dummy connector; route explicitly
-    #for rec in DummyEUConnector():
-    #    upsert(rec, source="EU")
-
-    # --- Real fetchers (uncomment when needed) ---
-    for rec in vinnova_rounds_fetch():
-        upsert(rec, source="VINNOVA")
-    
-    for rec in ftop_fetch():
-        upsert(rec, source="EU")
-
-    for rec in FormasConnector().fetch():
-        upsert(rec, source="FORMAS")
-
-    for rec in ForteConnector().fetch():
-        upsert(rec, source="FORTE")
-
-    for rec in VrConnector().fetch():
-        upsert(rec, source="VR")
+    run_started = today()  # UTC, like the dates the normalizers judge status against
+    vinnova_since = None if args.full else _get_watermark("VINNOVA")
+    print(f"VINNOVA: {'full sync' if vinnova_since is None else f'changes since {vinnova_since}'}")
+
+    # --- Real fetchers: all sources run concurrently (see app/ingest.py) ---
+    sources = {
+        "VINNOVA": (lambda: vinnova_rounds_fetch(since=vinnova_since), "VINNOVA"),
+        "EU": (ftop_fetch, "EU"),
+        "FORMAS": (FormasConnector().fetch, "FORMAS"),
+        "FORTE": (ForteConnector().fetch, "FORTE"),
+        "VR": (VrConnector().fetch, "VR"),
+    }
+    stats = run_pipeline(
+        sources,
+        _post_bulk,
+        normalize_workers=NORMALIZE_WORKERS,
+        normalize_processes=NORMALIZE_PROCESSES,
+        upsert_workers=UPSERT_WORKERS,
+        batch_size=BATCH_SIZE,
+    )
+    print("\n" + format_summary(stats))
+
+    # Advance the watermark only after a clean run, so failed records are re-fetched next time
+    v = stats["VINNOVA"]
+    if v.error is None and not (v.normalize_failed or v.upsert_failed):
+        watermark = vinnova_next_watermark(run_started)
+        _put_watermark("VINNOVA", watermark)
+        print(f"VINNOVA watermark -> {watermark}")
+    else:
+        print("VINNOVA watermark not advanced (errors during sync)")
+    for host, st in http_client.stats().items():
+        print(
+            f"{host}: {st['requests']} requests, {st['retries']} retries, {st['errors']} errors, "
+            f"{st['bytes'] / 1024:.0f} KiB, avg {st['latency_avg'] * 1000:.0f} ms, max {st['latency_max'] * 1000:.0f} ms"
+        )
+    if http_client.cache is not None:
+        print(f"http cache: {http_client.cache.stats}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,39 @@
+# scripts/recompute_status.py
+"""
+Re-derive status and closes_at for every opportunity from its stored
+deadlines/opens_at (crud.recompute_status), against the database configured
+through DB_* env vars. Only rows whose values change are written, so it is
+cheap to run daily, e.g. from cron:
+
+    5 0 * * *  cd /app && python scripts/recompute_status.py
+
+    python scripts/recompute_status.py [--dry-run] [--today 2025-06-01]
+"""
+import argparse
+import datetime as dt
+import os
+import sys
+import time
+
+# Add project root to path to allow importing app modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import crud
+from app.db import SessionLocal
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--today", type=dt.date.fromisoformat, help="evaluate as of this date (default: current UTC date)")
+    ap.add_argument("--dry-run", action="store_true", help="only count the rows that would change")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    with SessionLocal() as db:
+        n = crud.recompute_status(db, args.today, dry_run=args.dry_run)
+    verb = "would change" if args.dry_run else "changed"
+    print(f"{n} rows {verb} ({time.perf_counter() - t0:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
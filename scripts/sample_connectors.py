@@ -1,3 +1,9 @@
+# scripts/sample_connectors.py
+"""
+Connectors over the recorded sample payloads next to this file, for the
+benchmarks and tests (not a real source). DummyEUConnector loads the EU export
+leniently: stray backslashes and JSON Lines are accepted.
+"""
 import json
 from pathlib import Path
 from typing import Iterable, Dict, Any, Iterator, List, Union
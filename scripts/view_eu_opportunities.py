@@ -1,3 +1,4 @@
+import argparse
 import sys
 import os
 import webbrowser
@@ -8,8 +9,9 @@ import html
 # Add project root to path to allow importing app modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from app.connectors.transport import add_cache_arguments, apply_cache_arguments
 from app.connectors.eu_ftop import fetch
-from app.normalize import normalize_eu
+from app.normalize import normalize_many
 
 # HTML Template with DataTables and Buttons (ColVis)
 HTML_TEMPLATE = """
@@ -75,16 +77,27 @@ HTML_TEMPLATE = """
 """
 
 def main():
+    ap = argparse.ArgumentParser(description="Generate an HTML report of EU Funding & Tenders calls.")
+    ap.add_argument("--workers", type=int, help="normalization processes (default: one per CPU core)")
+    add_cache_arguments(ap)
+    args = ap.parse_args()
+    apply_cache_arguments(args)
+
     print("--- Generating EU Opportunities Report ---")
     
     items = []
     # Fetch a reasonable batch (e.g., up to 10 pages / ~1000 items)
     # Set max_pages=None to fetch everything if desired.
     print("Fetching data from EU API...")
-    for i, raw in enumerate(fetch(page_size=100, max_pages=10)):
-        norm = normalize_eu(raw)
-        items.append(norm)
-        print(f"Fetched {len(items)} items...", end="\r")
+    raw_items = []
+    for raw in fetch(page_size=100, max_pages=10):
+        raw_items.append(raw)
+        print(f"Fetched {len(raw_items)} items...", end="\r")
+    for res in normalize_many(raw_items, source="EU", workers=args.workers):
+        if res["ok"]:
+            items.append(res["record"])
+        else:
+            print(f"\nError normalizing item {res['index']}: {res['error']}")
     
     print(f"\nProcessing {len(items)} items into HTML...")
 
@@ -1,3 +1,4 @@
+import argparse
 import sys
 import os
 import webbrowser
@@ -9,10 +10,11 @@ from dotenv import load_dotenv
 # Add project root to path to allow importing app modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from app.connectors.transport import add_cache_arguments, apply_cache_arguments
 from app.connectors.formas import FormasConnector
 from app.connectors.forte import ForteConnector
 from app.connectors.vr import VrConnector
-from app.normalize import normalize_se_generic
+from app.normalize import normalize_many
 
 # HTML Template with DataTables and Buttons (ColVis)
 HTML_TEMPLATE = """
@@ -79,6 +81,12 @@ HTML_TEMPLATE = """
 """
 
 def main():
+    ap = argparse.ArgumentParser(description="Generate an HTML report of Formas, Forte and VR calls.")
+    ap.add_argument("--workers", type=int, help="normalization processes (default: one per CPU core)")
+    add_cache_arguments(ap)
+    args = ap.parse_args()
+    apply_cache_arguments(args)
+
     print("--- Generating SE Generic Opportunities Report ---")
     load_dotenv()
 
@@ -93,14 +101,13 @@ def main():
     for connector in connectors:
         print(f"Fetching data from {connector.name}...")
         try:
-            raw_items = connector.fetch()
+            raw_items = list(connector.fetch())
             print(f"  Found {len(raw_items)} items.")
-            for i, raw in enumerate(raw_items):
-                try:
-                    norm = normalize_se_generic(raw)
-                    items.append(norm)
-                except Exception as e:
-                    print(f"  Error normalizing item {i} from {connector.name}: {e}")
+            for res in normalize_many(raw_items, source=connector.name.upper(), workers=args.workers):
+                if res["ok"]:
+                    items.append(res["record"])
+                else:
+                    print(f"  Error normalizing item {res['index']} from {connector.name}: {res['error']}")
         except Exception as e:
             print(f"  Error fetching data from {connector.name}: {e}")
     
@@ -1,3 +1,4 @@
+import argparse
 import sys
 import os
 import webbrowser
@@ -8,8 +9,9 @@ import html
 # Add project root to path to allow importing app modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from app.connectors.transport import add_cache_arguments, apply_cache_arguments
 from app.connectors.vinnova_rounds import fetch
-from app.normalize import normalize_vinnova
+from app.normalize import normalize_many
 
 # HTML Template with DataTables and Buttons (ColVis)
 HTML_TEMPLATE = """
@@ -76,20 +78,28 @@ HTML_TEMPLATE = """
 """
 
 def main():
+    ap = argparse.ArgumentParser(description="Generate an HTML report of Vinnova calls.")
+    ap.add_argument("--workers", type=int, help="normalization processes (default: one per CPU core)")
+    add_cache_arguments(ap)
+    args = ap.parse_args()
+    apply_cache_arguments(args)
+
     print("--- Generating Vinnova Opportunities Report ---")
     
     items = []
     print("Fetching data from Vinnova API...")
+    raw_items = []
     try:
-        for i, raw in enumerate(fetch()):
-            try:
-                norm = normalize_vinnova(raw)
-                items.append(norm)
-            except Exception as e:
-                print(f"Error normalizing item {i}: {e}")
-            print(f"Fetched {len(items)} items...", end="\r")
+        for raw in fetch():
+            raw_items.append(raw)
+            print(f"Fetched {len(raw_items)} items...", end="\r")
     except Exception as e:
         print(f"\nError fetching data: {e}")
+    for res in normalize_many(raw_items, source="VINNOVA", workers=args.workers):
+        if res["ok"]:
+            items.append(res["record"])
+        else:
+            print(f"Error normalizing item {res['index']}: {res['error']}")
     
     print(f"\nProcessing {len(items)} items into HTML...")
 
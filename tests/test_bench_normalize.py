@@ -0,0 +1,45 @@
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+os.environ["TESTING"] = "1"
+
+import bench_normalize as bench
+
+
+def test_recorded_payloads_normalize():
+    cases = bench.load_cases()
+    assert [name for name, _, _ in cases] == ["normalize_vinnova", "normalize_se_generic", "normalize_eu", "normalize"]
+    for name, fn, records in cases:
+        assert records, name
+        ids = [fn(r)["id"] for r in records]
+        assert all(ids), name
+    sources = {bench.normalize(r)["source"] for r in cases[-1][2]}
+    assert {"VINNOVA", "EU", "Formas", "Forte", "Vetenskapsrådet"} <= sources
+
+
+def test_suite_reports_every_case_and_size():
+    results = bench.run_suite(bench.load_cases(), sizes=(1, 3), repeat=1, min_time=0)
+    assert len(results) == 8
+    for res in results.values():
+        assert res["records_per_sec"] > 0 and res["peak_kib"] > 0
+    # the stored baseline covers the default suite
+    assert set(bench.load_baseline()) == {
+        f"{name}/{size}" for name, _, _ in bench.load_cases() for size in bench.BATCH_SIZES
+    }
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    base = {"a/1": {"records_per_sec": 1000.0, "peak_kib": 100.0}}
+    assert bench.compare({"a/1": {"records_per_sec": 800.0, "peak_kib": 120.0}}, base, 0.25, 0.25) == []
+    problems = bench.compare({"a/1": {"records_per_sec": 700.0, "peak_kib": 130.0}}, base, 0.25, 0.25)
+    assert len(problems) == 2 and all(p.startswith("a/1:") for p in problems)
+    assert bench.compare({"a/1": {"records_per_sec": 800.0, "peak_kib": 100.0}}, base, threshold=0.1)
+    assert bench.compare({"b/1": {"records_per_sec": 1.0, "peak_kib": 1e9}}, base) == []
+
+
+def test_median_of_runs():
+    runs = [{"a/1": {"records_per_sec": v, "peak_kib": k}} for v, k in ((900.0, 10.0), (1200.0, 12.0), (1000.0, 11.0))]
+    assert bench.median_results(runs) == {"a/1": {"records_per_sec": 1000.0, "peak_kib": 11.0}}
@@ -0,0 +1,93 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ["TESTING"] = "1"
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import models, crud
+from app.schemas import OpportunityIn
+
+
+def get_session():
+    engine = create_engine("sqlite:///:memory:")
+    models.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    return Session()
+
+
+def _rec(uid, **kw):
+    rec = {
+        "id": uid,
+        "source": "s",
+        "source_uid": uid,
+        "title": {"en": f"title {uid}"},
+        "summary": {"en": "s"},
+        "status": "open",
+        "links": {"landing": ""},
+    }
+    rec.update(kw)
+    return rec
+
+
+def test_upsert_many_inserts_updates_and_merges_extra():
+    db = get_session()
+    res = crud.upsert_many(db, [_rec("a", support_info="s1"), _rec("b")])
+    assert [r["ok"] for r in res] == [True, True]
+
+    res = crud.upsert_many(db, [_rec("a", status="closed", budget="1M")], chunk_size=1)
+    assert res[0]["ok"]
+
+    db.expire_all()
+    a = db.query(models.Opportunity).filter_by(source_uid="a").one()
+    assert a.status == "closed"
+    assert a.extra == {"support_info": "s1", "budget": "1M"}
+    assert db.query(models.Opportunity).count() == 2
+
+
+def test_upsert_many_reports_per_item_failures():
+    db = get_session()
+    bad = {"id": "x", "source": "s"}  # missing required fields
+    res = crud.upsert_many(db, [_rec("a"), bad, _rec("b"), _rec("a", status="closed")])
+    assert [r["ok"] for r in res] == [True, False, True, True]
+    assert res[1]["error"]
+    # duplicate source_uid within a batch: last one wins
+    a = db.query(models.Opportunity).filter_by(source_uid="a").one()
+    assert a.status == "closed"
+
+
+def test_upsert_many_isolates_constraint_errors():
+    db = get_session()
+    crud.upsert_many(db, [_rec("a")])
+    res = crud.upsert_many(db, [_rec("b"), _rec("c", id="a"), _rec("d")])
+    assert [r["ok"] for r in res] == [True, False, True]
+    uids = {u for (u,) in db.query(models.Opportunity.source_uid)}
+    assert uids == {"a", "b", "d"}
+
+
+def test_unchanged_records_are_skipped_and_updates_touch_only_changed_columns():
+    db = get_session()
+    res = crud.upsert_many(db, [_rec("a", tags=["x"]), _rec("b")])
+    assert [r["status"] for r in res] == ["inserted", "inserted"]
+    stored_hash = db.query(models.Opportunity.content_hash).filter_by(source_uid="b").scalar()
+    assert stored_hash and len(stored_hash) == 64
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *a: statements.append(a[2]))
+    res = crud.upsert_many(db, [_rec("a", tags=["x"]), _rec("b", status="closed"), _rec("c")])
+    assert [r["status"] for r in res] == ["unchanged", "updated", "inserted"]
+
+    updates = [s for s in statements if s.lstrip().upper().startswith("UPDATE OPPORTUNITIES")]
+    assert len(updates) == 1
+    assert "status" in updates[0] and "title" not in updates[0] and "extra" not in updates[0]
+
+    db.expire_all()
+    assert db.query(models.Opportunity).filter_by(source_uid="b").one().status == "closed"
+    assert crud.get_facets(db)["counts"]["statuses"] == [{"value": "open", "count": 2}, {"value": "closed", "count": 1}]
+
+    # Single-record path: an identical record writes nothing
+    del statements[:]
+    crud.upsert_opportunity(db, OpportunityIn.model_validate(_rec("c")))
+    assert not [s for s in statements if not s.lstrip().upper().startswith("SELECT")]
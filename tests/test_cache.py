@@ -0,0 +1,54 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ["TESTING"] = "1"
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models, crud
+from app.cache import QueryCache, make_key
+
+
+def get_session():
+    engine = create_engine("sqlite:///:memory:")
+    models.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    return Session()
+
+
+def test_key_normalization_and_lru():
+    c = QueryCache(maxsize=2, ttl=60)
+    k1 = make_key("opportunities", [("status", "open"), ("q", "x"), ("tag", None)])
+    assert k1 == make_key("opportunities", [("q", "x"), ("status", "open")])
+
+    c.set(k1, 1)
+    c.set(make_key("facets", []), 2)
+    assert c.get(k1) == (True, 1)
+    c.set(make_key("opportunity", [("id", "a")]), 3)  # evicts facets (least recently used)
+    assert c.get(make_key("facets", [])) == (False, None)
+    assert c.stats()["hits"] == 1 and c.stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    c = QueryCache(maxsize=10, ttl=0)
+    k = make_key("facets", [])
+    c.set(k, 1)
+    assert c.get(k) == (False, None)
+
+
+def test_writes_invalidate():
+    c = QueryCache(maxsize=10, ttl=60)
+    k = make_key("facets", [])
+    c.set(k, "before")
+    assert c.get(k)[0]
+
+    db = get_session()
+    crud.upsert_many(db, [{"id": "a", "source": "s", "source_uid": "a", "title": {"en": "t"},
+                           "summary": {"en": "s"}, "status": "open", "links": {"landing": ""}}])
+    assert c.get(k) == (False, None)
+    assert c.get(make_key("facets", [])) == (False, None)
+    # a result computed against the old version is not stored
+    c.set(k, "stale")
+    assert c.stats()["size"] == 0
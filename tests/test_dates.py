@@ -0,0 +1,39 @@
+import os
+import sys
+from datetime import date
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ["TESTING"] = "1"
+
+from app import dates
+from app.normalize import _compute_deadline_date, _compute_status
+from app.normalize_utils import compute_status
+
+
+def test_parse_date_maybe_formats():
+    assert dates.parse_date_maybe("2025-09-17T17:00:00.000+0200") == "2025-09-17"
+    assert dates.parse_date_maybe("  2025-01-19 ") == "2025-01-19"
+    assert dates.parse_date_maybe("19 January 2025") == "2025-01-19"
+    assert dates.parse_date_maybe("19 Jan 2025") == "2025-01-19"
+    assert dates.parse_date_maybe("deadline: 2025-02-01 (CET)") == "2025-02-01"
+    assert dates.parse_date_maybe("soon") is None
+    assert dates.parse_date_maybe("") is None and dates.parse_date_maybe(None) is None
+
+    assert dates.to_date("2025-02-28") == date(2025, 2, 28)
+    assert dates.to_date("2025-02-30") is None
+    assert dates.to_date("2025-2-3") == date(2025, 2, 3)  # strptime leniency kept
+
+
+def test_batch_today_pins_status_and_deadline():
+    deadlines = [{"type": "single", "date": d} for d in ("2025-01-10", "2025-03-01", "2024-12-01")]
+    with dates.batch_today(date(2025, 2, 1)) as day:
+        assert dates.today() == day == date(2025, 2, 1)
+        with dates.batch_today():  # nested blocks keep the outer date
+            assert dates.today() == day
+        assert _compute_deadline_date(deadlines) == "2025-03-01"
+        assert _compute_status("2025-01-01", "2025-03-01") == "Open"
+        assert compute_status("2025-03-01", None) == "upcoming"
+    with dates.batch_today(date(2025, 4, 1)):
+        assert _compute_deadline_date(deadlines) == "2025-03-01"  # latest past
+        assert _compute_status(None, "2025-03-01") == "Closed"
+    assert dates.today() == dates.datetime.now(dates.timezone.utc).date()
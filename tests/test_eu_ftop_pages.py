@@ -0,0 +1,85 @@
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+import requests
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ["TESTING"] = "1"
+
+from app.connectors import eu_ftop
+
+
+def _rec(ident, status=eu_ftop.STATUS_OPEN, action_status=None):
+    meta = {"identifier": [ident], "status": [status]}
+    if action_status:
+        meta["actions"] = [json.dumps([{"status": {"id": action_status}}])]
+    return {"metadata": meta}
+
+
+def _fake_pages(monkeypatch, total, page_size, closed=()):
+    calls = []
+    active = [0]
+    peak = [0]
+    lock = threading.Lock()
+
+    def fake(page, size):
+        with lock:
+            calls.append(page)
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01 * (total // page_size - page % 3))  # finish out of order
+        start = (page - 1) * size
+        recs = []
+        for i in range(start, min(start + size, total)):
+            ident = f"T{i:03d}"
+            recs.append(_rec(ident, action_status=eu_ftop.STATUS_OPEN if ident not in closed else "31094503"))
+        with lock:
+            active[0] -= 1
+        return {"totalResults": total, "results": recs}
+
+    monkeypatch.setattr(eu_ftop, "_request_page", fake)
+    return calls, peak
+
+
+def _ids(recs):
+    return [r["metadata"]["identifier"][0] for r in recs]
+
+
+def test_parallel_pages_keep_order_and_filtering(monkeypatch):
+    calls, peak = _fake_pages(monkeypatch, total=47, page_size=5, closed={"T007", "T031"})
+    got = _ids(eu_ftop.fetch(page_size=5, max_in_flight=3))
+    expected = [f"T{i:03d}" for i in range(47) if i not in (7, 31)]
+    assert got == expected
+    assert sorted(calls) == list(range(1, 11))
+    assert 1 < peak[0] <= 3
+
+
+def test_sequential_and_max_pages(monkeypatch):
+    calls, peak = _fake_pages(monkeypatch, total=47, page_size=5)
+    assert len(list(eu_ftop.fetch(page_size=5, max_pages=2, max_in_flight=1))) == 10
+    assert calls == [1, 2] and peak[0] == 1
+    calls.clear()
+    assert len(list(eu_ftop.fetch(page_size=5, max_pages=4, max_in_flight=4))) == 20
+    assert sorted(calls) == [1, 2, 3, 4]
+
+
+@pytest.mark.parametrize("error", [requests.Timeout("slow"), ValueError("not json")])
+def test_failed_page_is_raised_after_earlier_records(monkeypatch, error):
+    _fake_pages(monkeypatch, total=47, page_size=5)
+    ok = eu_ftop._request_page
+
+    def flaky(page, size):
+        if page == 3:
+            raise error
+        return ok(page, size)
+
+    monkeypatch.setattr(eu_ftop, "_request_page", flaky)
+    got = []
+    with pytest.raises(type(error)):
+        for rec in eu_ftop.fetch(page_size=5, max_in_flight=1):
+            got.append(rec)
+    assert _ids(got) == [f"T{i:03d}" for i in range(10)]
@@ -1,13 +1,17 @@
 import os
+import random
 import sys
+import threading
 
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 os.environ["TESTING"] = "1"
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, select
 from sqlalchemy.orm import sessionmaker
 
 from app import models, crud
+from pg import pg_engine, requires_pg
 
 
 def get_session():
@@ -56,3 +60,110 @@ def test_get_facets():
     assert facets["statuses"] == ["closed", "open"]
     assert facets["tags"] == ["t1", "t2"]
 
+
+
+def test_facet_counts_follow_upserts():
+    db = get_session()
+
+    def rec(uid, sponsor, tags, status="open"):
+        return {"id": uid, "source": "s", "source_uid": uid, "title": {"en": "t"}, "summary": {"en": "s"},
+                "sponsor": sponsor, "tags": tags, "status": status, "links": {"landing": ""}}
+
+    crud.upsert_many(db, [rec("1", "a1", ["t1", "t2"]), rec("2", "a1", ["t2"]), rec("3", "a2", [])])
+    facets = crud.get_facets(db)
+    assert facets["counts"]["sponsors"] == [{"value": "a1", "count": 2}, {"value": "a2", "count": 1}]
+    assert facets["counts"]["tags"] == [{"value": "t2", "count": 2}, {"value": "t1", "count": 1}]
+
+    # moving a record between values adjusts both sides; empty values disappear
+    crud.upsert_many(db, [rec("3", "a1", ["t1"], status="closed")])
+    crud.upsert_opportunity(db, crud.OpportunityIn(**rec("1", "a1", ["t2"])))
+    facets = crud.get_facets(db)
+    assert facets["sponsors"] == ["a1"]
+    assert facets["counts"]["sponsors"] == [{"value": "a1", "count": 3}]
+    assert facets["counts"]["statuses"] == [{"value": "open", "count": 2}, {"value": "closed", "count": 1}]
+    assert facets["counts"]["tags"] == [{"value": "t2", "count": 2}, {"value": "t1", "count": 1}]
+
+    # the incremental summary matches a full rebuild
+    crud.refresh_facets(db)
+    assert crud.get_facets(db) == facets
+
+
+def test_filtered_facets_and_limit():
+    db = get_session()
+
+    def rec(uid, sponsor, tags, status="open", title="t"):
+        return {"id": uid, "source": "s", "source_uid": uid, "title": {"en": title}, "summary": {"en": "s"},
+                "sponsor": sponsor, "tags": tags, "status": status, "links": {"landing": ""}}
+
+    crud.upsert_many(db, [
+        rec("1", "a1", ["t1", "t2"], title="Hydrogen planes"),
+        rec("2", "a2", ["t2", "t3"], title="Green hydrogen"),
+        rec("3", "a2", ["t3"], status="closed", title="Hydrogen storage"),
+        rec("4", "a3", ["t1"], title="Batteries"),
+    ])
+    facets = crud.get_facets(db, q="hydrogen", status="open")
+    assert facets["counts"]["sponsors"] == [{"value": "a1", "count": 1}, {"value": "a2", "count": 1}]
+    assert facets["counts"]["statuses"] == [{"value": "open", "count": 2}]
+    assert facets["counts"]["tags"] == [
+        {"value": "t2", "count": 2}, {"value": "t1", "count": 1}, {"value": "t3", "count": 1},
+    ]
+
+    top = crud.get_facets(db, q="hydrogen", limit=1)
+    assert top["counts"]["sponsors"] == [{"value": "a2", "count": 2}]
+    assert top["tags"] == ["t2"]
+    assert len(crud.get_facets(db, limit=2)["tags"]) == 2
+
+
+@requires_pg
+def test_facet_counts_stay_exact_under_concurrent_writers():
+    engine = pg_engine()
+    Session = sessionmaker(bind=engine)
+    F = models.FacetCount
+
+    def rec(uid, rnd):
+        return {"id": uid, "source": "s", "source_uid": uid, "title": {"en": "t"}, "summary": {"en": "s"},
+                "sponsor": rnd.choice(["a1", "a2", "a3"]), "tags": rnd.sample(["t1", "t2", "t3", "t4"], 2),
+                "status": rnd.choice(["Open", "Closed"]), "links": {"landing": ""}}
+
+    # Overlapping batches: writers race on inserting the same new rows and on updating the same rows
+    errors = []
+    start = threading.Barrier(4)
+
+    def writer(n):
+        rnd = random.Random(n)
+        try:
+            start.wait()
+            for _ in range(15):
+                batch = [rec(f"r{i}", rnd) for i in rnd.sample(range(30), 10)]
+                with Session() as db:
+                    res = crud.upsert_many(db, batch, chunk_size=4)
+                    assert all(r["ok"] for r in res), [r["error"] for r in res if not r["ok"]]
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+
+    with Session() as db:
+        incremental = sorted(db.execute(select(F.dimension, F.value, F.doc_count)).all())
+        crud.refresh_facets(db)
+        assert incremental == sorted(db.execute(select(F.dimension, F.value, F.doc_count)).all())
+    engine.dispose()
+
+
+@requires_pg
+def test_facet_values_have_no_length_limit():
+    engine = pg_engine()
+    long_tag = "x" * 1000
+    with sessionmaker(bind=engine)() as db:
+        res = crud.upsert_many(db, [{
+            "id": "1", "source": "s", "source_uid": "1", "title": {"en": "t"}, "summary": {"en": "s"},
+            "tags": [long_tag], "status": "Open", "links": {"landing": ""},
+        }])
+        assert res[0]["ok"], res[0]["error"]
+        assert crud.get_facets(db)["tags"] == [long_tag]
+    engine.dispose()
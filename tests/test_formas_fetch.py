@@ -25,11 +25,9 @@ def main():
     connector = FormasConnector()
     
     try:
-        items = connector.fetch()
-        print(f"Fetched {len(items)} items.")
-        
+        # fetch() streams records; stop reading after the first three
         count = 0
-        for item in items:
+        for item in connector.fetch():
             if count >= 3:
                 break
             count += 1
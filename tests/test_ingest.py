@@ -0,0 +1,120 @@
+import os
+import sys
+import threading
+from datetime import date
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ["TESTING"] = "1"
+
+from app import dates
+from app.ingest import run_pipeline, format_summary
+
+
+def _records(n, prefix):
+    return [{"id": f"{prefix}{i}", "source_uid": f"{prefix}{i}", "links": {}} for i in range(n)]
+
+
+def test_pipeline_runs_all_sources_and_isolates_failures():
+    received = []
+    lock = threading.Lock()
+
+    def sink(batch):
+        with lock:
+            received.extend(batch)
+        return sum(1 for r in batch if r["id"] == "b3")  # pretend one row is rejected
+
+    def broken():
+        yield from _records(2, "c")
+        raise RuntimeError("boom")
+
+    def bad_normalize(rec, source=None):
+        if rec["id"] == "a5":
+            raise ValueError("bad record")
+        return rec
+
+    stats = run_pipeline(
+        {
+            "A": (lambda: _records(50, "a"), None),
+            "B": (lambda: iter(_records(7, "b")), None),
+            "C": (broken, None),
+        },
+        sink,
+        normalizer=bad_normalize,
+        batch_size=4,
+        queue_size=3,
+    )
+    assert (stats["A"].fetched, stats["A"].upserted, stats["A"].normalize_failed) == (50, 49, 1)
+    assert (stats["B"].upserted, stats["B"].upsert_failed) == (6, 1)
+    assert stats["C"].fetched == 2 and stats["C"].upserted == 2
+    assert "boom" in stats["C"].error
+    assert len(received) == 49 + 7 + 2
+    assert "boom" in format_summary(stats)
+
+
+def test_pipeline_tallies_write_outcomes_from_sink():
+    def sink(batch):
+        return {"failed": 0, "inserted": 1, "updated": 0, "unchanged": len(batch) - 1}
+
+    stats = run_pipeline({"A": (lambda: _records(10, "a"), None)}, sink, normalizer=lambda r, source=None: r, batch_size=5)
+    st = stats["A"]
+    assert (st.upserted, st.inserted, st.unchanged, st.updated) == (10, 2, 8, 0)
+
+
+def _run_with_timeout(*args, **kwargs):
+    out = {}
+    t = threading.Thread(target=lambda: out.update(stats=run_pipeline(*args, **kwargs)), daemon=True)
+    t.start()
+    t.join(timeout=30)
+    assert not t.is_alive(), "pipeline hung"
+    return out["stats"]
+
+
+def test_thread_normalizers_see_the_pinned_day():
+    seen = []
+
+    def normalizer(rec, source=None):
+        seen.append(dates.today())
+        return rec
+
+    with dates.batch_today(date(2025, 3, 1)):
+        stats = run_pipeline({"A": (lambda: _records(20, "a"), None)}, lambda batch: 0, normalizer=normalizer)
+    assert stats["A"].upserted == 20
+    assert seen == [date(2025, 3, 1)] * 20
+
+
+def test_unexpected_worker_errors_fail_the_batch_and_keep_draining(monkeypatch):
+    # A sink result flush() cannot tally used to kill the upsert worker and block
+    # the bounded queues behind it
+    calls = []
+
+    def sink(batch):
+        calls.append(len(batch))
+        return None if len(calls) == 1 else 0
+
+    stats = _run_with_timeout(
+        {"A": (lambda: _records(40, "a"), None)}, sink,
+        normalizer=lambda r, source=None: r, upsert_workers=1, batch_size=4, queue_size=2,
+    )
+    st = stats["A"]
+    assert (st.upserted, st.upsert_failed) == (36, 4)
+    assert "AttributeError" in st.error
+
+    # Same for the batch normalize workers, e.g. normalize_many hitting a broken pool
+    import app.ingest as ingest
+    real = ingest.normalize_many
+    seen = []
+
+    def flaky(recs, **kwargs):
+        seen.append(len(recs))
+        if len(seen) == 1:
+            raise RuntimeError("pool broke")
+        return real(recs, **kwargs)
+
+    monkeypatch.setattr(ingest, "normalize_many", flaky)
+    stats = _run_with_timeout(
+        {"A": (lambda: _records(40, "a"), None)}, lambda batch: 0,
+        normalize_workers=1, normalize_processes=1, batch_size=4, queue_size=2,
+    )
+    st = stats["A"]
+    assert st.normalize_failed == seen[0] and st.upserted == 40 - seen[0]
+    assert "pool broke" in st.error
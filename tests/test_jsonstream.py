@@ -0,0 +1,72 @@
+import json
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ["TESTING"] = "1"
+
+from app.connectors import gdp
+from app.connectors.formas import FormasConnector
+from app.connectors.jsonstream import iter_json_items
+
+
+def _chunks(body: bytes, size: int):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+RECORDS = [{"id": i, "title": "Utlysning åäö ✓", "amounts": [1.5, -2e3, None, True]} for i in range(50)] + [12345]
+
+
+def test_decodes_arrays_and_wrapped_arrays_at_any_chunk_boundary():
+    for payload, expected in (
+        (RECORDS, RECORDS),
+        ({"meta": {"results": [0]}, "total": 51, "results": RECORDS}, RECORDS),
+        ({"data": RECORDS[:3]}, RECORDS[:3]),
+        ({"count": 0}, []),
+        # key priority, not document order, decides (results > Result > data); empty falls through
+        ({"data": [1], "total": 2, "results": [2, 3]}, [2, 3]),
+        ({"results": [], "Result": None, "data": [4]}, [4]),
+        ({"data": [5], "results": []}, [5]),
+        ({"Result": [6], "results": [7]}, [7]),
+        ([], []),
+    ):
+        body = json.dumps(payload, ensure_ascii=False, indent=1).encode()
+        for size in (1, 7, 4096):
+            assert list(iter_json_items(_chunks(body, size))) == expected
+    assert list(iter_json_items([])) == []
+
+
+def test_records_are_yielded_before_the_body_is_complete():
+    def body():
+        yield b'[{"id": 1}, '
+        raise AssertionError("read past the first record")
+
+    assert next(iter_json_items(body())) == {"id": 1}
+
+
+def test_gdp_connector_streams_and_keeps_records_read_before_an_error(monkeypatch):
+    monkeypatch.setenv("FORMAS_API_KEY", "k")
+    calls = []
+
+    def fake_get(url, **kw):
+        calls.append(kw)
+        r = requests.Response()
+        r.status_code = 200
+        r.raw = None
+        r.close = lambda: None
+        r.iter_content = lambda chunk_size=1: iter([b'[{"id": "a"}, {"id": "b"}, {"id": '])
+        return r
+
+    monkeypatch.setattr(gdp.http, "get", fake_get)
+    got = []
+    with pytest.raises(json.JSONDecodeError):  # truncated body: logged and re-raised, so the run records the error
+        for rec in FormasConnector().fetch():
+            got.append(rec)
+    assert got == [{"id": "a"}, {"id": "b"}]
+    assert calls[0]["stream"] is True and calls[0]["headers"] == {"Authorization": "k"}
+
+    monkeypatch.delenv("FORMAS_API_KEY")
+    assert list(FormasConnector().fetch()) == []
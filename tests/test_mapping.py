@@ -0,0 +1,128 @@
+import json
+import os
+import pickle
+import sys
+from datetime import date
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+os.environ["TESTING"] = "1"
+
+from app import normalize as mapped
+from app.dates import batch_today
+from app.mapping import Call, Cond, Each, First, Fmt, Get, Item, Mapping, MappingError, Or, Var, compile_mapping
+from sample_connectors import DummyEUConnector
+
+SE_RAW = [
+    {
+        "finansiarNamn": "FORMAS", "diarienummer": "2025-00123", "titel": "Utlysning", "titelEng": "Call",
+        "beskrivning": "Beskrivning", "beskrivningEng": None, "oppningsdatum": "2025-01-10",
+        "stangningsdatum": "2025-04-01", "status": "Pågående", "program": "P1",
+        "budgetBelopp": 1000000, "budgetValuta": "SEK", "publiceringsplatser": [{"webbadress": "https://formas.se/x"}],
+    },
+    {"finansiarNamn": "VR", "titel": "T", "publiceringsplatser": [], "stangningsdatum": "2031-01-01"},
+]
+
+
+def _samples():
+    with open(os.path.join(ROOT, "scripts", "vinnova_sample_data.json"), encoding="utf-8") as f:
+        vinnova = json.load(f)
+    eu = list(DummyEUConnector(os.path.join(ROOT, "scripts", "eu_sample_data.json")))
+    return [("normalize_vinnova", vinnova), ("normalize_eu", eu), ("normalize_se_generic", SE_RAW)]
+
+
+GOLDEN = os.path.join(os.path.dirname(__file__), "golden", "normalized.json")
+STATUS_DAYS = (date(2024, 1, 1), date(2025, 3, 1), date(2032, 1, 1))
+
+
+def _golden():
+    """Expected outputs, recorded from the hand-written normalizers the mappings replaced."""
+    with open(GOLDEN, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _current():
+    samples = _samples()
+    with batch_today(date(2025, 3, 1)):
+        outputs = {name: [getattr(mapped, name)(r) for r in recs] for name, recs in samples}
+    status = {}
+    for day in STATUS_DAYS:
+        with batch_today(day):
+            status[day.isoformat()] = {name: [getattr(mapped, name)(r)["status"] for r in recs] for name, recs in samples}
+    return {"today": "2025-03-01", "outputs": outputs, "status": status}
+
+
+def test_mapped_normalizers_match_golden_outputs():
+    golden, current = _golden(), _current()
+    for name, expected in golden["outputs"].items():
+        got = current["outputs"][name]
+        assert len(got) == len(expected)
+        for new, old in zip(got, expected):
+            # dumps compares key order too, nested dicts included
+            assert json.dumps(new, ensure_ascii=False) == json.dumps(old, ensure_ascii=False)
+    assert current["status"] == golden["status"]
+
+
+def test_compiled_normalizers_pickle():
+    # normalize_many hands normalizers to worker processes
+    assert pickle.loads(pickle.dumps(mapped.normalize_eu)) is mapped.normalize_eu
+
+
+def test_compile_mapping_features():
+    spec = Mapping(
+        "DEMO",
+        let=[
+            ("uid", Or(Get("id"), Get("meta", "ref"), "unknown")),
+            (("head", "rest"), Call(lambda xs: (xs[:1], xs[1:]), Or(Get("tags"), []))),
+        ],
+        fields={
+            "id": Fmt("DEMO:{}", Var("uid")),
+            "name": First(Get("names")),
+            "kind": Cond(Get("url"), "link", "text"),
+            "head": Var("head"),
+            "items": Each(Get("items"), {"n": Item("n"), "fixed": ["a"]}, when=Item("n")),
+            "nested": Each(Get("groups"), Each(Item("members"), Item("name"))),
+        },
+    )
+    fn = compile_mapping(spec)
+    out = fn({
+        "meta": {"ref": "r1"}, "names": ["x", "y"], "tags": ["t1", "t2"],
+        "items": [{"n": 1}, {"n": 0}, {"n": 2}], "groups": [{"members": [{"name": "a"}]}, {}],
+    })
+    assert out == {
+        "id": "DEMO:r1", "name": "x", "kind": "text", "head": ["t1"],
+        "items": [{"n": 1, "fixed": ["a"]}, {"n": 2, "fixed": ["a"]}], "nested": [["a"], []],
+    }
+    assert out["items"][0]["fixed"] is not fn({"items": [{"n": 1}]})["items"][0]["fixed"]
+    assert fn({})["id"] == "DEMO:unknown" and fn({})["items"] == []
+    assert "def map_demo(rec):" in fn.__mapping_source__
+
+    with pytest.raises(MappingError):
+        compile_mapping(Mapping("BAD", fields={"x": Var("missing")}))
+    with pytest.raises(MappingError):
+        compile_mapping(Mapping("BAD", fields={"x": Item("a")}))
+
+
+def test_each_over_bound_names_is_unrolled():
+    spec = Mapping(
+        "DEMO",
+        let=[("a", Get("a")), ("b", Get("b"))],
+        fields={
+            "one": Each([Var("a")], {"date": Item()}, when=Item()),
+            "two": Each([Var("a"), Var("b")], [Item()], when=Item()),
+        },
+    )
+    fn = compile_mapping(spec)
+    assert " for " not in fn.__mapping_source__  # no comprehension left
+    assert fn({"a": 1, "b": 2}) == {"one": [{"date": 1}], "two": [[1], [2]]}
+    assert fn({"b": 2}) == {"one": [], "two": [[2]]}
+
+
+
+if __name__ == "__main__":  # after an intended output change: python tests/test_mapping.py
+    with open(GOLDEN, "w", encoding="utf-8") as f:
+        json.dump(_current(), f, ensure_ascii=False, indent=1)
+        f.write("\n")
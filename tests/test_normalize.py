@@ -1,10 +1,19 @@
+import json
 import os
 import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 os.environ["TESTING"] = "1"
 
-from app.normalize import normalize, normalize_ftop
+from app.normalize import normalize
+
+SAMPLES = os.path.join(os.path.dirname(__file__), "..", "scripts")
+
+
+def _load(name):
+    with open(os.path.join(SAMPLES, name), encoding="utf-8") as f:
+        return json.load(f)
+
 
 def test_normalize_minimal():
     rec = {
@@ -13,31 +22,38 @@ def test_normalize_minimal():
         "links": {"landing":"https://example.org"},
         "deadlines":[{"type":"single","date":"01/12/2025"}]
     }
-    n = normalize(rec)
-    assert n["status"] == "planned"
-    assert n["deadlines"][0]["date"] == "2025-12-01"
-    assert set(n["title"].keys()) == {"sv","en"}
-    assert n["topic_codes"] == []
+    # Already in API shape: passed through untouched
+    assert normalize(rec) is rec
 
 
-def test_ftop_uid_fallback():
-    rec = {"title": {"text": "Example"}}
-    n = normalize_ftop(rec)
-    assert n["source_uid"], "source_uid should not be empty"
-    assert n["id"].startswith("euftop:")
-    # Ensure overall normalize accepts it
-    normalized = normalize(n)
-    assert normalized["source_uid"] == n["source_uid"]
+def test_normalize_routes_by_shape():
+    vinnova = _load("vinnova_sample_data.json")[0]
+    se = _load("se_sample_data.json")[0]
+    eu = {"reference": "TOPIC-1", "metadata": {"title": ["Example"]}}
 
+    n = normalize(vinnova)
+    assert n["source"] == "VINNOVA" and n["id"] == f"VINNOVA:{vinnova['Diarienummer']}"
+    n = normalize(se)
+    assert n["source"] == se["finansiarNamn"] and n["source_uid"] == se["diarienummer"]
+    n = normalize(eu)
+    assert n["source"] == "EU" and n["id"] == "EU:TOPIC-1"
+    assert n["title"] == {"en": "Example"}
 
-def test_ftop_extra_fields():
-    rec = {
-        "title": "Extra",
-        "topicConditions": "Conditions text",
-        "supportInfo": "Support text",
-        "budgetOverview": "Budget text",
-    }
-    n = normalize_ftop(rec)
-    assert n["topic_conditions"] == "Conditions text"
-    assert n["support_info"] == "Support text"
-    assert n["budget_overview"] == "Budget text"
+    # An explicit source wins over the shape
+    assert normalize(se, source="VR")["id"] == normalize(se)["id"]
+    assert normalize({"Diarienummer": "2025-1"}, source="EU")["source"] == "EU"
+
+
+def test_normalize_output_is_accepted_again():
+    for rec in _load("se_sample_data.json")[:5] + _load("vinnova_sample_data.json"):
+        n = normalize(rec)
+        assert n["source_uid"] and isinstance(n["links"], dict)
+        assert normalize(n) is n
+
+
+def test_eu_uid_fallback_and_extra_fields():
+    rec = {"title": "Extra", "topicConditions": "Conditions text"}
+    n = normalize(rec)
+    assert n["source_uid"], "source_uid should not be empty"
+    assert n["id"].startswith("EU:")
+    assert n["extra_json"] == rec
@@ -0,0 +1,86 @@
+import os
+import sys
+from html.parser import HTMLParser
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+os.environ["TESTING"] = "1"
+
+from app.normalize import _EU_HTML_KEYS, _extract_links, _scan_html, _split_documents_vs_links, _strip_html
+from sample_connectors import DummyEUConnector
+
+
+class _Anchors(HTMLParser):
+    """Reference: the per-blob link extractor normalize used before the single pass."""
+
+    def __init__(self):
+        super().__init__()
+        self.links, self._in_a, self._href, self._text_chunks = [], False, "", []
+
+    def handle_starttag(self, tag, attrs):
+        if tag.lower() == "a":
+            self._in_a = True
+            self._href = dict(attrs).get("href", "")
+
+    def handle_endtag(self, tag):
+        if tag.lower() == "a" and self._in_a:
+            self.links.append((self._href, " ".join(self._text_chunks).strip()))
+            self._in_a, self._href, self._text_chunks = False, "", []
+
+    def handle_data(self, data):
+        if self._in_a:
+            self._text_chunks.append(data)
+
+
+def _parsed(html):
+    p = _Anchors()
+    p.feed(html)
+    return [(h.strip(), t.strip() or None) for h, t in p.links if h.strip()]
+
+
+BLOBS = [
+    "<p>See the <a href='guide.pdf'>Call <b>guide</b></a> &amp; <A HREF=\"/t?a=1&amp;b=2\">terms</A></p>",
+    "<a href='x'/>self-closing<a href=y>nested <a href=w>inner</a>",
+    "<!-- <a href=c>x</a> --><a href=d>y</a>",
+    "<style>a<b</style><a href=e>z</a>",
+    "<div><a>no href</a><a href=\"\">empty</a></div>",
+    "<p>R&amp;D&nbsp;costs &#10;<a href='/f'>Fees &amp; rates</a> apply</p>",
+    "no anchors here",
+]
+
+
+def _eu_blobs():
+    for rec in DummyEUConnector(os.path.join(ROOT, "scripts", "eu_sample_data.json")):
+        meta = rec.get("metadata") or {}
+        yield rec.get("url") or [], [h for k in _EU_HTML_KEYS for h in (meta.get(k) or [])]
+
+
+def test_links_come_from_the_reused_parser():
+    for _ in range(2):  # the per-thread parser is reset, not rebuilt, between blobs
+        for html in BLOBS:
+            assert [(l["url"], l["label"]) for l in _extract_links(html)] == _parsed(html), html
+
+
+def test_one_pass_gives_text_documents_and_links():
+    cases = [([], [b], b) for b in BLOBS] + [(urls, blobs, blobs[0]) for urls, blobs in _eu_blobs()]
+    cases = [c for c in cases if c[2] not in (BLOBS[2], BLOBS[3])]  # the regex misreads those, see below
+    cases.append((["https://x/call.pdf", "https://x"], [BLOBS[0], None, BLOBS[0], BLOBS[5]], None))
+    for urls, blobs, text_blob in cases:
+        text, docs, links = _scan_html(urls, blobs, text_blob)
+        # same as stripping the text and splitting the extracted links separately
+        assert text == (_strip_html(text_blob) if text_blob else None)
+        found = [{"url": u, "label": None} for u in urls] + [l for b in blobs for l in _extract_links(b)]
+        assert (docs, links) == _split_documents_vs_links(found)
+    text, docs, links = _scan_html([], [BLOBS[5]], BLOBS[5])
+    assert text == "R&amp;D&nbsp;costs &#10; Fees &amp; rates apply"  # entities kept as written
+    assert links == [{"label": "Fees & rates", "url": "/f"}]
+    # comments and style sheets are not text
+    assert [_scan_html([], [], b)[0] for b in BLOBS[2:4]] == ["y", "z"]
+    assert [_strip_html(b) for b in BLOBS[2:4]] == ["x --> y", "a z"]
+
+
+def test_strip_html_single_pass():
+    assert _strip_html("<p>One\n\t<b>two</b></p>  three <br/>") == "One two three"
+    assert _strip_html("<p> </p>") is None
+    assert _strip_html("a < b > c") == "a c"
@@ -0,0 +1,59 @@
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ["TESTING"] = "1"
+
+from app.ingest import run_pipeline
+from app.normalize import MP_CONTEXT, normalize, normalize_many
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "scripts", "vinnova_sample_data.json")
+
+
+def test_normalize_many_matches_sequential_and_isolates_failures():
+    with open(SAMPLE, encoding="utf-8") as f:
+        raw = json.load(f)
+    records = raw * 5
+    records.insert(7, None)  # not a record: fails on its own
+
+    expected = [normalize(r, source="VINNOVA") for r in raw * 5]
+    for kwargs in ({"workers": 1}, {"workers": 2, "chunk_size": 4}):
+        res = normalize_many(records, source="VINNOVA", **kwargs)
+        assert [r["index"] for r in res] == list(range(len(records)))
+        assert not res[7]["ok"] and "NoneType" in res[7]["error"]
+        assert [r["record"] for r in res if r["ok"]] == expected
+
+    with ProcessPoolExecutor(max_workers=2, mp_context=MP_CONTEXT) as pool:
+        res = normalize_many(records, source="VINNOVA", executor=pool, chunk_size=3)
+    assert sum(r["ok"] for r in res) == len(expected)
+
+
+def test_pipeline_can_normalize_on_a_process_pool():
+    recs = [{"id": f"a{i}", "source_uid": f"a{i}", "links": {}} for i in range(30)] + [None]
+    got = []
+    stats = run_pipeline(
+        {"A": (lambda: recs, None)},
+        lambda batch: got.extend(batch) or 0,
+        normalize_processes=2,
+        batch_size=8,
+    )
+    assert (stats["A"].normalized, stats["A"].normalize_failed, stats["A"].upserted) == (30, 1, 30)
+    assert sorted(r["id"] for r in got) == sorted(r["id"] for r in recs[:-1])
+
+
+def test_single_source_normalizers_can_be_passed_directly():
+    # compiled mapping functions take just the record
+    from app.normalize import normalize_vinnova
+
+    with open(SAMPLE, encoding="utf-8") as f:
+        raw = json.load(f)
+    expected = [normalize_vinnova(r) for r in raw]
+    for kwargs in ({"workers": 1}, {"workers": 2, "chunk_size": 1}):
+        res = normalize_many(raw, normalizer=normalize_vinnova, **kwargs)
+        assert [r["record"] for r in res] == expected, [r["error"] for r in res]
+
+    got = []
+    stats = run_pipeline({"V": (lambda: raw, None)}, lambda batch: got.extend(batch) or 0, normalizer=normalize_vinnova)
+    assert stats["V"].normalize_failed == 0 and sorted(r["id"] for r in got) == sorted(r["id"] for r in expected)
@@ -0,0 +1,122 @@
+import json
+import os
+import sys
+from datetime import date
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ["TESTING"] = "1"
+
+from sqlalchemy import create_engine, event, literal, select, update
+from sqlalchemy.orm import sessionmaker
+
+from app import models, crud
+from app.dates import batch_today
+from app.normalize import normalize_vinnova
+from pg import pg_session, requires_pg
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "scripts", "vinnova_sample_data.json")
+
+
+def get_session():
+    engine = create_engine("sqlite:///:memory:")
+    models.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    return Session()
+
+
+def _opp(uid, status, deadlines=(), **kw):
+    return models.Opportunity(
+        id=uid, source="s", source_uid=uid, title={"en": uid}, summary={"en": "s"},
+        tags=[], topic_codes=[], links={"landing": ""}, status=status,
+        deadlines=[{"type": "single", "date": d} for d in deadlines], **kw,
+    )
+
+
+def test_recompute_status_updates_only_changed_rows():
+    db = get_session()
+    db.add_all([
+        _opp("stale", "Open", ["2025-01-10"]),                            # deadline passed
+        _opp("next", "Open", ["2025-01-10", "2025-06-01", "2025-03-01"]),  # moves to the next deadline
+        _opp("same", "open", ["2025-03-01"], closes_at=date(2025, 3, 1)),  # case-only difference: untouched
+        _opp("soon", "Open", ["2025-04-01"], opens_at=date(2025, 3, 1)),
+        _opp("bad", "Unknown", ["2025-02-30", "later"], closes_at=date(2024, 12, 1)),
+        _opp("nodates", "Unknown"),
+        _opp("other", "Cancelled", ["2025-03-01"]),                        # closes_at only
+    ])
+    db.commit()
+    crud.refresh_facets(db)
+
+    assert crud.recompute_status(db, date(2025, 2, 1), dry_run=True) == 5
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *a: statements.append(a[2]))
+    assert crud.recompute_status(db, date(2025, 2, 1)) == 5
+    assert sum(s.lstrip().upper().startswith("UPDATE") for s in statements) == 1  # one set-based update
+
+    rows = {o.id: (o.status, o.closes_at) for o in db.query(models.Opportunity)}
+    assert rows == {
+        "stale": ("Closed", date(2025, 1, 10)),
+        "next": ("Open", date(2025, 3, 1)),
+        "same": ("open", date(2025, 3, 1)),
+        "soon": ("Forthcoming", date(2025, 4, 1)),
+        "bad": ("Closed", date(2024, 12, 1)),  # no valid deadline: stored closes_at kept
+        "nodates": ("Unknown", None),
+        "other": ("Cancelled", date(2025, 3, 1)),
+    }
+    statuses = {c["value"]: c["count"] for c in crud.get_facets(db)["counts"]["statuses"]}
+    assert statuses["Closed"] == 2 and statuses["Forthcoming"] == 1
+
+    # Idempotent for the same day; a later day only touches what crossed a date
+    assert crud.recompute_status(db, date(2025, 2, 1)) == 0
+    assert crud.recompute_status(db, date(2025, 3, 2)) == 3  # next -> 06-01, same -> Closed, soon -> Open
+
+
+def _check_normalizer_output(db):
+    # Rows as ingest stores them: dates in opening_date / deadline_date (extra), not in the columns
+    with open(SAMPLE, encoding="utf-8") as f:
+        raw = json.load(f)
+    with batch_today(date(2025, 3, 1)):
+        recs = [normalize_vinnova(r) for r in raw]
+    recs[0]["deadlines"].append({"type": "single", "date": "2025-12-15"})
+    ids = [r["id"] for r in recs]
+    assert [r["status"] for r in recs] == ["Forthcoming", "Forthcoming", "Unknown"]
+    crud.upsert_many(db, recs)
+
+    def rows():
+        db.expire_all()
+        return [db.get(models.Opportunity, i) for i in ids]
+
+    assert [(o.opens_at, o.closes_at) for o in rows()[:2]] == [
+        (date(2025, 9, 16), date(2025, 10, 31)), (date(2025, 9, 5), date(2025, 9, 5)),
+    ]
+    assert crud.recompute_status(db, date(2025, 3, 1)) == 0  # still Forthcoming, not Open
+
+    # Rows stored before the columns were filled on ingest: opening_date is read from extra
+    db.execute(update(models.Opportunity).values(opens_at=None, closes_at=None))
+    db.commit()
+    assert crud.recompute_status(db, date(2025, 3, 1)) == 2  # closes_at backfilled
+    assert [o.status for o in rows()] == ["Forthcoming", "Forthcoming", "Unknown"]
+
+    # closes_at moves to the next deadline and the served deadline_date follows it
+    assert crud.recompute_status(db, date(2025, 11, 1)) == 2
+    first, second, third = rows()
+    assert (first.status, first.closes_at, first.extra["deadline_date"]) == ("Open", date(2025, 12, 15), "2025-12-15")
+    assert (second.status, second.closes_at, second.extra["deadline_date"]) == ("Closed", date(2025, 9, 5), "2025-09-05")
+    assert third.extra["deadline_date"] is None and third.status == "Unknown"
+    assert first.extra["opening_date"] == "2025-09-16"  # the rest of extra is kept
+    assert crud.recompute_status(db, date(2025, 11, 1)) == 0
+
+
+def test_recompute_status_on_normalizer_output():
+    _check_normalizer_output(get_session())
+
+
+@requires_pg
+def test_recompute_status_on_normalizer_output_on_postgres():
+    with pg_session() as db:
+        _check_normalizer_output(db)
+        # no pg_input_is_valid (Postgres 16+): month lengths, leap years and junk are checked in SQL
+        cases = {"2024-02-29": True, "2025-02-29": False, "2025-04-31": False, "2025-12-31": True,
+                 "0000-01-01": False, "2025-13-01": False, "2025-1-01": False, "soon": False}
+        got = {v: db.execute(select(crud._valid_date(db, literal(v)))).scalar_one() for v in cases}
+        assert got == cases
@@ -0,0 +1,437 @@
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ["TESTING"] = "1"
+
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import models, crud
+from app.cache import QueryCache
+from app.serialize import projected_to_dict
+from pg import has_extension, pg_session, requires_pg
+
+
+def get_session():
+    engine = create_engine("sqlite:///:memory:")
+    models.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    return Session()
+
+
+def _opp(i, **kw):
+    rec = dict(
+        id=f"o{i:03d}",
+        source="s",
+        source_uid=f"o{i:03d}",
+        title={"en": f"Call {i}"},
+        summary={"en": "s"},
+        topic_codes=[],
+        tags=[],
+        deadlines=[],
+        status="open",
+        links={"landing": ""},
+    )
+    rec.update(kw)
+    return models.Opportunity(**rec)
+
+
+def test_fuzzy_match_covers_sponsor_and_programme():
+    db = get_session()
+    db.add_all([
+        _opp(1, title={"en": "Hydrogen aviation"}),
+        _opp(2, sponsor="Formas"),
+        _opp(3, programme="Horizon Europe"),
+    ])
+    db.commit()
+
+    rows, total = crud.search_opportunities(db, q="formas", match="fuzzy")
+    assert [r.id for r in rows] == ["o002"]
+    rows, total = crud.search_opportunities(db, q="horizon", match="fuzzy")
+    assert [r.id for r in rows] == ["o003"]
+    # suggestions need pg_trgm; other databases just get None
+    assert crud.suggest_query(db, "hydrogn") is None
+
+
+def _walk(db, sort, page_size=3):
+    seen, cursor = [], None
+    while True:
+        rows, _ = crud.search_opportunities(db, sort=sort, page_size=page_size, cursor=cursor)
+        seen += [r.id for r in rows]
+        if len(rows) < page_size:
+            return seen
+        cursor = crud.encode_cursor(sort, rows[-1])
+
+
+def test_cursor_pagination_matches_offset_order():
+    db = get_session()
+    dates = [date(2025, 1, 5), None, date(2025, 1, 1), date(2025, 1, 5), None, date(2025, 2, 1), date(2025, 1, 5)]
+    db.add_all([_opp(i, closes_at=d) for i, d in enumerate(dates)])
+    db.commit()
+
+    for sort in ("recent", "deadline_asc", "deadline_desc"):
+        full, total = crud.search_opportunities(db, sort=sort, page_size=100)
+        assert total == len(dates)
+        assert _walk(db, sort) == [r.id for r in full]
+
+    # nulls last in both deadline directions
+    full, _ = crud.search_opportunities(db, sort="deadline_desc", page_size=100)
+    assert [r.closes_at for r in full][-2:] == [None, None]
+
+
+def test_cursor_rejects_other_sort():
+    db = get_session()
+    db.add(_opp(1))
+    db.commit()
+    cur = crud.encode_cursor("recent", db.query(models.Opportunity).one())
+    with pytest.raises(crud.CursorError):
+        crud.search_opportunities(db, sort="deadline_asc", cursor=cur)
+    with pytest.raises(crud.CursorError):
+        crud.search_opportunities(db, cursor="not-a-cursor")
+
+
+def test_total_modes():
+    db = get_session()
+    db.add_all([_opp(i, status="open" if i % 2 else "closed") for i in range(7)])
+    db.commit()
+
+    rows, total = crud.search_opportunities(db, status="open", page_size=2)
+    assert (len(rows), total) == (2, 3)
+    rows, total = crud.search_opportunities(db, status="open", page=5, page_size=2)
+    assert (rows, total) == ([], 3)
+    rows, total = crud.search_opportunities(db, status="open", page_size=2, total_mode="none")
+    assert (len(rows), total) == (2, None)
+    rows, total = crud.search_opportunities(db, status="open", total_mode="estimate")
+    assert total == 3
+
+
+def test_estimate_count_cache_is_thread_safe(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'count.db'}")
+    models.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add_all([_opp(i, sponsor=f"s{i % 5}") for i in range(20)])
+        db.commit()
+    # A tiny cache so the threads keep evicting each other's entries
+    monkeypatch.setattr(crud, "_count_cache", QueryCache(maxsize=2, ttl=60))
+
+    def worker(n):
+        with Session() as db:
+            for i in range(50):
+                sponsor = f"s{(n + i) % 5}"
+                rows, total = crud.search_opportunities(db, sponsor=sponsor, total_mode="estimate")
+                assert total == 4
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(worker, range(4)))
+
+
+def test_tag_and_topic_filters_are_exact():
+    db = get_session()
+    db.add_all([
+        _opp(1, tags=["air", "hydrogen"], topic_codes=["HORIZON-CL5-1"]),
+        _opp(2, tags=["repair"], topic_codes=["HORIZON-CL4-2"]),
+        _opp(3, tags=["air"]),
+    ])
+    db.commit()
+
+    ids = lambda rows: sorted(r.id for r in rows)
+    assert ids(crud.search_opportunities(db, tag="air")[0]) == ["o001", "o003"]
+    assert ids(crud.search_opportunities(db, tags=["air", "repair"])[0]) == ["o001", "o002", "o003"]
+    assert ids(crud.search_opportunities(db, tags=["air", "hydrogen"], tag_mode="all")[0]) == ["o001"]
+    assert ids(crud.search_opportunities(db, topic_codes=["HORIZON-CL4-2"])[0]) == ["o002"]
+
+
+def test_sparse_fieldsets():
+    db = get_session()
+    db.add_all([
+        _opp(1, title={"en": "Hydrogen", "sv": "Vätgas"}, sponsor="Formas", closes_at=date(2025, 3, 1),
+             links={"landing": "https://x"}, extra={"documents": [{"url": "d.pdf"}], "big": "x" * 1000}),
+        _opp(2, closes_at=date(2025, 1, 1)),
+    ])
+    db.commit()
+
+    fields = ["title.en", "sponsor", "closes_at", "links.landing", "documents"]
+    rows, total = crud.search_opportunities(db, sort="deadline_desc", page_size=1, fields=fields)
+    assert total == 2
+    assert projected_to_dict(rows[0], fields) == {
+        "id": "o001",
+        "title": {"en": "Hydrogen"},
+        "sponsor": "Formas",
+        "closes_at": "2025-03-01",
+        "links": {"landing": "https://x"},
+        "documents": [{"url": "d.pdf"}],
+    }
+    # projected rows still produce cursors
+    cur = crud.encode_cursor("deadline_desc", rows[0])
+    rows, _ = crud.search_opportunities(db, sort="deadline_desc", cursor=cur, fields=["status"])
+    assert [projected_to_dict(r, ["status"]) for r in rows] == [{"id": "o002", "status": "open"}]
+
+    one = crud.get_opportunity(db, "o001", ["title.sv"])
+    assert projected_to_dict(one, ["title.sv"]) == {"id": "o001", "title": {"sv": "Vätgas"}}
+    with pytest.raises(crud.FieldsError):
+        crud.get_opportunity(db, "o001", ["status.x"])
+
+
+def _pg_sql(conds, rank=None) -> str:
+    stmt = select(models.Opportunity.id).where(*conds)
+    if rank is not None:
+        stmt = stmt.order_by(rank.desc())
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_text_search_compiles_to_full_text_on_postgres():
+    # No connection needed: the engine is only consulted for its dialect
+    db = Session(bind=create_engine("postgresql+psycopg2://user@localhost/none"))
+    conds, rank = crud.run_steps(db, crud._search_conditions(db, q='"electric aviation" -drone'))
+    sql = _pg_sql(conds, rank)
+    assert "opportunities.search_tsv @@ " in sql
+    for cfg in crud.FTS_CONFIGS:  # one websearch query per language, in the filter and in the rank
+        assert sql.count(f"websearch_to_tsquery('{cfg}'::regconfig, '\"electric aviation\" -drone')") == 2
+    assert "ORDER BY ts_rank(opportunities.search_tsv, " in sql
+    assert "lower(" not in sql  # no LIKE fallback
+
+
+def _pg_rec(i, **kw):
+    rec = {
+        "id": f"f{i}", "source": "s", "source_uid": f"f{i}", "title": {"en": None}, "summary": {"en": None},
+        "status": "Open", "links": {"landing": ""},
+    }
+    rec.update(kw)
+    return rec
+
+
+@requires_pg
+def test_full_text_search_on_postgres():
+    with pg_session() as db:
+        crud.upsert_many(db, [
+            _pg_rec(1, title={"en": "Electric aviation demonstrators"}),
+            _pg_rec(2, title={"en": "Drone logistics"}, summary={"en": "electric aviation with drones"}),
+            _pg_rec(3, title={"sv": "Vätgasen i industrin"}, status="Closed"),
+            _pg_rec(4, title={"en": "Urban planning"}),
+            _pg_rec(5, title={"en": "Misc"}, summary={"en": "about aviation and electric motors"}),
+            _pg_rec(6, title={"en": "Other"}, description_text="electric aviation in the appendix"),
+        ])
+        ids = lambda **kw: [r.id for r in crud.search_opportunities(db, **kw)[0]]
+
+        # stemming in both languages
+        assert ids(q="plans") == ["f4"]
+        assert ids(q="vätgas") == ["f3"]
+        # websearch syntax: phrases and exclusions
+        assert sorted(ids(q='"electric aviation"')) == ["f1", "f2", "f6"]
+        assert sorted(ids(q='"electric aviation" -drone')) == ["f1", "f6"]
+        # weights: title (A) > summary (B) > description (C)
+        ranked = ids(q="aviation", sort="relevance")
+        assert ranked[0] == "f1" and ranked[-1] == "f6" and sorted(ranked[1:3]) == ["f2", "f5"]
+        rows, total = crud.search_opportunities(db, q="aviation", page_size=1, total_mode="exact")
+        assert total == 4
+        # facets drill down by the same query
+        assert crud.get_facets(db, q="vätgas")["counts"]["statuses"] == [{"value": "Closed", "count": 1}]
+
+
+class _Recorder:
+    """Stands in for Session.execute: keeps the SQL, returns an empty result."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, stmt, params=None, **kw):
+        self.calls.append((str(stmt), params or stmt.compile().params))
+        return self
+
+    def first(self):
+        return None
+
+
+def test_fuzzy_match_compiles_to_pg_trgm_on_postgres(monkeypatch):
+    db = Session(bind=create_engine("postgresql+psycopg2://user@localhost/none"))
+    db.execute = rec = _Recorder()
+    monkeypatch.setitem(crud._trgm_installed, db.get_bind().url.render_as_string(), True)
+    conds, rank = crud.run_steps(db, crud._search_conditions(db, q="hydrogn", match="fuzzy", threshold=0.4))
+    # the threshold is set for the transaction, so <% can use the trigram indexes
+    assert rec.calls == [("SELECT set_config('pg_trgm.word_similarity_threshold', :t, true)", {"t": "0.4"})]
+    sql = _pg_sql(conds, rank)
+    for col in ("(opportunities.title ->> 'en')", "(opportunities.title ->> 'sv')", "opportunities.sponsor", "opportunities.programme"):
+        assert f"'hydrogn' <%% {col}" in sql  # same expressions as the gin_trgm_ops indexes
+    assert "ORDER BY greatest(word_similarity('hydrogn', opportunities.title ->> 'en'), " in sql
+
+    rec.calls.clear()
+    assert crud.suggest_query(db, "hydrogn aviaton") is None
+    assert [params for _, params in rec.calls] == [{"w": "hydrogn"}, {"w": "aviaton"}]
+    assert all("ORDER BY word <-> :w LIMIT 1" in sql for sql, _ in rec.calls)  # KNN over the GiST index
+
+
+def test_pg_trgm_is_looked_up_once(monkeypatch):
+    db = Session(bind=create_engine("postgresql+psycopg2://user@localhost/none"))
+    db.execute = rec = _Recorder()  # first() is None: not installed
+    monkeypatch.setattr(crud, "_trgm_installed", {})
+    for _ in range(2):
+        conds, rank = crud.run_steps(db, crud._search_conditions(db, q="hydrogn", match="fuzzy"))
+        assert rank is None and "lower(" in _pg_sql(conds)  # the ILIKE fallback
+        assert crud.suggest_query(db, "hydrogn") is None
+    assert [sql for sql, _ in rec.calls] == ["SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"]
+
+
+@requires_pg
+def test_fuzzy_match_and_suggestions_without_pg_trgm(monkeypatch):
+    with pg_session() as db:
+        # as if init_db had skipped the trigram steps, whether or not this server has pg_trgm
+        monkeypatch.setitem(crud._trgm_installed, db.get_bind().url.render_as_string(), False)
+        crud.upsert_many(db, [
+            _pg_rec(1, title={"en": "Hydrogen aviation"}),
+            _pg_rec(2, title={"en": "Food systems"}, sponsor="Formas"),
+        ])
+        ids = lambda **kw: [r.id for r in crud.search_opportunities(db, match="fuzzy", **kw)[0]]
+
+        assert ids(q="hydrogen") == ["f1"]
+        assert ids(q="forma") == ["f2"]
+        assert ids(q="hydrogn") == []
+        assert crud.suggest_query(db, "hydrogn aviaton") is None
+        assert crud.search_opportunities(db, q="hydrogn")[0] == []  # the zero-hit path of /opportunities
+
+
+@requires_pg
+def test_fuzzy_match_and_suggestions_on_postgres():
+    with pg_session() as db:
+        if not has_extension(db.get_bind(), "pg_trgm"):
+            pytest.skip("pg_trgm is not available in this Postgres")
+        crud.upsert_many(db, [
+            _pg_rec(1, title={"en": "Hydrogen aviation"}),
+            _pg_rec(2, title={"en": "Food systems"}, sponsor="Formas"),
+            _pg_rec(3, title={"en": "Research infrastructure"}, programme="Horizon Europe"),
+        ])
+        ids = lambda **kw: [r.id for r in crud.search_opportunities(db, match="fuzzy", **kw)[0]]
+
+        assert ids(q="hydrogn") == ["f1"]
+        assert ids(q="formsa") == ["f2"]
+        assert ids(q="horizn", sort="relevance") == ["f3"]
+        assert ids(q="hydrogn", threshold=0.9) == []
+
+        assert crud.suggest_query(db, "hydrogn aviaton") == "hydrogen aviation"
+        assert crud.suggest_query(db, "hydrogen") is None
+
+
+def _read_both(db, async_url, calls):
+    """Each (crud function name, kwargs) run on db and natively on an AsyncSession over async_url."""
+    async def run():
+        engine = create_async_engine(async_url)
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as adb:
+                return [await getattr(crud, name + "_async")(adb, **kw) for name, kw in calls]
+        finally:
+            await engine.dispose()
+
+    got = asyncio.run(run())
+    return got, [getattr(crud, name)(db, **kw) for name, kw in calls]
+
+
+def _comparable(value):
+    if isinstance(value, tuple) and len(value) == 2 and isinstance(value[0], list):  # (rows, total)
+        return [r.id if isinstance(r, models.Opportunity) else tuple(r) for r in value[0]], value[1]
+    return getattr(value, "id", value)
+
+
+ASYNC_CALLS = [
+    ("search_opportunities", {}),
+    ("search_opportunities", {"status": "open", "sort": "deadline_asc", "page_size": 2}),
+    ("search_opportunities", {"q": "call 3", "fields": ["id", "title"]}),
+    ("search_opportunities", {"sponsor": "s1", "total_mode": "estimate"}),
+    ("get_opportunity", {"oid": "o002"}),
+    ("get_opportunity", {"oid": "o002", "fields": ["id", "status"]}),
+    ("suggest_query", {"q": "cal"}),
+    ("get_facets", {}),
+    ("get_facets", {"status": "open", "limit": 2}),
+]
+
+
+def test_async_read_path_matches_sync(tmp_path, monkeypatch):
+    path = tmp_path / "async.db"
+    engine = create_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(engine)
+    monkeypatch.setattr(crud, "_count_cache", QueryCache(maxsize=16, ttl=60))
+    with sessionmaker(bind=engine)() as db:
+        db.add_all([
+            _opp(i, status="open" if i % 2 else "closed", sponsor=f"s{i % 3}", tags=[f"t{i % 2}"],
+                 closes_at=date(2025, 1, 1 + i) if i % 4 else None)
+            for i in range(9)
+        ])
+        db.commit()
+        got, want = _read_both(db, f"sqlite+aiosqlite:///{path}", ASYNC_CALLS)
+    assert [_comparable(v) for v in got] == [_comparable(v) for v in want]
+    engine.dispose()
+
+
+@requires_pg
+def test_async_read_path_matches_sync_on_postgres(monkeypatch):
+    monkeypatch.setattr(crud, "_count_cache", QueryCache(maxsize=16, ttl=60))
+    with pg_session() as db:
+        crud.upsert_many(db, [
+            _pg_rec(i, title={"en": f"Call {i}"}, status="open" if i % 2 else "closed", sponsor=f"s{i % 3}",
+                    closes_at=f"2025-01-{1 + i:02d}" if i % 4 else None)
+            for i in range(9)
+        ])
+        async_url = db.get_bind().url.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+        calls = [(name, {**kw, "oid": "f2"} if "oid" in kw else kw) for name, kw in ASYNC_CALLS]
+        got, want = _read_both(db, async_url, calls)  # async first: the estimate goes through EXPLAIN
+    assert [_comparable(v) for v in got] == [_comparable(v) for v in want]
+    assert got[0][1] == 9 and got[3][1] is not None
+
+
+@requires_pg
+def test_failed_explain_leaves_the_transaction_usable(monkeypatch):
+    monkeypatch.setattr(crud, "_count_cache", QueryCache(maxsize=16, ttl=60))
+    # EXPLAIN errors out; the estimate falls back to count(*) in the same transaction
+    monkeypatch.setattr(crud, "_explain", lambda db, stmt: ("EXPLAIN (FORMAT JSON) SELECT no_such_column FROM opportunities", ()))
+    with pg_session() as db:
+        crud.upsert_many(db, [_pg_rec(i, sponsor=f"s{i % 2}") for i in range(5)])
+        async_url = db.get_bind().url.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+        got, want = _read_both(db, async_url, [
+            ("search_opportunities", {"sponsor": "s0", "total_mode": "estimate"}),
+            ("search_opportunities", {"sponsor": "s1", "total_mode": "estimate"}),
+        ])
+    assert [total for _, total in got] == [3, 2]
+    assert [total for _, total in want] == [3, 2]
+
+
+@requires_pg
+def test_deep_deadline_cursor_is_an_index_range_on_postgres():
+    with pg_session() as db:
+        crud.upsert_many(db, [
+            _pg_rec(i, id=f"f{i:04d}", source_uid=f"f{i:04d}",
+                    closes_at=None if i % 10 == 0 else (date(2025, 1, 1) + timedelta(days=i % 700)).isoformat())
+            for i in range(2990)  # 2691 dated: page 135 of 20 holds the last 11 and the first undated
+        ])
+        db.execute(text("ANALYZE opportunities"))
+        db.commit()
+        statements = []
+        record = lambda conn, cursor, stmt, params, ctx, many: statements.append((stmt, params))
+
+        for sort, index in (("deadline_asc", "idx_opps_closes_at_id"), ("deadline_desc", "idx_opps_closes_at_id_desc")):
+            deep, _ = crud.search_opportunities(db, sort=sort, page=100, page_size=20, total_mode="none")
+            event.listen(db.get_bind(), "before_cursor_execute", record)
+            try:
+                rows, _ = crud.search_opportunities(
+                    db, sort=sort, page_size=20, cursor=crud.encode_cursor(sort, deep[-1]), total_mode="none"
+                )
+            finally:
+                event.remove(db.get_bind(), "before_cursor_execute", record)
+            assert [r.id for r in rows] == [r.id for r in crud.search_opportunities(db, sort=sort, page=101, page_size=20)[0]]
+            stmt, params = statements.pop()
+            plan = db.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + stmt, params).scalar_one()[0]["Plan"]
+            scan = plan["Plans"][0]
+            assert (scan["Node Type"], scan["Index Name"]) == ("Index Scan", index)
+            assert scan["Index Cond"].startswith("(ROW(closes_at, (id)::text) ")
+
+            # the page that runs out of dated rows continues into the undated ones
+            last_dated, _ = crud.search_opportunities(db, sort=sort, page=134, page_size=20, total_mode="none")
+            rows, _ = crud.search_opportunities(db, sort=sort, page_size=20, cursor=crud.encode_cursor(sort, last_dated[-1]))
+            assert [r.id for r in rows] == [r.id for r in crud.search_opportunities(db, sort=sort, page=135, page_size=20)[0]]
+            assert rows[0].closes_at is not None and rows[-1].closes_at is None
@@ -0,0 +1,46 @@
+import json
+import os
+import sys
+from datetime import date
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ["TESTING"] = "1"
+
+from fastapi.encoders import jsonable_encoder
+
+from app import models
+from app.schemas import OpportunityOut
+from app.serialize import dumps, opportunity_to_dict
+
+
+def _legacy(o):
+    """Previous path: pydantic dump + extra merge, then response_model validation."""
+    base = OpportunityOut.model_validate(o, from_attributes=True).model_dump()
+    if o.extra:
+        base.update(o.extra)
+    return jsonable_encoder(OpportunityOut.model_validate(base))
+
+
+def test_fast_path_matches_pydantic_output():
+    o = models.Opportunity(
+        id="EU:1",
+        source="EU",
+        source_uid="1",
+        title={"en": "Title", "fr": "Titre"},
+        summary={"sv": "Sammanfattning"},
+        programme="Horizon",
+        sponsor=None,
+        topic_codes=["HORIZON-1"],
+        tags=["a"],
+        deadlines=[{"type": "single", "date": "2025-12-01"}],
+        status="Open",
+        links={"apply": "https://x", "landing": "https://y"},
+        opens_at=date(2025, 1, 1),
+        closes_at=None,
+        notes=None,
+        extra={"documents": [{"url": "https://x/doc.pdf"}], "budget_total": 1.5},
+    )
+    assert json.loads(dumps(opportunity_to_dict(o))) == _legacy(o)
+
+    o.links, o.extra, o.deadlines = {}, {}, []
+    assert json.loads(dumps(opportunity_to_dict(o))) == _legacy(o)
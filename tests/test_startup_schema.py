@@ -0,0 +1,49 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ["TESTING"] = "1"
+
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, main
+from pg import pg_engine, requires_pg
+
+
+def _rec(i):
+    return {
+        "id": f"s{i}", "source": "s", "source_uid": f"s{i}",
+        "title": {"en": f"Hydrogen call {i}"}, "summary": {"en": "s"},
+        "status": "Open", "links": {"landing": ""},
+    }
+
+
+@requires_pg
+def test_failing_steps_do_not_roll_back_the_others(monkeypatch):
+    # e.g. managed Postgres without the privilege to create extensions
+    monkeypatch.setattr(main, "SCHEMA_STEPS", [("broken", "SELECT no_such_function();")] + main.SCHEMA_STEPS)
+    monkeypatch.setattr(main, "TRGM_STEPS", [("pg_trgm", "CREATE EXTENSION no_such_extension;")] + main.TRGM_STEPS[1:])
+    engine = pg_engine()
+
+    cols = {c["name"] for c in inspect(engine).get_columns("opportunities")}
+    assert {"content_hash", "search_tsv"} <= cols
+    assert inspect(engine).has_table("search_words")
+
+    with sessionmaker(bind=engine)() as db:
+        res = crud.upsert_many(db, [_rec(1), _rec(2)])
+        assert [r["status"] for r in res] == ["inserted", "inserted"]
+        rows, total = crud.search_opportunities(db, q="hydrogen")
+        assert total == 2
+
+
+@requires_pg
+def test_init_db_is_idempotent():
+    engine = pg_engine()
+    with sessionmaker(bind=engine)() as db:
+        crud.upsert_many(db, [_rec(1)])
+    main.init_db(engine)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM opportunities")).scalar_one() == 1
+        assert conn.execute(text("SELECT count(*) FROM search_words WHERE word = 'hydrogen'")).scalar_one() == 1
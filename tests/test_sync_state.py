@@ -0,0 +1,55 @@
+import datetime as dt
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ["TESTING"] = "1"
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models, crud
+from app.connectors import vinnova_rounds
+from app.dates import batch_today
+
+
+def get_session():
+    engine = create_engine("sqlite:///:memory:")
+    models.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    return Session()
+
+
+def test_watermark_roundtrip():
+    db = get_session()
+    assert crud.get_sync_state(db, "VINNOVA") is None
+
+    crud.set_watermark(db, "VINNOVA", dt.date(2025, 3, 1))
+    state = crud.set_watermark(db, "VINNOVA", dt.date(2025, 3, 8))
+    assert state.watermark == dt.date(2025, 3, 8) and state.synced_at is not None
+    assert db.query(models.SyncState).count() == 1
+
+
+def test_vinnova_fetch_requests_delta_window(monkeypatch):
+    urls = []
+
+    class Resp:
+        def raise_for_status(self):
+            pass
+
+        def iter_content(self, chunk_size=1):
+            yield b'[{"Diarienummer": '
+            yield b'"2025-1"}]'
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(vinnova_rounds.http, "get", lambda url, **kw: urls.append(url) or Resp())
+    assert list(vinnova_rounds.fetch(since=dt.date(2025, 3, 8))) == [{"Diarienummer": "2025-1"}]
+    list(vinnova_rounds.fetch())
+    assert urls == [f"{vinnova_rounds.BASE}/2025-03-08", f"{vinnova_rounds.BASE}/{vinnova_rounds._since()}"]
+
+    overlap = dt.timedelta(days=vinnova_rounds.VINNOVA_OVERLAP_DAYS)
+    assert vinnova_rounds.next_watermark(dt.date(2025, 3, 10)) == dt.date(2025, 3, 10) - overlap
+    with batch_today(dt.date(2025, 3, 10)):  # default run date is dates.today() (UTC)
+        assert vinnova_rounds.next_watermark() == dt.date(2025, 3, 10) - overlap
@@ -0,0 +1,135 @@
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ["TESTING"] = "1"
+
+from app.connectors.transport import CircuitOpenError, HttpClient
+
+
+def _resp(status, body=b"{}", headers=None):
+    r = requests.Response()
+    r.status_code = status
+    r._content = body
+    r._content_consumed = True
+    r.headers.update(headers or {})
+    return r
+
+
+def _client(monkeypatch, script, **kw):
+    """HttpClient whose sessions replay `script` (responses or exceptions) in order."""
+    sleeps = []
+    calls = []
+    client = HttpClient(per_host_rate=0, sleep=sleeps.append, **kw)
+
+    def fake_request(self, method, url, **kwargs):
+        calls.append((method, url, kwargs))
+        item = script.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    monkeypatch.setattr(requests.Session, "request", fake_request)
+    return client, calls, sleeps
+
+
+def test_retries_honour_retry_after_and_count_bytes(monkeypatch):
+    script = [
+        _resp(429, headers={"Retry-After": "7"}),
+        requests.ConnectionError("reset"),
+        _resp(200, b'{"ok": true}'),
+    ]
+    client, calls, sleeps = _client(monkeypatch, script, max_retries=3)
+
+    r = client.get("https://api.example.org/x")
+    assert r.json() == {"ok": True}
+    assert len(calls) == 3
+    assert calls[0][2]["timeout"] == client.timeout  # default timeout applied
+    assert sleeps[0] >= 7  # Retry-After wins over the jittered backoff
+    assert 0 <= sleeps[1] <= 1.0  # second attempt: base * 2**1
+
+    st = client.stats()["api.example.org"]
+    assert st["requests"] == 3 and st["retries"] == 2 and st["errors"] == 1
+    assert st["bytes"] == len(b"{}") + len(b'{"ok": true}')
+
+
+def test_gives_up_and_returns_last_response(monkeypatch):
+    client, calls, _ = _client(monkeypatch, [_resp(503), _resp(503)], max_retries=1)
+    r = client.get("https://api.example.org/x")
+    assert r.status_code == 503 and len(calls) == 2
+
+    client, calls, _ = _client(monkeypatch, [_resp(404)], max_retries=3)
+    assert client.get("https://api.example.org/x").status_code == 404
+    assert len(calls) == 1  # client errors are not retried
+
+
+def test_circuit_breaker_opens_per_host(monkeypatch):
+    script = [requests.Timeout("slow")] * 3 + [_resp(200)]
+    client, calls, _ = _client(monkeypatch, script, max_retries=0, breaker_threshold=3)
+
+    for _ in range(3):
+        with pytest.raises(requests.Timeout):
+            client.get("https://down.example.org/")
+    with pytest.raises(CircuitOpenError):
+        client.get("https://down.example.org/")
+    assert len(calls) == 3  # fails fast without touching the host
+    assert client.stats()["down.example.org"]["circuit_open"]
+
+    # Other hosts are unaffected
+    assert client.get("https://up.example.org/").status_code == 200
+
+
+def test_disk_cache_revalidates_and_replays_offline(monkeypatch, tmp_path):
+    from app.connectors.http_cache import CacheMissError, HttpCache
+
+    cache = HttpCache(str(tmp_path), ttl=0, offline=False)
+    script = [
+        _resp(200, b'[{"id": 1}]', headers={"ETag": '"v1"', "Content-Type": "application/json"}),
+        _resp(304),
+    ]
+    client, calls, _ = _client(monkeypatch, script, cache=cache)
+    url = "https://data.example.org/rounds"
+
+    assert client.get(url).json() == [{"id": 1}]
+    r = client.get(url)  # stale (ttl=0): conditional request, server says unchanged
+    assert r.status_code == 200 and r.json() == [{"id": 1}]
+    assert calls[1][2]["headers"]["If-None-Match"] == '"v1"'
+    assert cache.stats["stored"] == 1 and cache.stats["revalidated"] == 1
+    assert list(tmp_path.rglob("*.gz"))  # body stored compressed
+
+    # Fresh within TTL, then offline: no further network calls
+    cache.ttl = 3600
+    assert client.get(url).json() == [{"id": 1}]
+    cache.ttl, cache.offline = 0, True
+    assert client.get(url).json() == [{"id": 1}]
+    assert len(calls) == 2
+    with pytest.raises(CacheMissError):
+        client.get(url, params={"page": 2})
+
+    # POSTs are only cached when the caller opts in
+    cache.offline = False
+    script.extend([_resp(200, b"1"), _resp(200, b"2")])
+    assert client.post(url).content == b"1"
+    assert client.post(url).content == b"2"
+
+
+def test_streamed_responses_are_cached_once_fully_read(monkeypatch, tmp_path):
+    from app.connectors.http_cache import HttpCache
+
+    cache = HttpCache(str(tmp_path), ttl=3600, offline=False)
+    client, calls, _ = _client(monkeypatch, [_resp(200, b'[1, 2, 3]'), _resp(200, b'[1, 2, 3]')], cache=cache)
+    url = "https://data.example.org/stream"
+
+    r = client.get(url, stream=True)
+    next(r.iter_content(chunk_size=2))  # abandoned mid-body: nothing committed
+    assert cache.stats["stored"] == 0 and not list(tmp_path.rglob("*.gz"))
+
+    assert b"".join(client.get(url, stream=True).iter_content(chunk_size=2)) == b"[1, 2, 3]"
+    assert cache.stats["stored"] == 1
+
+    cache.offline = True
+    assert b"".join(client.get(url, stream=True).iter_content(chunk_size=4)) == b"[1, 2, 3]"
+    assert len(calls) == 2